@@ -0,0 +1,147 @@
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+def user_cache_key(user_id):
+    """Clave de caché del usuario autenticado"""
+    return f"auth:user:{user_id}"
+
+def uses_local_cache():
+    """La caché es propia de cada proceso (no la comparten los workers)"""
+    return isinstance(caches['default'], LocMemCache)
+
+def user_cache_timeout():
+    """
+    Segundos que se conserva el usuario en caché
+
+    Con una caché local la invalidación no llega a los demás procesos: el
+    tiempo se limita a AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT para que un usuario
+    desactivado o eliminado deje de autenticarse en todos casi de inmediato.
+    """
+    if uses_local_cache():
+        return min(settings.AUTH_USER_CACHE_TIMEOUT, settings.AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT)
+    return settings.AUTH_USER_CACHE_TIMEOUT
+
+def invalidate_cached_user(user_id):
+    """Elimina el usuario de la caché para que la próxima petición lo lea de la base de datos"""
+    cache.delete(user_cache_key(user_id))
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Autenticación JWT que no consulta la base de datos en cada petición
+
+    Confía en el claim `user_id` del token ya validado y obtiene el usuario
+    completo de forma diferida, la primera vez que se usa, desde una caché de
+    vida corta (`user_cache_timeout`). Las señales de `authentication`
+    invalidan la entrada cuando el usuario se actualiza o elimina; para que la
+    invalidación llegue a todos los procesos la caché debe ser compartida
+    (REDIS_URL).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        return SimpleLazyObject(lambda: self.get_cached_user(user_id))
+
+    def get_cached_user(self, user_id):
+        """
+        Obtiene el usuario desde la caché o, si no está, desde la base de datos
+        """
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache.set(key, user, user_cache_timeout())
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Versión async de `authenticate` para las vistas async nativas
+
+        Resuelve el usuario de inmediato (no de forma diferida) usando la
+        caché y el ORM async.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        return await self.aget_cached_user(user_id), validated_token
+
+    async def aget_cached_user(self, user_id):
+        """
+        Versión async de `get_cached_user`
+        """
+        key = user_cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            await cache.aset(key, user, user_cache_timeout())
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+class QueryParamJWTAuthentication(CachedJWTAuthentication):
+    """
+    Autenticación JWT que además acepta el token en el parámetro `?token=`
+
+    `EventSource` del navegador no permite enviar el encabezado
+    Authorization, por eso solo se usa en los streams SSE de progreso.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            return result
+
+        raw_token = request.query_params.get('token')
+        if not raw_token:
+            return None
+
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        result = await super().aauthenticate(request)
+        if result is not None:
+            return result
+
+        raw_token = request.GET.get('token')
+        if not raw_token:
+            return None
+
+        validated_token = self.get_validated_token(raw_token.encode())
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return await self.aget_cached_user(user_id), validated_token
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .authentication import uses_local_cache
+
+@register(deploy=True)
+def check_user_cache(app_configs, **kwargs):
+    """
+    Avisa (con `check --deploy`) si la caché del usuario autenticado no es
+    compartida entre procesos
+    """
+    if not uses_local_cache() or settings.AUTH_USER_CACHE_TIMEOUT <= settings.AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT:
+        return []
+    return [Warning(
+        "La caché es local de cada proceso: un usuario desactivado o eliminado sigue "
+        "autenticado en los demás procesos hasta que vence su entrada, por eso "
+        f"AUTH_USER_CACHE_TIMEOUT se limita a {settings.AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT} segundos.",
+        hint="Define REDIS_URL para compartir la caché entre procesos.",
+        id='authentication.W001',
+    )]
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Invalida el usuario en caché al actualizar el perfil, desactivarlo o eliminarlo
+    """
+    invalidate_cached_user(instance.pk)
+    # Evita que otra petición vuelva a guardar la versión anterior antes del commit
+    transaction.on_commit(lambda: invalidate_cached_user(instance.pk))
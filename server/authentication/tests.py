@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CachedJWTAuthentication, user_cache_key, user_cache_timeout
+from .checks import check_user_cache
+from .models import User
+
+SHARED_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='ventas', email='ventas@example.com', password='clave-segura-123'
+        )
+        self.authentication = CachedJWTAuthentication()
+
+    def test_user_is_read_once(self):
+        with self.assertNumQueries(1):
+            self.authentication.get_cached_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authentication.get_cached_user(self.user.pk), self.user)
+
+    def test_saving_user_invalidates_cache(self):
+        self.authentication.get_cached_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        with self.assertRaises(AuthenticationFailed) as context:
+            self.authentication.get_cached_user(self.user.pk)
+        self.assertEqual(context.exception.detail['code'], 'user_inactive')
+
+    def test_deleting_user_invalidates_cache(self):
+        user_id = self.user.pk
+        self.authentication.get_cached_user(user_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        with self.assertRaises(AuthenticationFailed) as context:
+            self.authentication.get_cached_user(user_id)
+        self.assertEqual(context.exception.detail['code'], 'user_not_found')
+
+    def test_request_after_deactivation_is_rejected(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(client.get(reverse('user-reports')).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            user.is_active = False
+            user.save()
+        self.assertEqual(client.get(reverse('user-reports')).status_code, 401)
+
+    async def test_async_lookup_uses_cache(self):
+        user = await self.authentication.aget_cached_user(self.user.pk)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIsNotNone(await cache.aget(user_cache_key(self.user.pk)))
+
+
+class UserCacheTimeoutTests(TestCase):
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60, AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT=2)
+    def test_local_cache_caps_timeout(self):
+        self.assertEqual(user_cache_timeout(), 2)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60, CACHES=SHARED_CACHE)
+    def test_shared_cache_keeps_timeout(self):
+        self.assertEqual(user_cache_timeout(), 60)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60, AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT=2)
+    def test_check_warns_without_shared_cache(self):
+        self.assertEqual([error.id for error in check_user_cache(None)], ['authentication.W001'])
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60, CACHES=SHARED_CACHE)
+    def test_check_passes_with_shared_cache(self):
+        self.assertEqual(check_user_cache(None), [])
@@ -32,13 +32,13 @@ def clear_all_pdfs():
     cleaned_count = 0
     for report in reports_with_pdf:
         try:
-            # Eliminar archivo físico si existe
-            if report.pdf_file and os.path.exists(report.pdf_file.path):
-                os.remove(report.pdf_file.path)
-                print(f"  🗑️  Eliminado: {report.pdf_file.name}")
+            # Eliminar el archivo del storage (disco local o bucket S3)
+            if report.pdf_file:
+                name = report.pdf_file.name
+                report.pdf_file.delete(save=False)
+                print(f"  🗑️  Eliminado: {name}")
             
             # Limpiar referencia en la base de datos
-            report.pdf_file.delete(save=False)
             report.pdf_file = None
             report.save()
             
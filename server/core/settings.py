@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from decouple import config
 from pathlib import Path
 from datetime import timedelta
@@ -50,7 +51,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'main.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -101,6 +104,22 @@ DATABASES = {
     }
 }
 
+# Caché (Redis si se define REDIS_URL; si no, memoria local del proceso)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Configuración SQLite comentada
 # DATABASES = {
 #     'default': {
@@ -131,16 +150,30 @@ AUTH_PASSWORD_VALIDATORS = [
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'main.renderers.ORJSONRenderer',
     ],
 }
 
+# Vistas async nativas para los endpoints de lectura (usar con un servidor ASGI)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Compresión de respuestas (brotli si el cliente lo acepta, si no gzip)
+RESPONSE_COMPRESSION_MIN_SIZE = 1024  # bytes
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 5
+
+# Segundos que se conserva en caché el usuario autenticado por JWT. Al guardar o
+# eliminar un usuario solo se invalida la caché del proceso que lo hizo: con la
+# memoria local de cada proceso (sin REDIS_URL) los demás procesos lo conservan
+# hasta que vence, por eso ahí se usa a lo sumo AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+AUTH_USER_LOCAL_CACHE_MAX_TIMEOUT = 2
+
 # JWT configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -196,11 +229,126 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Almacenamiento de archivos (CSV, partes de subidas y PDFs): disco local en
+# MEDIA_ROOT o, si se define AWS_STORAGE_BUCKET_NAME, un bucket S3 compatible
+# (AWS S3, MinIO) compartido por todos los servidores
+AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME', default='')
+if AWS_STORAGE_BUCKET_NAME:
+    STORAGES = {
+        'default': {'BACKEND': 'storages.backends.s3.S3Storage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+    AWS_S3_ENDPOINT_URL = config('AWS_S3_ENDPOINT_URL', default=None)  # p. ej. http://localhost:9000 para MinIO
+    AWS_S3_REGION_NAME = config('AWS_S3_REGION_NAME', default='us-east-1')
+    AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default=None)
+    AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default=None)
+    AWS_S3_ADDRESSING_STYLE = 'path' if AWS_S3_ENDPOINT_URL else 'auto'  # MinIO no usa subdominios por bucket
+    AWS_S3_SIGNATURE_VERSION = 's3v4'
+    AWS_DEFAULT_ACL = None  # Objetos privados: se descargan con URLs firmadas
+    AWS_S3_FILE_OVERWRITE = False
+    AWS_QUERYSTRING_AUTH = True
+    AWS_QUERYSTRING_EXPIRE = config('AWS_QUERYSTRING_EXPIRE', default=300, cast=int)  # Segundos de validez de las URLs firmadas
+
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
+# Los archivos de más de 2.5MB se escriben en un temporal en disco en vez de en memoria
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB
+DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB (cuerpos que no son archivos)
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10240
 
+# Archivos CSV comprimidos (.csv.gz, .csv.zst, .csv.bz2)
+CSV_MAX_DECOMPRESSED_SIZE = config('CSV_MAX_DECOMPRESSED_SIZE', default=1024 * 1024 * 1024, cast=int)  # 1GB
+
+# Subidas reanudables por partes (reports.uploads)
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Máximo por parte (PATCH)
+CHUNKED_UPLOAD_EXPIRATION = 24 * 60 * 60  # Segundos sin actividad antes de descartar la subida
+CHUNKED_UPLOAD_CLAIM_TIMEOUT = 10 * 60  # Segundos tras los que una petición cortada deja de reservar la subida
+
+# Precargar pandas/matplotlib/ReportLab al iniciar el proceso (workers de análisis)
+REPORTS_PRELOAD_HEAVY = config('REPORTS_PRELOAD_HEAVY', default=False, cast=bool)
+IMPORT_TIME_BUDGET_MS = 800  # Presupuesto de arranque para `manage.py benchmark_imports`
+
+# Exportación de datos
+EXPORT_CHUNK_SIZE = 5000  # Filas leídas por lote del cursor del lado del servidor
+
+# Informes PDF
+PDF_APPENDIX_CHUNK_SIZE = 2000  # Filas leídas por lote al dibujar el anexo completo
+PDF_PROFILE_MEMORY = config('PDF_PROFILE_MEMORY', default=False, cast=bool)  # Memoria por sección (tracemalloc, lento)
+
+# Control de admisión de endpoints pesados (main.admission)
+# Por defecto los endpoints pesados usan como máximo CPUs - 1 cupos en total,
+# dejando capacidad libre para login, dashboard y listados.
+CPU_COUNT = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+ADMISSION_CONTROL_ENABLED = config('ADMISSION_CONTROL_ENABLED', default=True, cast=bool)
+ADMISSION_LOCK_DIR = config('ADMISSION_LOCK_DIR', default=os.path.join(tempfile.gettempdir(), 'generador-informes-admission'))
+ADMISSION_HEAVY_LIMIT = config('ADMISSION_HEAVY_LIMIT', default=max(1, CPU_COUNT - 1), cast=int)
+ADMISSION_LIMITS = {
+    'upload': max(1, ADMISSION_HEAVY_LIMIT // 2),
+    'reprocess': max(1, ADMISSION_HEAVY_LIMIT // 4),
+    'pdf': max(1, ADMISSION_HEAVY_LIMIT // 2),
+}
+ADMISSION_PER_USER_LIMIT = 2  # Operaciones pesadas simultáneas por usuario
+# Hilos por proceso para los análisis en segundo plano (subidas con Prefer: respond-async)
+ANALYSIS_BACKGROUND_WORKERS = config('ANALYSIS_BACKGROUND_WORKERS', default=ADMISSION_LIMITS['upload'], cast=int)
+ADMISSION_RETRY_AFTER = 5  # Segundos sugeridos en el encabezado Retry-After
+
+# Sketches del análisis (reports.sketches): top de productos con memoria acotada
+# y conteos distintos aproximados. Se usan siempre desde ANALYSIS_SKETCH_MIN_ROWS
+# filas, o en todos los archivos con ANALYSIS_SKETCHES=True
+ANALYSIS_SKETCHES = config('ANALYSIS_SKETCHES', default=False, cast=bool)
+ANALYSIS_SKETCH_MIN_ROWS = config('ANALYSIS_SKETCH_MIN_ROWS', default=1000000, cast=int)
+ANALYSIS_SKETCH_CAPACITY = 1000  # Contadores del top de productos (Space-Saving)
+ANALYSIS_HLL_PRECISION = 12  # 4096 registros, error relativo típico de 1.6%
+
+# Anomalías de ventas diarias por producto y región (reports.anomalies)
+ANOMALY_WINDOW_DAYS = 28  # Días previos con los que se compara cada día
+ANOMALY_Z_THRESHOLD = 5.0  # |z| robusto mínimo para marcar un día
+ANOMALY_MIN_ACTIVE_DAYS = 14  # Días con ventas en la ventana para evaluar la serie
+ANOMALY_MAX_STORED = 1000  # Anomalías guardadas por informe (las de mayor |z|)
+
+# Proyección de ventas (reports.forecasting)
+FORECAST_ENABLED = config('FORECAST_ENABLED', default=True, cast=bool)
+FORECAST_TOP_PRODUCTS = 5  # Productos del top que se proyectan además del total
+FORECAST_HORIZON_DAYS = 30  # Horizonte con la serie diaria
+FORECAST_HORIZON_MONTHS = 6  # Horizonte con la serie mensual (24 meses o más de datos)
+FORECAST_TIME_BUDGET = 2.0  # Segundos máximos de ajuste por archivo
+
+# Clientes y vendedores (endpoint reports/<id>/customers/)
+COHORT_MAX_PERIODS = 24  # Meses desde la primera compra guardados por cohorte
+CUSTOMERS_MAX_RESULTS = 1000  # Máximo del parámetro limit (clientes listados)
+
+# Totales por usuario de todos sus informes (endpoint analytics/)
+ANALYTICS_MAX_PRODUCTS = 500  # Máximo del parámetro n (top de productos)
+
+# Comparación entre informes (endpoint reports/compare/)
+COMPARE_MAX_PRODUCTS = 200  # Productos con mayor diferencia incluidos en la respuesta
+COMPARE_CACHE_TIMEOUT = 60 * 60  # segundos
+
+# Inferencia del esquema del CSV (separador, codificación, columnas y tipos)
+SCHEMA_SAMPLE_BYTES = 64 * 1024  # Bytes del inicio del archivo usados como muestra
+SCHEMA_CACHE_TIMEOUT = 30 * 24 * 60 * 60  # Segundos que se recuerda el esquema de cada usuario
+CSV_DATE_DAYFIRST = True  # Ante fechas ambiguas (01/02/2024) se asume día/mes, como en las exportaciones peruanas
+
+# Progreso del procesamiento (stream SSE csv-files/<id>/progress/)
+CSV_READ_CHUNK_ROWS = 50000  # Filas por bloque al leer el CSV
+PROGRESS_CACHE_TIMEOUT = 60 * 60  # Segundos que se conserva el último estado
+PROGRESS_POLL_INTERVAL = 0.5  # Segundos entre consultas a la caché por conexión
+PROGRESS_HEARTBEAT = 15  # Segundos sin eventos antes de enviar un comentario
+PROGRESS_STREAM_TIMEOUT = 10 * 60  # Duración máxima de cada conexión SSE
+PROGRESS_RETRY_MS = 2000  # Espera sugerida al navegador para reconectar
+# Streams SSE simultáneos con vistas síncronas (cada uno ocupa un hilo del
+# worker); con ASYNC_VIEWS el stream es una corrutina y no se limita
+PROGRESS_MAX_STREAMS = config('PROGRESS_MAX_STREAMS', default=4, cast=int)
+
+# Métricas de Prometheus (/metrics). Con varios workers definir además la
+# variable de entorno PROMETHEUS_MULTIPROC_DIR (ver gunicorn.conf.py)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # Vacío = sin autenticación
+
+# Series temporales (endpoint reports/<id>/timeseries/)
+TIMESERIES_DEFAULT_POINTS = 500
+TIMESERIES_MAX_POINTS = 5000
+TIMESERIES_CACHE_TIMEOUT = 60 * 60  # segundos
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from main.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -26,6 +27,9 @@ urlpatterns = [
     path('api/auth/', include('authentication.urls')),
     path('api/', include('reports.urls')),
     path('api/', include('main.urls')),
+    
+    # Métricas de Prometheus
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Servir archivos media en desarrollo
@@ -0,0 +1,23 @@
+"""
+Configuración de gunicorn (se carga automáticamente desde este directorio)
+
+Con PROMETHEUS_MULTIPROC_DIR las métricas de cada worker se guardan en
+archivos de ese directorio: se vacía al arrancar y se marcan como muertos los
+archivos de los workers que terminan.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de los endpoints de lectura (WSGI vs ASGI)
+
+Abre muchas conexiones concurrentes contra un único proceso del servidor y
+mide cuántas peticiones se completan, los errores y la latencia. Con
+--slow-client cada cliente envía la petición lentamente, como un cliente
+móvil o una red congestionada, lo que mantiene ocupado un hilo en WSGI.
+
+Solo usa la biblioteca estándar. Ejemplo:
+
+    gunicorn core.wsgi:application -w 1 --threads 8 -b 127.0.0.1:8000
+    ASYNC_VIEWS=True uvicorn core.asgi:application --workers 1 --port 8001
+
+    python load_test.py --url http://127.0.0.1:8000/api/dashboard/ --email a@b.com --password x
+    python load_test.py --url http://127.0.0.1:8001/api/dashboard/ --email a@b.com --password x
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+def get_token(base_url, email, password):
+    """Obtiene un token de acceso con el endpoint de login"""
+    request = urllib.request.Request(
+        f"{base_url}/api/auth/login/",
+        data=json.dumps({'email': email, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())['access']
+
+async def read_response(reader):
+    """Lee una respuesta HTTP/1.1 completa y devuelve su código de estado"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status, headers.get('connection', '').lower() != 'close'
+
+async def client(url, token, deadline, slow_client, timeout, results):
+    """Cliente virtual que repite peticiones sobre una conexión keep-alive"""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else '')
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        + (f"Authorization: Bearer {token}\r\n" if token else '')
+        + "Accept: application/json\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+
+    writer = None
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(parts.hostname, parts.port or 80), timeout
+                )
+            if slow_client:
+                # Envía la petición en 10 partes repartidas en slow_client segundos
+                step = max(len(request) // 10, 1)
+                for offset in range(0, len(request), step):
+                    writer.write(request[offset:offset + step])
+                    await writer.drain()
+                    await asyncio.sleep(slow_client / 10)
+            else:
+                writer.write(request)
+                await writer.drain()
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+            results['latencies'].append(time.perf_counter() - started)
+            results['statuses'][status] = results['statuses'].get(status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+            results['errors'][type(e).__name__] = results['errors'].get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+                writer = None
+            await asyncio.sleep(0.1)
+    if writer is not None:
+        writer.close()
+
+async def run_level(url, token, concurrency, duration, slow_client, timeout):
+    """Ejecuta `concurrency` clientes durante `duration` segundos"""
+    results = {'latencies': [], 'statuses': {}, 'errors': {}}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        client(url, token, deadline, slow_client, timeout, results) for _ in range(concurrency)
+    ))
+    return results
+
+def percentile(values, fraction):
+    """Percentil por el método del vecino más cercano"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', required=True, help='URL completa del endpoint a probar')
+    parser.add_argument('--token', help='Token JWT de acceso')
+    parser.add_argument('--email', help='Email para obtener el token con el login')
+    parser.add_argument('--password', help='Contraseña para obtener el token con el login')
+    parser.add_argument('--concurrency', default='10,50,200,500', help='Conexiones concurrentes, separadas por coma')
+    parser.add_argument('--duration', type=float, default=15, help='Segundos por nivel de concurrencia')
+    parser.add_argument('--slow-client', type=float, default=0, help='Segundos que tarda cada cliente en enviar la petición')
+    parser.add_argument('--timeout', type=float, default=10, help='Segundos máximos de espera por respuesta')
+    args = parser.parse_args()
+
+    token = args.token
+    if not token and args.email:
+        parts = urlsplit(args.url)
+        token = get_token(f"{parts.scheme}://{parts.netloc}", args.email, args.password)
+
+    print(f"{'conexiones':>10} {'ok':>7} {'errores':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency in [int(value) for value in args.concurrency.split(',')]:
+        results = asyncio.run(run_level(
+            args.url, token, concurrency, args.duration, args.slow_client, args.timeout
+        ))
+        latencies = results['latencies']
+        ok = sum(count for status, count in results['statuses'].items() if status < 400)
+        failed = sum(results['errors'].values()) + len(latencies) - ok
+        print(
+            f"{concurrency:>10} {ok:>7} {failed:>8} {len(latencies) / args.duration:>8.1f}"
+            f" {percentile(latencies, 0.5) * 1000:>8.0f} {percentile(latencies, 0.95) * 1000:>8.0f}"
+            f" {percentile(latencies, 0.99) * 1000:>8.0f}"
+        )
+        if results['errors']:
+            print(f"{'':>10} errores: {results['errors']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Control de admisión para los endpoints que consumen mucha CPU
+
+Cada clase de endpoint pesado (subida, reproceso, PDF) tiene un número
+limitado de cupos compartidos entre todos los procesos del servidor, además
+de un límite global para el conjunto de endpoints pesados y un límite de
+operaciones simultáneas por usuario. Si no hay cupo la petición se rechaza de
+inmediato con 429 y `Retry-After`, de modo que los endpoints livianos (login,
+dashboard, listados) conservan siempre capacidad libre.
+
+Los cupos son archivos bloqueados con `flock`: el sistema operativo los
+libera aunque el proceso termine de forma abrupta. Donde no existe `fcntl`
+(Windows) se usan semáforos locales a cada proceso.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+class AdmissionRejected(Throttled):
+    """Respuesta 429 cuando no hay cupo para atender una petición pesada"""
+    default_detail = 'El servidor está ocupado.'
+    extra_detail_singular = 'Intenta nuevamente en {wait} segundo.'
+    extra_detail_plural = 'Intenta nuevamente en {wait} segundos.'
+
+_local_semaphores = {}
+_local_semaphores_lock = threading.Lock()
+
+def _try_acquire(name, limit):
+    """
+    Intenta ocupar uno de los `limit` cupos de `name` sin esperar
+
+    Devuelve un identificador para liberarlo o None si todos están ocupados.
+    """
+    if fcntl is None:
+        with _local_semaphores_lock:
+            semaphore = _local_semaphores.setdefault(name, threading.BoundedSemaphore(limit))
+        return semaphore if semaphore.acquire(blocking=False) else None
+
+    lock_dir = settings.ADMISSION_LOCK_DIR
+    os.makedirs(lock_dir, exist_ok=True)
+    for slot in range(limit):
+        fd = os.open(os.path.join(lock_dir, f"{name}.{slot}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            os.close(fd)
+    return None
+
+def _release(handle):
+    """Libera un cupo obtenido con `_try_acquire`"""
+    if fcntl is None:
+        handle.release()
+    else:
+        os.close(handle)  # cerrar el descriptor libera el flock
+
+@contextmanager
+def admit(request, endpoint_class):
+    """
+    Reserva los cupos necesarios para atender una petición pesada
+
+    Lanza `AdmissionRejected` (429 con Retry-After) si el usuario ya tiene
+    demasiadas operaciones en curso o si no hay cupo para la clase de endpoint.
+    Los cupos se liberan al salir, salvo los que la vista haya pasado a un
+    trabajo en segundo plano con `detach_admission`.
+    """
+    acquired = []
+    request._admission_handles = acquired
+    if not settings.ADMISSION_CONTROL_ENABLED:
+        yield
+        return
+
+    pools = [
+        (f"user-{request.user.pk}", settings.ADMISSION_PER_USER_LIMIT,
+         'Ya tienes demasiadas operaciones en curso.'),
+        (endpoint_class, settings.ADMISSION_LIMITS[endpoint_class],
+         'El servidor está procesando demasiadas solicitudes de este tipo.'),
+        ('heavy', settings.ADMISSION_HEAVY_LIMIT,
+         'El servidor está ocupado procesando otras solicitudes.'),
+    ]
+
+    try:
+        for name, limit, message in pools:
+            handle = _try_acquire(name, limit)
+            if handle is None:
+                raise AdmissionRejected(wait=settings.ADMISSION_RETRY_AFTER, detail=message)
+            acquired.append(handle)
+        yield
+    finally:
+        release_admission(acquired)
+
+def detach_admission(request):
+    """
+    Quita a la petición en curso sus cupos y los devuelve
+
+    `admit` ya no los libera al terminar la vista: quien los recibe (por
+    ejemplo el análisis en segundo plano) los libera con `release_admission`
+    cuando termina el trabajo, así los trabajos pendientes siguen contando en
+    los límites del usuario y del servidor.
+    """
+    handles = getattr(request, '_admission_handles', [])
+    detached = list(handles)
+    handles.clear()
+    return detached
+
+def release_admission(handles):
+    """Libera los cupos obtenidos con `admit` o con `detach_admission`"""
+    for handle in reversed(handles):
+        _release(handle)
+
+def admission_control(endpoint_class):
+    """
+    Decorador de vistas que aplica `admit` antes de ejecutar la vista
+
+    Debe ir debajo de `api_view`/`permission_classes` para que la petición ya
+    esté autenticada y el 429 lo procese DRF. Para métodos de clases usar
+    `method_decorator(admission_control(...))`.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            with admit(request, endpoint_class):
+                return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+class _AdmittedStream:
+    """Iterable de una respuesta en streaming que libera su cupo al cerrarse"""
+
+    def __init__(self, stream, handle):
+        self.stream = stream
+        self.handle = handle
+
+    def __iter__(self):
+        return iter(self.stream)
+
+    def close(self):
+        # Django llama a close() al terminar la respuesta, aunque el cliente se desconecte
+        if self.handle is not None:
+            _release(self.handle)
+            self.handle = None
+        if hasattr(self.stream, 'close'):
+            self.stream.close()
+
+def admit_stream(stream, name, limit):
+    """
+    Reserva uno de los `limit` cupos de `name` mientras dure una respuesta en
+    streaming (por ejemplo SSE)
+
+    Estos cupos son independientes de los de los endpoints pesados. Lanza
+    `AdmissionRejected` si están todos ocupados.
+    """
+    if not settings.ADMISSION_CONTROL_ENABLED:
+        return stream
+    handle = _try_acquire(name, limit)
+    if handle is None:
+        raise AdmissionRejected(
+            wait=settings.ADMISSION_RETRY_AFTER, detail='Hay demasiadas conexiones de progreso abiertas.'
+        )
+    return _AdmittedStream(stream, handle)
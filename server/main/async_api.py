@@ -0,0 +1,56 @@
+"""
+Utilidades para las vistas async nativas (servidor ASGI)
+
+DRF solo ejecuta vistas síncronas, así que las vistas async de lectura son
+vistas de Django que reutilizan la autenticación JWT, los serializers y el
+renderer de la API para responder exactamente igual que sus equivalentes DRF.
+"""
+
+from functools import wraps
+
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated, NotFound
+
+from authentication.authentication import CachedJWTAuthentication
+from .renderers import ORJSONRenderer
+
+def json_response(data, status=status.HTTP_200_OK):
+    """Respuesta JSON generada con el mismo renderer que la API DRF"""
+    return HttpResponse(
+        ORJSONRenderer().render(data), status=status, content_type=ORJSONRenderer.media_type
+    )
+
+def _exception_response(exc):
+    """Convierte una excepción de DRF en la misma respuesta que produciría DRF"""
+    detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+    response = json_response(detail, status=exc.status_code)
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(None)
+    return response
+
+def async_api_view(methods=('GET',), authenticated=True, authentication_class=CachedJWTAuthentication):
+    """
+    Decorador de vistas async: métodos permitidos, autenticación JWT y errores
+
+    Con `authenticated=True` la vista recibe `request.user` ya resuelto y
+    responde 401 si el token falta o no es válido.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise MethodNotAllowed(request.method)
+                if authenticated:
+                    result = await authentication_class().aauthenticate(request)
+                    if result is None:
+                        raise NotAuthenticated()
+                    request.user, request.auth = result
+                return await view_func(request, *args, **kwargs)
+            except Http404 as exc:
+                return _exception_response(NotFound(*exc.args))
+            except APIException as exc:
+                return _exception_response(exc)
+        return wrapper
+    return decorator
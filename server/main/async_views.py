@@ -0,0 +1,13 @@
+from rest_framework import status
+
+from .async_api import async_api_view, json_response
+
+@async_api_view(authenticated=False)
+async def health_check(request):
+    """
+    Endpoint async para verificar el estado de la API
+    """
+    return json_response({
+        'status': 'healthy',
+        'message': 'API funcionando correctamente'
+    }, status=status.HTTP_200_OK)
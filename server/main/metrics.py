@@ -0,0 +1,167 @@
+"""
+Métricas de Prometheus del servidor
+
+`MetricsMiddleware` registra por vista la latencia, la cantidad y el tiempo de
+las consultas SQL y el tamaño de la respuesta. El análisis de CSV
+(`reports.progress.ProgressTracker`) y la generación de PDF
+(`PDFReportService._measure`) registran la duración de cada etapa.
+
+Todo se expone en formato de texto de Prometheus en `/metrics`. Con varios
+workers (gunicorn) se debe definir PROMETHEUS_MULTIPROC_DIR: cada proceso
+escribe sus valores en archivos de ese directorio y el endpoint los agrega
+(ver `gunicorn.conf.py`).
+"""
+
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+)
+
+# Segundos: de 5 ms a 2 minutos (incluye reprocesos y PDFs grandes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+SIZE_BUCKETS = tuple(256 * 4 ** exponent for exponent in range(10))  # 256B a 64MB
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Duración de las peticiones HTTP',
+    ['method', 'view', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Consultas SQL ejecutadas por petición',
+    ['view'], buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_QUERY_SECONDS = Histogram(
+    'http_request_db_seconds', 'Tiempo total en consultas SQL por petición',
+    ['view'], buckets=LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Tamaño del cuerpo de las respuestas (sin streaming)',
+    ['view'], buckets=SIZE_BUCKETS
+)
+
+ANALYSIS_STAGE_SECONDS = Histogram(
+    'csv_analysis_stage_seconds', 'Duración de cada etapa del análisis de CSV',
+    ['stage'], buckets=LATENCY_BUCKETS
+)
+ANALYSIS_STAGE_ROWS = Counter(
+    'csv_analysis_stage_rows', 'Filas procesadas en cada etapa del análisis de CSV',
+    ['stage']
+)
+ANALYSIS_FILES = Counter(
+    'csv_analysis_files', 'Archivos CSV procesados según el resultado',
+    ['status']
+)
+
+PDF_SECTION_SECONDS = Histogram(
+    'pdf_section_seconds', 'Duración de cada sección de la generación de PDF',
+    ['section'], buckets=LATENCY_BUCKETS
+)
+PDF_GENERATION_SECONDS = Histogram(
+    'pdf_generation_seconds', 'Duración total de la generación de un PDF',
+    buckets=LATENCY_BUCKETS
+)
+PDF_SIZE = Histogram(
+    'pdf_size_bytes', 'Tamaño de los PDFs generados', buckets=SIZE_BUCKETS
+)
+
+# Contador [consultas, segundos] de la petición en curso; lo comparten los
+# hilos de sync_to_async porque copian el contexto con la misma lista
+_query_stats = ContextVar('query_stats', default=None)
+
+def record_query(execute, sql, params, many, context):
+    """
+    `execute_wrapper` instalado en todas las conexiones (ver MainConfig.ready)
+    """
+    stats = _query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """Receptor de `connection_created`"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+def view_label(request):
+    """Nombre de la URL resuelta, para no crear una serie por cada id"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    return match.view_name or match.route
+
+class MetricsMiddleware:
+    """
+    Registra latencia, consultas SQL y tamaño de respuesta de cada petición
+
+    Debe ir primero en MIDDLEWARE para medir el tiempo total y el tamaño final
+    (ya comprimido) de la respuesta. Funciona con WSGI y ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = [0, 0.0]
+        token = _query_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_stats.reset(token)
+        self._observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = [0, 0.0]
+        token = _query_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_stats.reset(token)
+        self._observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    def _observe(self, request, response, elapsed, stats):
+        view = view_label(request)
+        REQUEST_LATENCY.labels(request.method, view, str(response.status_code)).observe(elapsed)
+        REQUEST_QUERIES.labels(view).observe(stats[0])
+        REQUEST_QUERY_SECONDS.labels(view).observe(stats[1])
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view).observe(len(response.content))
+
+def observe_analysis_stage(stage, seconds, rows):
+    ANALYSIS_STAGE_SECONDS.labels(stage).observe(seconds)
+    if rows:
+        ANALYSIS_STAGE_ROWS.labels(stage).inc(rows)
+
+def get_registry():
+    """
+    Registro a exportar: en modo multiproceso agrega los archivos de todos los
+    workers en vez de leer solo los valores del proceso actual
+    """
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    from prometheus_client import multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def render_metrics():
+    """Devuelve el contenido y el content type de la respuesta de /metrics"""
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
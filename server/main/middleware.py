@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'text/', 'application/javascript', 'application/xml')
+# Los eventos SSE deben llegar al cliente sin esperar a llenar un bloque comprimido
+UNCOMPRESSED_CONTENT_TYPES = ('text/event-stream',)
+
+def parse_accept_encoding(header):
+    """Devuelve las codificaciones aceptadas con su peso q (q=0 significa rechazada)"""
+    encodings = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Comprime respuestas de texto/JSON grandes con brotli o gzip
+
+    La codificación se negocia con Accept-Encoding (brotli tiene prioridad si
+    está instalado) y solo se comprimen las respuestas que superan
+    RESPONSE_COMPRESSION_MIN_SIZE bytes. El caso gzip reutiliza
+    GZipMiddleware de Django.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '').lower()
+        if (not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+                or content_type.startswith(UNCOMPRESSED_CONTENT_TYPES)):
+            return response
+
+        if not response.streaming and len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE:
+            return response
+
+        encodings = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and encodings.get('br', 0) > 0:
+            return self._brotli_response(response)
+        if encodings.get('gzip', 0) > 0:
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def _brotli_response(self, response):
+        """
+        Comprime la respuesta con brotli
+        """
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = settings.RESPONSE_COMPRESSION_BROTLI_QUALITY
+
+        if response.streaming:
+            original_iterator = response.streaming_content
+            if response.is_async:
+                async def brotli_wrapper():
+                    compressor = brotli.Compressor(quality=quality)
+                    async for chunk in original_iterator:
+                        data = compressor.process(chunk) + compressor.flush()
+                        if data:
+                            yield data
+                    yield compressor.finish()
+            else:
+                def brotli_wrapper():
+                    compressor = brotli.Compressor(quality=quality)
+                    for chunk in original_iterator:
+                        data = compressor.process(chunk) + compressor.flush()
+                        if data:
+                            yield data
+                    yield compressor.finish()
+            response.streaming_content = brotli_wrapper()
+            del response.headers['Content-Length']
+        else:
+            compressed_content = brotli.compress(response.content, quality=quality)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
@@ -1,3 +1,228 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import shutil
+import tempfile
+import uuid
+from decimal import Decimal
 
-# Create your tests here.
+import numpy as np
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .admission import (
+    AdmissionRejected, admission_control, admit, admit_stream, detach_admission, release_admission
+)
+from .middleware import CompressionMiddleware, brotli, parse_accept_encoding
+from .renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+
+    PAYLOAD = {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'created_at': datetime.datetime(2024, 3, 15, 10, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+        'local_time': datetime.datetime(2024, 3, 15, 10, 30, 5, 123456),
+        'date': datetime.date(2024, 3, 15),
+        'time': datetime.time(8, 15, 30, 250000),
+        'duration': datetime.timedelta(minutes=2, seconds=3),
+        'total_sales': Decimal('1234.56'),
+        'label': gettext_lazy('Ventas'),
+        'values': np.array([1.5, 2.25]),
+        'count': np.int64(7),
+        'products': ['Café', 'Té\u2028verde', None, True, 0.1],
+        'nested': {'region': 'Norte', 'data': [1, 2, 3]},
+    }
+
+    def test_same_output_as_drf(self):
+        self.assertEqual(ORJSONRenderer().render(self.PAYLOAD), JSONRenderer().render(self.PAYLOAD))
+
+    def test_same_content_with_indent(self):
+        media_type = 'application/json; indent=4'
+        orjson_output = ORJSONRenderer().render(self.PAYLOAD, media_type)
+        self.assertIn(b'\n  "', orjson_output)
+        self.assertEqual(json.loads(orjson_output), json.loads(JSONRenderer().render(self.PAYLOAD, media_type)))
+
+    def test_non_finite_floats_are_null(self):
+        self.assertEqual(ORJSONRenderer().render({'growth': float('nan'), 'ratio': float('inf')}),
+                         b'{"growth":null,"ratio":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'growth': float('nan')})
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+@override_settings(RESPONSE_COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    CONTENT = json.dumps({'data': list(range(200))}).encode()
+
+    def _process(self, response, accept_encoding):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding('gzip;q=0.5, br, identity;q=0, x;q=abc'),
+                         {'gzip': 0.5, 'br': 1.0, 'identity': 0.0, 'x': 0.0})
+
+    def test_gzip(self):
+        response = self._process(HttpResponse(self.CONTENT, content_type='application/json'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.CONTENT)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_brotli_is_preferred(self):
+        if brotli is None:
+            self.skipTest('brotli no está instalado')
+        response = self._process(HttpResponse(self.CONTENT, content_type='application/json'), 'gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+
+    def test_brotli_streaming(self):
+        if brotli is None:
+            self.skipTest('brotli no está instalado')
+        chunks = [self.CONTENT[:300], self.CONTENT[300:]]
+        response = self._process(StreamingHttpResponse(iter(chunks), content_type='text/csv'), 'br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(b''.join(response.streaming_content)), self.CONTENT)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self._process(HttpResponse(b'{"ok":true}', content_type='application/json'), 'gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_rejected_encodings(self):
+        response = self._process(HttpResponse(self.CONTENT, content_type='application/json'), 'gzip;q=0, br;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_binary_and_event_streams_are_not_compressed(self):
+        for content_type in ('application/pdf', 'text/event-stream'):
+            with self.subTest(content_type=content_type):
+                response = self._process(HttpResponse(self.CONTENT, content_type=content_type), 'gzip, br')
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class _User:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@admission_control('pdf')
+def heavy_view(request):
+    return Response({'ok': True})
+
+
+@override_settings(
+    ADMISSION_CONTROL_ENABLED=True,
+    ADMISSION_PER_USER_LIMIT=2,
+    ADMISSION_LIMITS={'pdf': 2, 'upload': 3},
+    ADMISSION_HEAVY_LIMIT=3,
+    ADMISSION_RETRY_AFTER=7,
+)
+class AdmissionTests(SimpleTestCase):
+
+    def setUp(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        settings_override = override_settings(ADMISSION_LOCK_DIR=lock_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _request(self, user_id):
+        request = RequestFactory().post('/')
+        request.user = _User(user_id)
+        return request
+
+    def _assert_rejected(self, user_id, endpoint_class):
+        with self.assertRaises(AdmissionRejected) as context:
+            with admit(self._request(user_id), endpoint_class):
+                pass
+        self.assertEqual(context.exception.status_code, 429)
+        self.assertEqual(context.exception.wait, 7)
+        return context.exception
+
+    def test_per_user_limit(self):
+        with admit(self._request(1), 'pdf'), admit(self._request(1), 'upload'):
+            error = self._assert_rejected(1, 'upload')
+            self.assertIn('demasiadas operaciones en curso', str(error.detail))
+            # Otro usuario todavía tiene cupo
+            with admit(self._request(2), 'upload'):
+                pass
+
+    def test_endpoint_class_limit(self):
+        with admit(self._request(1), 'pdf'), admit(self._request(2), 'pdf'):
+            error = self._assert_rejected(3, 'pdf')
+            self.assertIn('de este tipo', str(error.detail))
+            with admit(self._request(3), 'upload'):
+                pass
+
+    def test_heavy_limit(self):
+        with admit(self._request(1), 'pdf'), admit(self._request(2), 'upload'), admit(self._request(3), 'upload'):
+            error = self._assert_rejected(4, 'upload')
+            self.assertIn('ocupado procesando', str(error.detail))
+
+    def test_slots_are_released(self):
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                with admit(self._request(1), 'pdf'):
+                    raise ValueError
+        with admit(self._request(1), 'pdf'), admit(self._request(1), 'pdf'):
+            pass
+
+    def test_rejected_request_releases_partial_slots(self):
+        with admit(self._request(1), 'pdf'), admit(self._request(2), 'pdf'):
+            self._assert_rejected(3, 'pdf')
+        # El cupo por usuario tomado antes del rechazo quedó libre
+        with admit(self._request(3), 'pdf'), admit(self._request(3), 'upload'):
+            pass
+
+    @override_settings(ADMISSION_CONTROL_ENABLED=False)
+    def test_disabled(self):
+        with admit(self._request(1), 'pdf'), admit(self._request(1), 'pdf'), admit(self._request(1), 'pdf'):
+            pass
+
+    def test_detached_slots_are_held_until_released(self):
+        request = self._request(1)
+        with admit(request, 'pdf'):
+            handles = detach_admission(request)
+        # El trabajo en segundo plano sigue ocupando un cupo del usuario
+        with admit(self._request(1), 'upload'):
+            self._assert_rejected(1, 'upload')
+        release_admission(handles)
+        with admit(self._request(1), 'pdf'), admit(self._request(1), 'upload'):
+            pass
+
+    def test_view_responds_429_with_retry_after(self):
+        factory = APIRequestFactory()
+        user = _User(1)
+
+        request = factory.post('/')
+        force_authenticate(request, user)
+        self.assertEqual(heavy_view(request).status_code, 200)
+
+        with admit(self._request(2), 'pdf'), admit(self._request(3), 'pdf'):
+            request = factory.post('/')
+            force_authenticate(request, user)
+            response = heavy_view(request)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+
+    def test_stream_slot_is_held_until_close(self):
+        first = admit_stream(iter([b'a']), 'progress', 1)
+        with self.assertRaises(AdmissionRejected):
+            admit_stream(iter([b'b']), 'progress', 1)
+        self.assertEqual(list(first), [b'a'])
+        first.close()
+        admit_stream(iter([b'c']), 'progress', 1).close()
@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    from .async_views import health_check
+else:
+    health_check = views.health_check
+
 urlpatterns = [
     path('', views.api_root, name='api-root'),
-    path('health/', views.health_check, name='health-check'),
+    path('health/', health_check, name='health-check'),
 ] 
\ No newline at end of file
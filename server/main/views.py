@@ -1,9 +1,16 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 
+from .metrics import render_metrics
+
 # Create your views here.
 
 @api_view(['GET'])
@@ -41,3 +48,18 @@ def health_check(request):
         'status': 'healthy',
         'message': 'API funcionando correctamente'
     }, status=status.HTTP_200_OK)
+
+@require_GET
+def metrics_view(request):
+    """
+    Métricas en formato de texto de Prometheus
+
+    Si METRICS_TOKEN está definido se exige `Authorization: Bearer <token>`.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import CSVFile, Report, SalesData
+from .models import (
+    Category, CSVFile, CustomerMetrics, Product, Region, Report, SalesAnomaly, SalesData, SellerPerformance,
+    UploadSession, UserSalesAggregate
+)
 
 @admin.register(CSVFile)
 class CSVFileAdmin(admin.ModelAdmin):
@@ -7,9 +10,10 @@ class CSVFileAdmin(admin.ModelAdmin):
     Administrador para archivos CSV
     """
     list_display = ('original_name', 'user', 'status', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('status', 'created_at')
-    search_fields = ('original_name', 'user__email', 'user__username')
-    readonly_fields = ('created_at', 'updated_at')
+    search_fields = ('original_name', 'user__email', 'user__username', 'checksum')
+    readonly_fields = ('checksum', 'created_at', 'updated_at')
     ordering = ('-created_at',)
 
 @admin.register(Report)
@@ -18,9 +22,11 @@ class ReportAdmin(admin.ModelAdmin):
     Administrador para informes
     """
     list_display = ('csv_file', 'total_sales', 'total_records', 'created_at')
+    list_select_related = ('csv_file__user',)
+    raw_id_fields = ('csv_file',)
     list_filter = ('created_at',)
     search_fields = ('csv_file__original_name', 'csv_file__user__email')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('pdf_template_version', 'pdf_metrics', 'created_at', 'updated_at')
     ordering = ('-created_at',)
     
     fieldsets = (
@@ -38,7 +44,7 @@ class ReportAdmin(admin.ModelAdmin):
             'fields': ('auto_insights',)
         }),
         ('Archivos', {
-            'fields': ('pdf_file',)
+            'fields': ('pdf_file', 'pdf_template_version', 'pdf_metrics')
         }),
         ('Fechas', {
             'fields': ('created_at', 'updated_at')
@@ -51,8 +57,10 @@ class SalesDataAdmin(admin.ModelAdmin):
     Administrador para datos de ventas
     """
     list_display = ('product', 'date', 'sales_amount', 'region', 'category')
-    list_filter = ('date', 'region', 'category')
-    search_fields = ('product', 'region', 'category')
+    list_select_related = ('product', 'region', 'category')
+    raw_id_fields = ('product', 'category', 'region')
+    list_filter = ('date',)
+    search_fields = ('product__name', 'region__name', 'category__name')
     ordering = ('-date',)
     
     fieldsets = (
@@ -66,4 +74,74 @@ class SalesDataAdmin(admin.ModelAdmin):
             'fields': ('additional_data',),
             'classes': ('collapse',)
         }),
-    ) 
\ No newline at end of file
+    ) 
+
+@admin.register(Product, Category, Region)
+class DimensionAdmin(admin.ModelAdmin):
+    """
+    Administrador para productos, categorías y regiones
+    """
+    list_display = ('name', 'user')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    search_fields = ('name', 'user__email')
+    ordering = ('user', 'name')
+
+@admin.register(SalesAnomaly)
+class SalesAnomalyAdmin(admin.ModelAdmin):
+    """
+    Administrador para anomalías de ventas
+    """
+    list_display = ('product', 'region', 'date', 'sales_amount', 'expected', 'score', 'direction', 'report')
+    list_select_related = ('report__csv_file',)
+    raw_id_fields = ('report',)
+    list_filter = ('direction', 'date')
+    search_fields = ('product', 'region', 'report__csv_file__original_name')
+    ordering = ('-date',)
+
+@admin.register(CustomerMetrics)
+class CustomerMetricsAdmin(admin.ModelAdmin):
+    """
+    Administrador para métricas RFM de clientes
+    """
+    list_display = ('customer', 'segment', 'orders', 'total_sales', 'recency_days', 'report')
+    list_select_related = ('report__csv_file',)
+    raw_id_fields = ('report',)
+    list_filter = ('segment',)
+    search_fields = ('customer', 'report__csv_file__original_name')
+    ordering = ('-total_sales',)
+
+@admin.register(SellerPerformance)
+class SellerPerformanceAdmin(admin.ModelAdmin):
+    """
+    Administrador para desempeño de vendedores
+    """
+    list_display = ('seller', 'total_sales', 'records', 'customers', 'share', 'report')
+    list_select_related = ('report__csv_file',)
+    raw_id_fields = ('report',)
+    search_fields = ('seller', 'report__csv_file__original_name')
+    ordering = ('-total_sales',)
+
+@admin.register(UserSalesAggregate)
+class UserSalesAggregateAdmin(admin.ModelAdmin):
+    """
+    Administrador para los totales por usuario
+    """
+    list_display = ('user', 'dimension', 'key', 'total_sales', 'records', 'reports', 'updated_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    list_filter = ('dimension',)
+    search_fields = ('key', 'user__email')
+    readonly_fields = ('updated_at',)
+    ordering = ('user', 'dimension', '-total_sales')
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    """
+    Administrador para subidas por partes
+    """
+    list_display = ('original_name', 'user', 'offset', 'total_size', 'updated_at')
+    list_select_related = ('user',)
+    search_fields = ('original_name', 'user__email')
+    readonly_fields = ('id', 'file_name', 'offset', 'header_validated', 'created_at', 'updated_at')
+    ordering = ('-updated_at',)
@@ -0,0 +1,150 @@
+"""
+Agregados de ventas por usuario a través de todos sus informes
+
+Cada informe completado guarda sus totales por mes, producto y región en
+`ReportAggregate`; `UserSalesAggregate` acumula esos totales por usuario.
+Al completar, reprocesar o eliminar un informe solo se aplica la diferencia
+entre su aporte anterior y el nuevo, así las vistas del usuario se leen de
+los agregados sin recorrer las filas de `SalesData`.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CSVFile, ReportAggregate, UserSalesAggregate
+
+DIMENSIONS = ('month', 'product', 'region')
+
+# Claves por consulta al leer los agregados existentes de un usuario
+LOOKUP_BATCH = 500
+
+def report_contributions(df):
+    """
+    Totales del DataFrame limpio de un informe por mes, producto y región
+
+    Devuelve una lista de (dimensión, clave, ventas, registros).
+    """
+    columns = {'month': df['date'].dt.to_period('M').astype(str), 'product': df['product'], 'region': df['region']}
+    contributions = []
+    for dimension in DIMENSIONS:
+        totals = df['sales_amount'].groupby(columns[dimension].astype(str).str.slice(0, 255)).agg(['sum', 'count'])
+        contributions.extend(
+            (dimension, key, Decimal(str(round(total, 2))), int(count))
+            for key, total, count in zip(totals.index, totals['sum'], totals['count'])
+        )
+    return contributions
+
+def _lock_user(user_id):
+    """Serializa las actualizaciones de los agregados de un mismo usuario"""
+    get_user_model().objects.select_for_update().filter(pk=user_id).exists()
+
+def _replace_contributions(report, user_id, contributions):
+    """
+    Reemplaza el aporte de un informe y aplica la diferencia a los agregados
+    de su usuario (debe llamarse dentro de una transacción)
+    """
+    _lock_user(user_id)
+    deltas = defaultdict(lambda: [Decimal('0'), 0, 0])
+    previous = ReportAggregate.objects.filter(report=report)
+    for dimension, key, total, records in previous.values_list('dimension', 'key', 'total_sales', 'records'):
+        delta = deltas[(dimension, key)]
+        delta[0] -= total
+        delta[1] -= records
+        delta[2] -= 1
+    for dimension, key, total, records in contributions:
+        delta = deltas[(dimension, key)]
+        delta[0] += total
+        delta[1] += records
+        delta[2] += 1
+
+    previous.delete()
+    ReportAggregate.objects.bulk_create(
+        [
+            ReportAggregate(report=report, dimension=dimension, key=key, total_sales=total, records=records)
+            for dimension, key, total, records in contributions
+        ],
+        batch_size=1000,
+    )
+    _apply_deltas(user_id, deltas)
+
+def _apply_deltas(user_id, deltas):
+    """Suma las diferencias a los agregados del usuario; borra las claves sin informes"""
+    existing = {}
+    for dimension in DIMENSIONS:
+        keys = [key for (delta_dimension, key) in deltas if delta_dimension == dimension]
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            rows = UserSalesAggregate.objects.filter(
+                user_id=user_id, dimension=dimension, key__in=keys[start:start + LOOKUP_BATCH]
+            )
+            existing.update({(row.dimension, row.key): row for row in rows})
+
+    now = timezone.now()
+    to_create, to_update, to_delete = [], [], []
+    for (dimension, key), (total, records, reports) in deltas.items():
+        row = existing.get((dimension, key))
+        if row is None:
+            if reports > 0:
+                to_create.append(UserSalesAggregate(
+                    user_id=user_id, dimension=dimension, key=key,
+                    total_sales=total, records=records, reports=reports,
+                ))
+        elif row.reports + reports <= 0:
+            to_delete.append(row.pk)
+        elif total or records or reports:
+            row.total_sales += total
+            row.records += records
+            row.reports += reports
+            row.updated_at = now
+            to_update.append(row)
+
+    UserSalesAggregate.objects.bulk_create(to_create, batch_size=1000)
+    UserSalesAggregate.objects.bulk_update(to_update, ['total_sales', 'records', 'reports', 'updated_at'], batch_size=1000)
+    if to_delete:
+        UserSalesAggregate.objects.filter(pk__in=to_delete).delete()
+
+def update_report_aggregates(report, df):
+    """Registra (o reemplaza) el aporte de un informe completado"""
+    with transaction.atomic():
+        _replace_contributions(report, report.csv_file.user_id, report_contributions(df))
+
+def remove_report_aggregates(report):
+    """Quita el aporte de un informe (eliminado o cuyo reprocesamiento falló)"""
+    with transaction.atomic():
+        if ReportAggregate.objects.filter(report=report).exists():
+            _replace_contributions(report, report.csv_file.user_id, [])
+
+def remove_report_aggregates_on_delete(sender, instance, **kwargs):
+    """Receptor de pre_delete de Report (también en las eliminaciones en cascada)"""
+    remove_report_aggregates(instance)
+
+def _chart(rows):
+    return {
+        'labels': [key for key, total, records in rows],
+        'data': [float(total) for key, total, records in rows],
+        'records': [records for key, total, records in rows],
+    }
+
+def get_user_analytics(user, top_n=10):
+    """
+    Serie mensual, top de productos y ventas por región de todos los
+    informes completados del usuario
+    """
+    aggregates = UserSalesAggregate.objects.filter(user=user)
+    months = list(aggregates.filter(dimension='month').order_by('key').values_list('key', 'total_sales', 'records'))
+    products = aggregates.filter(dimension='product')
+    top_products = list(products.order_by('-total_sales', 'key').values_list('key', 'total_sales', 'records')[:top_n])
+    regions = list(aggregates.filter(dimension='region').order_by('-total_sales', 'key').values_list('key', 'total_sales', 'records'))
+
+    return {
+        'reports_count': CSVFile.objects.filter(user=user, status='completed', report__isnull=False).count(),
+        'total_sales': float(sum(total for key, total, records in months)),
+        'total_records': sum(records for key, total, records in months),
+        'products_count': products.count(),
+        'sales_by_month': _chart(months),
+        'top_products': _chart(top_products),
+        'sales_by_region': _chart(regions),
+    }
@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class ReportsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reports'
+
+    def ready(self):
+        from django.db.models.signals import pre_delete
+        from .analytics import remove_report_aggregates_on_delete
+
+        # Quita el aporte de un informe a los agregados del usuario al eliminarlo
+        pre_delete.connect(remove_report_aggregates_on_delete, sender='reports.Report', dispatch_uid='report-aggregates')
+
+        if settings.REPORTS_PRELOAD_HEAVY:
+            from .warmup import warm_up
+            warm_up()
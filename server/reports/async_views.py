@@ -0,0 +1,90 @@
+"""
+Vistas async nativas de los endpoints de lectura
+
+Se montan en lugar de las vistas DRF de `views.py` cuando ASYNC_VIEWS=True y
+el proyecto corre bajo un servidor ASGI. Usan el ORM async y los mismos
+serializers, por lo que las respuestas son idénticas.
+"""
+
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
+
+from authentication.authentication import QueryParamJWTAuthentication
+from main.async_api import async_api_view, json_response
+from .models import CSVFile, Report, SalesData
+from .progress import aprogress_events
+from .serializers import CSVFileSerializer, ReportSerializer, ReportSummarySerializer, SAMPLE_RELATED
+from .views import DASHBOARD_FILE_STATS, DASHBOARD_REPORT_STATS, build_dashboard_summary
+
+@async_api_view()
+async def user_csv_files_view(request):
+    """
+    Listar archivos CSV del usuario
+    """
+    csv_files = [
+        csv_file async for csv_file in
+        CSVFile.objects.filter(user=request.user).order_by('-created_at')
+    ]
+    return json_response(CSVFileSerializer(csv_files, many=True).data)
+
+@async_api_view()
+async def user_reports_view(request):
+    """
+    Listar informes del usuario
+    """
+    reports = [
+        report async for report in
+        Report.objects.filter(csv_file__user=request.user).select_related('csv_file').defer('sketches', 'forecast').order_by('-created_at')
+    ]
+    return json_response(ReportSummarySerializer(reports, many=True).data)
+
+@async_api_view()
+async def report_detail_view(request, pk):
+    """
+    Obtener los detalles de un informe específico
+    """
+    try:
+        report = await Report.objects.filter(
+            csv_file__user=request.user
+        ).select_related('csv_file').defer('sketches').prefetch_related(
+            Prefetch(
+                'sales_data',
+                queryset=SalesData.objects.select_related(*SAMPLE_RELATED).order_by('id')[:ReportSerializer.SAMPLE_SIZE],
+                to_attr='sales_data_sample_rows'
+            )
+        ).aget(pk=pk)
+    except Report.DoesNotExist:
+        raise Http404("No Report matches the given query.")
+    return json_response(ReportSerializer(report, context={'request': request}).data)
+
+@async_api_view()
+async def dashboard_summary_view(request):
+    """
+    Resumen del dashboard del usuario
+    """
+    user_csv_files = CSVFile.objects.filter(user=request.user)
+    user_reports = Report.objects.filter(csv_file__user=request.user)
+    
+    file_stats = await user_csv_files.aaggregate(**DASHBOARD_FILE_STATS)
+    report_stats = await user_reports.aaggregate(**DASHBOARD_REPORT_STATS)
+    recent_reports = [
+        report async for report in
+        user_reports.select_related('csv_file').defer('sketches', 'forecast').order_by('-created_at')[:5]
+    ]
+    
+    return json_response(build_dashboard_summary(file_stats, report_stats, recent_reports))
+
+@async_api_view(authentication_class=QueryParamJWTAuthentication)
+async def csv_file_progress_view(request, csv_file_id):
+    """
+    Stream SSE con el avance del procesamiento de un archivo (sin ocupar un
+    hilo mientras espera; acepta el token en `?token=`)
+    """
+    try:
+        csv_file = await CSVFile.objects.only('id', 'status').aget(id=csv_file_id, user=request.user)
+    except CSVFile.DoesNotExist:
+        raise Http404("No CSVFile matches the given query.")
+    response = StreamingHttpResponse(aprogress_events(csv_file), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Evita que nginx acumule los eventos
+    return response
@@ -0,0 +1,83 @@
+"""
+Procesamiento de archivos CSV en segundo plano
+
+Con `Prefer: respond-async` (o `?async=true`) la subida responde 202 con el
+`csv_file_id` antes de analizar el archivo, así el cliente puede abrir el
+stream de progreso (`csv-files/<id>/progress/`) desde el inicio. El análisis
+corre en un pool de hilos del proceso con ANALYSIS_BACKGROUND_WORKERS hilos.
+
+Cada análisis conserva los cupos de admisión de la subida que lo originó
+(usuario, 'upload' y 'heavy') hasta terminar: los análisis pendientes cuentan
+en ADMISSION_PER_USER_LIMIT y la cola no puede crecer más allá de los cupos de
+subida, porque sin cupo la siguiente subida recibe 429.
+
+Si el proceso termina con análisis pendientes, esos archivos quedan en
+'uploaded' o 'processing' y se recuperan con el endpoint de reproceso.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from main.admission import release_admission
+
+from .models import CSVFile
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ANALYSIS_BACKGROUND_WORKERS, thread_name_prefix='csv-analysis'
+            )
+        return _executor
+
+def wants_async(request):
+    """Indica si el cliente pidió la respuesta antes del procesamiento"""
+    prefer = request.headers.get('Prefer', '')
+    if 'respond-async' in [value.strip().lower() for value in prefer.split(',')]:
+        return True
+    return str(request.query_params.get('async', '')).lower() in ('1', 'true', 'yes')
+
+def _analyze(csv_file_id, admission=()):
+    from .services import DataAnalysisService
+
+    try:
+        csv_file = CSVFile.objects.get(pk=csv_file_id)
+        DataAnalysisService(csv_file).process_csv()
+    except CSVFile.DoesNotExist:
+        pass
+    except Exception:
+        # process_csv ya marcó el archivo con error y publicó el progreso
+        logger.exception("Error procesando el archivo %s en segundo plano", csv_file_id)
+    finally:
+        # Las conexiones son propias de cada hilo: se cierran al terminar
+        connections.close_all()
+        release_admission(admission)
+
+def submit_analysis(csv_file, admission=()):
+    """
+    Encola el análisis de un CSVFile y vuelve de inmediato
+
+    `admission` son los cupos obtenidos con `detach_admission`; se liberan al
+    terminar el análisis. Se encola al confirmar la transacción en curso para
+    que el hilo siempre encuentre el archivo guardado.
+    """
+    admission = list(admission)
+
+    def submit():
+        try:
+            _get_executor().submit(_analyze, csv_file.pk, admission)
+        except Exception:
+            release_admission(admission)
+            raise
+
+    transaction.on_commit(submit)
@@ -0,0 +1,69 @@
+"""
+Columnas esperadas en los archivos CSV de ventas
+
+Compartido por el análisis con pandas (`services`) y por la validación
+incremental del encabezado en las subidas por partes (`uploads`).
+"""
+
+import csv
+
+# Posibles nombres de columnas (en español o inglés) y su nombre normalizado
+COLUMN_MAPPING = {
+    'fecha': 'date',
+    'producto': 'product',
+    'categoría': 'category',
+    'categoria': 'category',
+    'región': 'region',
+    'region': 'region',
+    'ventas': 'sales_amount',
+    'venta': 'sales_amount',
+    'monto': 'sales_amount',
+    'cantidad': 'quantity',
+    'qty': 'quantity',
+    'cliente': 'customer',
+    'id_cliente': 'customer',
+    'customer_id': 'customer',
+    'vendedor': 'seller',
+    'vendedora': 'seller',
+    'salesperson': 'seller'
+}
+
+REQUIRED_COLUMNS = ['date', 'product', 'sales_amount']
+
+# Separadores admitidos (las exportaciones de Excel en español usan ';')
+DELIMITERS = (',', ';', '\t', '|')
+
+def normalize_column(name):
+    """Convierte un nombre de columna del CSV a su nombre normalizado"""
+    name = name.lower().strip()
+    return COLUMN_MAPPING.get(name, name)
+
+def sniff_delimiter(lines):
+    """
+    Elige el separador que da más columnas en el encabezado y la misma
+    cantidad en al menos el 80% de las líneas de muestra
+    """
+    best, best_columns = ',', 0
+    for delimiter in DELIMITERS:
+        counts = [len(row) for row in csv.reader(lines, delimiter=delimiter)]
+        if not counts or counts[0] < 2:
+            continue
+        if sum(1 for count in counts if count == counts[0]) < 0.8 * len(counts):
+            continue
+        if counts[0] > best_columns:
+            best, best_columns = delimiter, counts[0]
+    return best
+
+def validate_header_line(line):
+    """
+    Valida la línea de encabezado de un CSV
+
+    Lanza ValueError con el mismo mensaje que el análisis si falta alguna
+    columna requerida.
+    """
+    line = line.lstrip('\ufeff')
+    header = next(csv.reader([line], delimiter=sniff_delimiter([line])), [])
+    columns = {normalize_column(name) for name in header}
+    for col in REQUIRED_COLUMNS:
+        if col not in columns:
+            raise ValueError(f"Columna requerida '{col}' no encontrada en el CSV")
@@ -0,0 +1,116 @@
+"""
+Comparación entre dos informes (período contra período)
+
+Las regiones y los meses se comparan a partir de los agregados ya guardados
+en cada `Report`; los productos se totalizan en la base de datos (un GROUP BY
+por informe). Las diferencias y tasas de crecimiento se calculan con pandas
+sobre esos totales, nunca sobre las filas de ventas.
+"""
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .models import Product, SalesData
+
+def report_fingerprint(report):
+    """Identifica el contenido de un informe: cambia cada vez que se reprocesa"""
+    return f"{report.pk}:{report.updated_at.timestamp()}"
+
+def _chart_totals(data):
+    """Convierte un agregado guardado ({'labels': [...], 'data': [...]}) en una Series"""
+    if not data or not data.get('labels'):
+        return pd.Series(dtype='float64')
+    return pd.Series(data['data'], index=data['labels'], dtype='float64').groupby(level=0).sum()
+
+def _product_totals(base, target):
+    """
+    Ventas por producto de cada informe; se agrupa por la clave entera del
+    producto y los nombres se leen después, una sola vez por producto
+    """
+    rows = (
+        SalesData.objects
+        .filter(report__in=[base, target])
+        .values('report_id', 'product_id')
+        .annotate(total=Sum('sales_amount'))
+        .values_list('report_id', 'product_id', 'total')
+    )
+    frame = pd.DataFrame(list(rows), columns=['report_id', 'product_id', 'total'])
+    names = dict(Product.objects.filter(pk__in=frame['product_id'].unique().tolist()).values_list('id', 'name'))
+    frame['product'] = frame['product_id'].map(names)
+    frame['total'] = frame['total'].astype('float64')
+    totals = frame.pivot_table(index='product', columns='report_id', values='total', aggfunc='sum')
+    return (
+        totals.get(base.pk, pd.Series(dtype='float64')),
+        totals.get(target.pk, pd.Series(dtype='float64')),
+    )
+
+def compare_series(base, target, limit=None):
+    """
+    Diferencias entre dos series de totales alineadas por etiqueta
+
+    Las etiquetas que faltan en una de las series cuentan como 0. El
+    crecimiento (%) es None cuando la base es 0. El resultado se ordena por
+    etiqueta o, con `limit`, por diferencia absoluta y recortado a `limit`.
+    """
+    frame = pd.concat({'base': base, 'target': target}, axis=1).fillna(0.0).sort_index()
+    frame['delta'] = frame['target'] - frame['base']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(frame['base'] != 0, frame['delta'] / frame['base'].abs() * 100, np.nan)
+    frame['growth'] = np.round(growth, 2)
+    if limit is not None:
+        frame = frame.reindex(frame['delta'].abs().sort_values(ascending=False, kind='stable').index[:limit])
+
+    frame = frame.round({'base': 2, 'target': 2, 'delta': 2})
+    frame = frame.astype(object).where(frame.notna(), None)
+    return [
+        {'key': key, 'base': row['base'], 'target': row['target'], 'delta': row['delta'], 'growth': row['growth']}
+        for key, row in zip(frame.index.tolist(), frame.to_dict('records'))
+    ]
+
+def _report_info(report):
+    return {
+        'id': report.pk,
+        'name': report.csv_file.original_name,
+        'total_sales': float(report.total_sales or 0),
+        'total_records': report.total_records,
+        'date_range_start': report.date_range_start,
+        'date_range_end': report.date_range_end,
+    }
+
+def build_comparison(base, target):
+    """
+    Compara `target` contra `base` por producto, región y mes
+    """
+    base_products, target_products = _product_totals(base, target)
+    totals = compare_series(
+        pd.Series({'total': float(base.total_sales or 0)}),
+        pd.Series({'total': float(target.total_sales or 0)}),
+    )[0]
+    del totals['key']
+
+    return {
+        'base': _report_info(base),
+        'target': _report_info(target),
+        'totals': totals,
+        'products_count': len(base_products.index.union(target_products.index)),
+        'products': compare_series(base_products, target_products, limit=settings.COMPARE_MAX_PRODUCTS),
+        'regions': compare_series(_chart_totals(base.sales_by_region), _chart_totals(target.sales_by_region)),
+        'months': compare_series(_chart_totals(base.sales_by_date), _chart_totals(target.sales_by_date)),
+    }
+
+def get_cached_comparison(base, target):
+    """
+    Devuelve la comparación desde la caché o la calcula
+
+    La clave usa la huella de ambos informes: reprocesar cualquiera de los
+    dos invalida la comparación guardada.
+    """
+    key = f"reports:compare:{report_fingerprint(base)}:{report_fingerprint(target)}"
+    data = cache.get(key)
+    if data is None:
+        data = build_comparison(base, target)
+        cache.set(key, data, settings.COMPARE_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,134 @@
+"""
+Archivos CSV comprimidos (.csv.gz, .csv.zst, .csv.bz2)
+
+Los archivos se guardan comprimidos tal como se suben y se descomprimen al
+vuelo mientras se leen, con un límite de bytes descomprimidos
+(CSV_MAX_DECOMPRESSED_SIZE) que protege de archivos que se expanden demasiado.
+"""
+
+import bz2
+import gzip
+import io
+
+from django.conf import settings
+
+# Extensión aceptada -> formato de compresión (None = sin comprimir)
+CSV_EXTENSIONS = {
+    '.csv': None,
+    '.csv.gz': 'gzip',
+    '.csv.zst': 'zstd',
+    '.csv.bz2': 'bz2',
+}
+
+# Primeros bytes de cada formato
+MAGIC_NUMBERS = {
+    'gzip': b'\x1f\x8b',
+    'zstd': b'\x28\xb5\x2f\xfd',
+    'bz2': b'BZh',
+}
+
+class DecompressedSizeExceeded(ValueError):
+    pass
+
+def get_compression(name):
+    """
+    Devuelve el formato de compresión según la extensión del archivo
+
+    Lanza ValueError si la extensión no es de un CSV admitido.
+    """
+    lower_name = name.lower()
+    # Se prueban primero las extensiones más largas (.csv.gz antes que .csv)
+    for extension in sorted(CSV_EXTENSIONS, key=len, reverse=True):
+        if lower_name.endswith(extension):
+            return CSV_EXTENSIONS[extension]
+    raise ValueError(f"Solo se permiten archivos {', '.join(CSV_EXTENSIONS)}")
+
+def strip_csv_extension(name):
+    """Quita la extensión de CSV (comprimido o no) de un nombre de archivo"""
+    lower_name = name.lower()
+    for extension in sorted(CSV_EXTENSIONS, key=len, reverse=True):
+        if lower_name.endswith(extension):
+            return name[:-len(extension)]
+    return name
+
+def check_magic_number(fileobj, compression):
+    """
+    Verifica que el contenido corresponda al formato indicado por la extensión
+    """
+    if compression is None:
+        return
+    position = fileobj.tell()
+    start = fileobj.read(len(MAGIC_NUMBERS[compression]))
+    fileobj.seek(position)
+    if start != MAGIC_NUMBERS[compression]:
+        raise ValueError(f"El contenido del archivo no corresponde al formato {compression}")
+
+class LimitedReader(io.RawIOBase):
+    """
+    Envuelve un stream descomprimido y falla si se leen más de `max_size` bytes
+    """
+
+    def __init__(self, stream, max_size):
+        self._stream = stream
+        self._remaining = max_size
+        self.max_size = max_size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        if len(data) > self._remaining:
+            raise DecompressedSizeExceeded(
+                f"El archivo descomprimido supera el máximo de {self.max_size // (1024 * 1024)}MB permitido."
+            )
+        self._remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._stream.close()
+        super().close()
+
+def decompress_stream(fileobj, compression, max_size=None):
+    """
+    Devuelve un stream binario con el contenido descomprimido de `fileobj`
+    """
+    if compression is None:
+        return fileobj
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=fileobj, mode='rb')
+    elif compression == 'bz2':
+        stream = bz2.BZ2File(fileobj, mode='rb')
+    else:
+        import zstandard
+        stream = zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=True)
+    if max_size is None:
+        max_size = settings.CSV_MAX_DECOMPRESSED_SIZE
+    return io.BufferedReader(LimitedReader(stream, max_size), buffer_size=1024 * 1024)
+
+def open_csv(field_file, name=None):
+    """
+    Abre el archivo de un CSVFile y lo descomprime al vuelo si corresponde
+    """
+    compression = get_compression(name or field_file.name)
+    field_file.open('rb')
+    return decompress_stream(field_file, compression)
+
+def read_decompressed_prefix(fileobj, compression, limit):
+    """
+    Lee hasta `limit` bytes descomprimidos del inicio de un archivo que puede
+    estar incompleto (subidas por partes en curso)
+    """
+    stream = decompress_stream(fileobj, compression, max_size=float('inf'))
+    data = b''
+    try:
+        while len(data) < limit:
+            block = stream.read1(min(4096, limit - len(data))) if compression else stream.read(limit - len(data))
+            if not block:
+                break
+            data += block
+    except (EOFError, OSError):
+        # El archivo comprimido todavía no está completo
+        pass
+    return data
@@ -0,0 +1,135 @@
+"""
+Análisis de clientes y vendedores de un informe
+
+- RFM: por cliente, recencia (días desde la última compra hasta el fin del
+  informe), frecuencia (días distintos con compras) y monto. Cada medida se
+  puntúa de 1 a 5 por quintiles y con recencia y frecuencia se asigna un
+  segmento.
+- Cohortes: clientes agrupados por el mes de su primera compra y porcentaje
+  que vuelve a comprar en cada mes posterior.
+- Vendedores: ventas, registros, clientes y productos distintos, ticket
+  promedio y participación.
+
+Todo se calcula con groupbys de pandas sobre el DataFrame limpio, durante el
+procesamiento, y se guarda en tablas ligadas al informe.
+"""
+
+import numpy as np
+import pandas as pd
+
+SCORE_BINS = 5
+
+def _score(values):
+    """
+    Puntaje de 1 a SCORE_BINS por quintiles; los empates reciben el menor
+    puntaje de su grupo (muchos clientes con una sola compra quedan en 1)
+    """
+    return np.ceil(values.rank(method='min', pct=True) * SCORE_BINS).clip(1, SCORE_BINS).astype('int64')
+
+def _segment(r_score, f_score):
+    conditions = [
+        (r_score >= 4) & (f_score >= 4),
+        (r_score >= 3) & (f_score >= 3),
+        r_score >= 4,
+        r_score == 3,
+        f_score >= 3,
+        r_score == 2,
+    ]
+    choices = ['champions', 'loyal', 'new', 'potential', 'at_risk', 'hibernating']
+    return np.select(conditions, choices, default='lost')
+
+def _customer_sales(df):
+    """Filas con cliente: (cliente como texto, día, monto)"""
+    if 'customer' not in df.columns:
+        return pd.DataFrame(columns=['customer', 'day', 'sales'])
+    sales = df[df['customer'].notna()]
+    return pd.DataFrame({
+        'customer': sales['customer'].astype(str).str.slice(0, 255),
+        'day': sales['date'].dt.normalize(),
+        'sales': sales['sales_amount'],
+    })
+
+def rfm_table(df):
+    """
+    Métricas RFM por cliente, ordenadas por monto descendente
+
+    La recencia se mide respecto del último día del informe (no de hoy) para
+    que un archivo histórico no deje a todos los clientes como perdidos.
+    """
+    sales = _customer_sales(df)
+    columns = [
+        'customer', 'first_purchase', 'last_purchase', 'orders', 'total_sales',
+        'recency_days', 'r_score', 'f_score', 'm_score', 'segment',
+    ]
+    if sales.empty:
+        return pd.DataFrame(columns=columns)
+
+    table = sales.groupby('customer').agg(
+        first_purchase=('day', 'min'),
+        last_purchase=('day', 'max'),
+        orders=('day', 'nunique'),
+        total_sales=('sales', 'sum'),
+    )
+    table['recency_days'] = (df['date'].max().normalize() - table['last_purchase']).dt.days
+    table['r_score'] = _score(-table['recency_days'])
+    table['f_score'] = _score(table['orders'])
+    table['m_score'] = _score(table['total_sales'])
+    table['segment'] = _segment(table['r_score'], table['f_score'])
+    return table.reset_index().sort_values('total_sales', ascending=False, kind='stable')[columns]
+
+def cohort_retention(df, max_periods=24):
+    """
+    Clientes activos por cohorte (mes de la primera compra) y meses desde ella
+
+    Devuelve un DataFrame (cohort, period, customers, retention,
+    sales_amount); el período 0 es el mes de la primera compra.
+    """
+    sales = _customer_sales(df)
+    columns = ['cohort', 'period', 'customers', 'retention', 'sales_amount']
+    if sales.empty:
+        return pd.DataFrame(columns=columns)
+
+    month = sales['day'].dt.year * 12 + sales['day'].dt.month - 1
+    first = month.groupby(sales['customer']).transform('min')
+    period = month - first
+    keep = period <= max_periods
+    frame = pd.DataFrame({
+        'cohort': first[keep], 'period': period[keep],
+        'customer': sales.loc[keep, 'customer'], 'sales': sales.loc[keep, 'sales'],
+    })
+    cohorts = frame.groupby(['cohort', 'period']).agg(
+        customers=('customer', 'nunique'), sales_amount=('sales', 'sum')
+    ).reset_index()
+
+    sizes = cohorts.loc[cohorts['period'] == 0].set_index('cohort')['customers']
+    cohorts['retention'] = cohorts['customers'] / cohorts['cohort'].map(sizes)
+    cohorts['cohort'] = pd.to_datetime({
+        'year': cohorts['cohort'] // 12, 'month': cohorts['cohort'] % 12 + 1, 'day': 1,
+    })
+    return cohorts[columns]
+
+def seller_performance(df):
+    """
+    Desempeño por vendedor, ordenado por ventas descendentes
+    """
+    columns = ['seller', 'total_sales', 'records', 'customers', 'products', 'average_ticket', 'share']
+    if 'seller' not in df.columns or df['seller'].isna().all():
+        return pd.DataFrame(columns=columns)
+
+    sales = df[df['seller'].notna()]
+    seller = sales['seller'].astype(str).str.slice(0, 255)
+    aggregations = {
+        'total_sales': ('sales_amount', 'sum'),
+        'records': ('sales_amount', 'size'),
+        'products': ('product', 'nunique'),
+    }
+    if 'customer' in sales.columns:
+        aggregations['customers'] = ('customer', 'nunique')
+    table = sales.groupby(seller).agg(**aggregations)
+    if 'customers' not in table.columns:
+        table['customers'] = 0
+    table['average_ticket'] = table['total_sales'] / table['records']
+    total = df['sales_amount'].sum()
+    table['share'] = table['total_sales'] / total * 100 if total else 0.0
+    table.index.name = 'seller'
+    return table.reset_index().sort_values('total_sales', ascending=False, kind='stable')[columns]
@@ -0,0 +1,102 @@
+"""
+Detección del formato de fecha y conversión rápida de la columna de fechas
+
+`pd.to_datetime` sin `format` adivina el formato con el primer valor: si es
+ambiguo (01/02/2024) lee todo el archivo como mes/día aunque sea una
+exportación peruana con día/mes. Aquí el formato se elige con una muestra de
+valores distintos y la columna completa se convierte con ese `format` exacto;
+solo los valores que no lo cumplen pasan por el análisis flexible.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Formatos candidatos: ISO (con o sin hora), día primero y mes primero
+ISO_FORMATS = ('ISO8601', '%Y/%m/%d', '%Y/%m/%d %H:%M', '%Y/%m/%d %H:%M:%S')
+DAYFIRST_FORMATS = (
+    '%d/%m/%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S',
+    '%d-%m-%Y', '%d-%m-%Y %H:%M', '%d-%m-%Y %H:%M:%S',
+    '%d.%m.%Y', '%d/%m/%y',
+)
+MONTHFIRST_FORMATS = (
+    '%m/%d/%Y', '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S',
+    '%m-%d-%Y', '%m-%d-%Y %H:%M', '%m-%d-%Y %H:%M:%S',
+    '%m/%d/%y',
+)
+
+def candidate_formats(dayfirst=True):
+    """Formatos en orden de preferencia: ante un empate gana el primero"""
+    if dayfirst:
+        return ISO_FORMATS + DAYFIRST_FORMATS + MONTHFIRST_FORMATS
+    return ISO_FORMATS + MONTHFIRST_FORMATS + DAYFIRST_FORMATS
+
+def detect_date_format(values, dayfirst=True, sample_size=200, sample_rows=10000):
+    """
+    Formato que convierte más valores de la muestra, o None si ninguno sirve
+
+    Se prueban los primeros `sample_size` valores distintos (de las primeras
+    `sample_rows` filas). Con fechas ambiguas (todos los días <= 12) empatan
+    día/mes y mes/día y `dayfirst` decide.
+    """
+    head = pd.Series(values).iloc[:sample_rows].dropna()
+    sample = pd.Series(pd.unique(head)[:sample_size], dtype='object').astype('str').str.strip()
+    sample = sample[sample != '']
+    if sample.empty:
+        return None
+
+    best, best_parsed = None, 0
+    for date_format in candidate_formats(dayfirst):
+        parsed = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+        if parsed > best_parsed:
+            best, best_parsed = date_format, parsed
+        if best_parsed == len(sample):
+            break
+    return best
+
+def _convert(values, date_format, dayfirst):
+    """
+    Convierte con el formato exacto y reintenta lo que no lo cumple con el
+    análisis flexible; devuelve (fechas, máscara de las recuperadas así)
+    """
+    if date_format is None:
+        dates = pd.to_datetime(values, format='mixed', dayfirst=dayfirst, errors='coerce', cache=False)
+        return dates, dates.notna().to_numpy()
+
+    dates = pd.to_datetime(values, format=date_format, errors='coerce', cache=False)
+    retry = (dates.isna() & values.notna()).to_numpy()
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry], format='mixed', dayfirst=dayfirst, errors='coerce', cache=False)
+    return dates, retry & dates.notna().to_numpy()
+
+def parse_dates(values, date_format=None, dayfirst=True, cache_ratio=0.5):
+    """
+    Convierte una columna de texto a fechas
+
+    Devuelve (fechas, estadísticas). Los valores que no cumplen el formato
+    exacto se intentan con el análisis flexible (respetando `dayfirst`) y
+    los que tampoco se reconocen quedan en NaT.
+
+    Las columnas de fechas suelen repetir pocos valores: si en las primeras
+    filas hay menos de `cache_ratio` valores distintos por fila, cada valor
+    se convierte una sola vez y el resultado se expande a toda la columna.
+    """
+    if date_format is None:
+        date_format = detect_date_format(values, dayfirst)
+
+    head = values.iloc[:10000]
+    if len(head) and head.nunique() < cache_ratio * len(head):
+        codes, uniques = pd.factorize(values)
+        converted, recovered = _convert(pd.Series(uniques, dtype='object'), date_format, dayfirst)
+        # factorize marca los nulos con -1: se agrega NaT al final para ellos
+        dates = np.append(converted.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT'))[codes]
+        dates = pd.Series(dates, index=values.index, name=values.name)
+        fallback = int(np.append(recovered, False)[codes].sum())
+    else:
+        dates, recovered = _convert(values, date_format, dayfirst)
+        fallback = int(recovered.sum())
+
+    return dates, {
+        'date_format': date_format,
+        'fallback_dates': fallback,
+        'invalid_dates': int(dates.isna().sum()),
+    }
@@ -0,0 +1,55 @@
+"""
+Claves enteras de las dimensiones de ventas (producto, categoría y región)
+
+Al guardar las ventas, cada lote de filas resuelve sus nombres con un mapa en
+memoria; los nombres que aún no están se crean con un único
+`bulk_create(ignore_conflicts=True)` y se vuelven a leer para conocer su id.
+Así dos procesos que guardan el mismo producto a la vez no fallan por la
+restricción de unicidad.
+"""
+
+from .models import Category, Product, Region
+
+# Nombres por consulta al crear y leer dimensiones
+LOOKUP_BATCH = 500
+
+class DimensionMap:
+    """
+    Mapa nombre -> id de una dimensión de un usuario, que crea los nombres
+    nuevos a demanda
+    """
+
+    def __init__(self, model, user_id):
+        self.model = model
+        self.user_id = user_id
+        self.max_length = model._meta.get_field('name').max_length
+        self.ids = {}
+
+    def clean(self, name):
+        """Nombre tal como se guarda (texto recortado al largo del campo)"""
+        return str(name)[:self.max_length]
+
+    def resolve(self, names):
+        """Se asegura de que todos los nombres tengan id y devuelve el mapa"""
+        missing = list({self.clean(name) for name in names} - self.ids.keys())
+        for start in range(0, len(missing), LOOKUP_BATCH):
+            batch = missing[start:start + LOOKUP_BATCH]
+            self.model.objects.bulk_create(
+                [self.model(user_id=self.user_id, name=name) for name in batch],
+                ignore_conflicts=True,
+            )
+            self.ids.update(
+                self.model.objects.filter(user_id=self.user_id, name__in=batch).values_list('name', 'id')
+            )
+        return self.ids
+
+    def get(self, name):
+        return self.ids[self.clean(name)]
+
+def dimension_maps(user_id):
+    """Mapas de producto, categoría y región de un usuario"""
+    return {
+        'product': DimensionMap(Product, user_id),
+        'category': DimensionMap(Category, user_id),
+        'region': DimensionMap(Region, user_id),
+    }
@@ -0,0 +1,188 @@
+import csv
+import io
+import tempfile
+import zlib
+from itertools import islice
+
+from django.conf import settings
+
+from .compression import strip_csv_extension
+
+EXPORT_COLUMNS = ['date', 'product', 'category', 'region', 'sales_amount', 'quantity']
+# Campos de SalesData de cada columna (las dimensiones se leen por nombre)
+EXPORT_FIELDS = ['date', 'product__name', 'category__name', 'region__name', 'sales_amount', 'quantity']
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Filas de datos por hoja de Excel (el límite es 1.048.576 incluyendo el encabezado)
+XLSX_MAX_ROWS = 1048575
+
+class StreamSink(io.RawIOBase):
+    """
+    Destino de escritura en memoria que se vacía cada vez que se entregan sus bytes
+
+    Lleva la cuenta de la posición total escrita para que los escritores que
+    consultan `tell()` (como Parquet) generen desplazamientos correctos.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+class ReportDataExporter:
+    """
+    Exporta los datos de ventas de un informe en streaming y con memoria constante
+    """
+
+    def __init__(self, report, export_format, compress=False):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Formato no soportado: {export_format}")
+        self.report = report
+        self.export_format = export_format
+        self.compress = compress
+        self.chunk_size = settings.EXPORT_CHUNK_SIZE
+        self.extra_columns = self._get_extra_columns()
+
+    @property
+    def content_type(self):
+        return 'application/gzip' if self.compress else EXPORT_FORMATS[self.export_format][0]
+
+    @property
+    def filename(self):
+        base_name = strip_csv_extension(self.report.csv_file.original_name)
+        filename = f"{base_name}_datos.{EXPORT_FORMATS[self.export_format][1]}"
+        return f"{filename}.gz" if self.compress else filename
+
+    def _get_extra_columns(self):
+        """
+        Obtiene las columnas adicionales del informe
+
+        Todas las filas de un informe provienen del mismo CSV y guardan las
+        mismas claves en `additional_data`, por lo que basta con la primera fila.
+        """
+        first = self.report.sales_data.order_by('id').values_list('additional_data', flat=True).first()
+        return list(first.keys()) if first else []
+
+    def iter_chunks(self):
+        """
+        Recorre las ventas con un cursor del lado del servidor en lotes de filas
+        """
+        rows = (
+            self.report.sales_data
+            .order_by('id')
+            .values_list(*EXPORT_FIELDS, 'additional_data')
+            .iterator(chunk_size=self.chunk_size)
+        )
+        extra_columns = self.extra_columns
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield [
+                row[:-1] + tuple((row[-1] or {}).get(column) for column in extra_columns)
+                for row in chunk
+            ]
+
+    def stream(self):
+        """
+        Devuelve un iterador de bytes con el archivo exportado
+        """
+        writer = getattr(self, f'_stream_{self.export_format}')
+        stream = writer()
+        return self._gzip(stream) if self.compress else stream
+
+    def _gzip(self, stream):
+        """
+        Comprime al vuelo un iterador de bytes en formato gzip
+        """
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for data in stream:
+            compressed = compressor.compress(data)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def _stream_csv(self):
+        sink = StreamSink()
+        text = io.TextIOWrapper(sink, encoding='utf-8', newline='', write_through=True)
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS + self.extra_columns)
+        yield sink.drain()
+        for chunk in self.iter_chunks():
+            writer.writerows(chunk)
+            yield sink.drain()
+
+    def _stream_xlsx(self):
+        from openpyxl import Workbook
+
+        # El formato XLSX es un ZIP que solo puede cerrarse al final: se escribe
+        # en modo write_only a un archivo temporal y luego se envía por bloques
+        headers = EXPORT_COLUMNS + self.extra_columns
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Datos')
+        sheet.append(headers)
+        sheet_rows = 0
+        for chunk in self.iter_chunks():
+            for row in chunk:
+                if sheet_rows == XLSX_MAX_ROWS:
+                    sheet = workbook.create_sheet(f'Datos {len(workbook.worksheets) + 1}')
+                    sheet.append(headers)
+                    sheet_rows = 0
+                sheet.append(row)
+                sheet_rows += 1
+
+        with tempfile.TemporaryFile() as tmp:
+            workbook.save(tmp)
+            tmp.seek(0)
+            while True:
+                data = tmp.read(64 * 1024)
+                if not data:
+                    break
+                yield data
+
+    def _stream_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema(
+            [
+                ('date', pa.date32()),
+                ('product', pa.string()),
+                ('category', pa.string()),
+                ('region', pa.string()),
+                ('sales_amount', pa.decimal128(10, 2)),
+                ('quantity', pa.int64()),
+            ]
+            + [(column, pa.string()) for column in self.extra_columns]
+        )
+        sink = StreamSink()
+        # Cada lote se escribe como un row group y se envía de inmediato
+        with pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression='snappy') as writer:
+            for chunk in self.iter_chunks():
+                columns = list(zip(*chunk))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                yield sink.drain()
+        yield sink.drain()
@@ -0,0 +1,195 @@
+"""
+Proyección de ventas con Holt-Winters aditivo
+
+Se ajusta a la vez la serie total del informe y la de sus productos
+principales: las series forman una matriz y cada paso de la recursión se
+evalúa con NumPy para todas las series y todas las combinaciones de
+parámetros de la grilla. Por cada serie se elige la combinación con menor
+error de pronóstico a un paso.
+
+Con 24 meses o más se usa la serie mensual (estacionalidad anual); si no, la
+diaria con estacionalidad semanal. Si la serie no cubre dos temporadas se
+ajusta Holt sin estacionalidad.
+"""
+
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.0, 0.01, 0.05, 0.1, 0.2)
+GAMMAS = (0.0, 0.05, 0.1, 0.2, 0.3)
+
+# Cantidad mínima de puntos para proyectar y cuantil normal de las bandas (95%)
+MIN_POINTS = 14
+Z_SCORE = 1.96
+
+class ForecastTimeout(Exception):
+    """El ajuste superó el presupuesto de tiempo"""
+
+def build_series(df, products, min_months=24):
+    """
+    Arma la matriz de series (total y productos) con la frecuencia elegida
+
+    Devuelve (frecuencia, temporada, etiquetas de las fechas, claves, matriz
+    series x tiempo) con los períodos sin ventas en 0.
+    """
+    months = df['date'].dt.to_period('M')
+    if months.nunique() >= min_months:
+        frequency, season_length, periods = 'month', 12, months
+        index = pd.period_range(months.min(), months.max(), freq='M')
+    else:
+        frequency, season_length, periods = 'day', 7, df['date'].dt.normalize()
+        index = pd.date_range(periods.min(), periods.max(), freq='D')
+
+    total = df.groupby(periods)['sales_amount'].sum().reindex(index, fill_value=0.0)
+    selected = df['product'].isin(products)
+    by_product = (
+        df[selected]
+        .groupby([df.loc[selected, 'product'], periods[selected]])['sales_amount'].sum()
+        .unstack(fill_value=0.0)
+        .reindex(index=list(products), columns=index, fill_value=0.0)
+    )
+    matrix = np.vstack([total.to_numpy(dtype='float64')[None, :], by_product.to_numpy(dtype='float64')])
+    return frequency, season_length, index, ['total'] + list(products), matrix
+
+def _initial_state(y, season_length):
+    """Nivel, tendencia y estacionalidad iniciales a partir de las dos primeras temporadas"""
+    first = y[:, :season_length].mean(axis=1)
+    second = y[:, season_length:2 * season_length].mean(axis=1)
+    trend = (second - first) / season_length
+    season = y[:, :season_length] - first[:, None]
+    return first, trend, season
+
+def fit_holt_winters(y, season_length, deadline=None):
+    """
+    Ajusta Holt-Winters aditivo a todas las filas de `y` (series x tiempo)
+
+    Recorre el tiempo una sola vez evaluando en paralelo todas las series y
+    todas las combinaciones (alpha, beta, gamma). Lanza ForecastTimeout si
+    se supera `deadline` (time.perf_counter()).
+    """
+    n_series, n_points = y.shape
+    if n_points < 2 * season_length:
+        season_length = 1
+    grid = np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS if season_length > 1 else (0.0,))))
+    alpha, beta, gamma = (grid[:, i][None, :] for i in range(3))
+
+    level0, trend0, season0 = _initial_state(y, season_length)
+    level = np.repeat(level0[:, None], len(grid), axis=1)
+    trend = np.repeat(trend0[:, None], len(grid), axis=1)
+    season = np.repeat(season0[:, None, :], len(grid), axis=1)
+    sse = np.zeros_like(level)
+
+    # El error se acumula desde la segunda temporada: la primera se usó para inicializar
+    start = season_length if season_length > 1 else 1
+    for t in range(n_points):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise ForecastTimeout()
+        observed = y[:, t][:, None]
+        seasonal = season[:, :, t % season_length]
+        if t >= start:
+            sse += (observed - (level + trend + seasonal)) ** 2
+        new_level = alpha * (observed - seasonal) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, t % season_length] = gamma * (observed - new_level) + (1 - gamma) * seasonal
+        level = new_level
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n_series)
+    return {
+        'season_length': season_length,
+        'params': grid[best],
+        'level': level[rows, best],
+        'trend': trend[rows, best],
+        'season': season[rows, best],
+        'sigma': np.sqrt(sse[rows, best] / max(n_points - start, 1)),
+        'next_index': n_points,
+    }
+
+def forecast(fit, horizon):
+    """
+    Proyecta `horizon` períodos con bandas de confianza del 95%
+
+    La varianza del error a k pasos usa la aproximación clásica de
+    Holt-Winters aditivo: sigma² (1 + Σ_{j<k} (alpha (1 + j beta) + gamma [j múltiplo de m])²).
+    """
+    season_length = fit['season_length']
+    steps = np.arange(1, horizon + 1)
+    season_index = (fit['next_index'] + steps - 1) % season_length
+    mean = (
+        fit['level'][:, None]
+        + steps[None, :] * fit['trend'][:, None]
+        + fit['season'][:, season_index]
+    )
+
+    alpha, beta, gamma = (fit['params'][:, i][:, None] for i in range(3))
+    j = np.arange(1, horizon)[None, :]
+    seasonal_hit = (j % season_length == 0) if season_length > 1 else np.zeros_like(j, dtype=bool)
+    c = alpha * (1 + j * beta) + gamma * seasonal_hit
+    variance = np.concatenate([np.ones((len(mean), 1)), 1 + np.cumsum(c ** 2, axis=1)], axis=1)
+    width = Z_SCORE * fit['sigma'][:, None] * np.sqrt(variance)
+    return mean, mean - width, mean + width
+
+def build_forecast(df, top_products, horizon_days=30, horizon_months=6, time_budget=None):
+    """
+    Proyección de la serie total y de `top_products` para guardar en Report.forecast
+
+    Con `time_budget` (segundos) se ajusta primero solo la serie total y los
+    productos se omiten si el tiempo no alcanza. Devuelve {} si la serie es
+    demasiado corta.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget else None
+    if df.empty:
+        return {}
+    frequency, season_length, index, keys, matrix = build_series(df, top_products)
+    if matrix.shape[1] < MIN_POINTS:
+        return {}
+    horizon = horizon_months if frequency == 'month' else horizon_days
+
+    fits = []
+    truncated = False
+    for rows in (slice(0, 1), slice(1, None)):
+        if not len(matrix[rows]):
+            continue
+        try:
+            fits.append((rows, fit_holt_winters(matrix[rows], season_length, deadline)))
+        except ForecastTimeout:
+            truncated = True
+            break
+    if not fits:
+        return {}
+
+    if frequency == 'month':
+        future = pd.period_range(index[-1] + 1, periods=horizon, freq='M')
+    else:
+        future = pd.date_range(index[-1] + pd.Timedelta(days=1), periods=horizon, freq='D')
+    labels = [str(label.date()) if frequency == 'day' else str(label) for label in future]
+
+    series = []
+    for rows, fit in fits:
+        mean, lower, upper = forecast(fit, horizon)
+        for i, key in enumerate(keys[rows]):
+            series.append({
+                'key': key,
+                'forecast': np.round(mean[i], 2).tolist(),
+                # Las ventas no son negativas: la banda inferior se corta en 0
+                'lower': np.round(np.maximum(lower[i], 0), 2).tolist(),
+                'upper': np.round(upper[i], 2).tolist(),
+                'params': dict(zip(('alpha', 'beta', 'gamma'), fit['params'][i].tolist())),
+                'rmse': round(float(fit['sigma'][i]), 2),
+            })
+
+    return {
+        'method': 'holt_winters_additive',
+        'frequency': frequency,
+        'season_length': fits[0][1]['season_length'],
+        'horizon': horizon,
+        'labels': labels,
+        'series': series,
+        'truncated': truncated,
+        'seconds': round(time.perf_counter() - started, 4),
+    }
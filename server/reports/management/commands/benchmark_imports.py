@@ -0,0 +1,104 @@
+"""
+Mide el tiempo de arranque de un proceso Django y verifica su presupuesto
+
+Cada medición se hace en un intérprete nuevo que ejecuta django.setup() y
+carga todas las URLs (y por lo tanto todas las vistas), como lo haría un
+worker web antes de atender su primera petición.
+
+Ejemplos:
+    python manage.py benchmark_imports
+    python manage.py benchmark_imports --repeat 10 --budget-ms 1200 --top 15
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.warmup import HEAVY_MODULES
+
+CHILD_CODE = '''
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+startup = time.perf_counter() - started
+heavy = sorted({name.split('.')[0] for name in sys.modules} & set(%(heavy)r))
+warm = None
+if 'importtime' not in sys._xoptions:
+    from reports.warmup import warm_up
+    warm = warm_up()
+print(json.dumps({'startup': startup, 'heavy': heavy, 'warm_up': warm}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de importación al arrancar y falla si supera el presupuesto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Número de procesos medidos (se usa la mediana)')
+        parser.add_argument(
+            '--budget-ms', type=float, default=settings.IMPORT_TIME_BUDGET_MS,
+            help='Tiempo máximo de arranque en milisegundos'
+        )
+        parser.add_argument('--top', type=int, default=10, help='Cantidad de paquetes más lentos a mostrar')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, REPORTS_PRELOAD_HEAVY='False')
+        code = CHILD_CODE % {'heavy': HEAVY_MODULES}
+
+        samples = []
+        import_times = {}
+        for index in range(max(options['repeat'], 1)):
+            command = [sys.executable, '-c', code]
+            if index == 0:
+                command[1:1] = ['-X', 'importtime']
+            result = subprocess.run(command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise CommandError(f"El proceso de medición falló:\n{result.stderr}")
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+            if index == 0:
+                import_times = self._parse_import_times(result.stderr)
+
+        # La primera medición usa -X importtime, que agrega sobrecarga
+        timed = samples[1:] or samples
+        startup_ms = statistics.median(sample['startup'] for sample in timed) * 1000
+        warm_up = [sample['warm_up'] for sample in samples if sample['warm_up'] is not None]
+        heavy = sorted({name for sample in samples for name in sample['heavy']})
+
+        self.stdout.write(f"Arranque (setup + URLs): {startup_ms:.0f} ms (presupuesto {options['budget_ms']:.0f} ms)")
+        if warm_up:
+            self.stdout.write(f"warm_up() de librerías pesadas: {statistics.median(warm_up) * 1000:.0f} ms")
+        self.stdout.write("Paquetes más lentos al arrancar (-X importtime, acumulado):")
+        slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:options['top']]
+        for name, microseconds in slowest:
+            self.stdout.write(f"  {microseconds / 1000:8.1f} ms  {name}")
+
+        errors = []
+        if heavy:
+            errors.append(f"librerías pesadas importadas al arrancar: {', '.join(heavy)}")
+        if startup_ms > options['budget_ms']:
+            errors.append(f"el arranque ({startup_ms:.0f} ms) supera el presupuesto")
+        if errors:
+            raise CommandError('; '.join(errors))
+        self.stdout.write(self.style.SUCCESS('✅ Arranque dentro del presupuesto.'))
+
+    def _parse_import_times(self, stderr):
+        """
+        Obtiene el tiempo acumulado de los paquetes de primer nivel
+        """
+        times = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if name.startswith('  ') or not cumulative.strip().isdigit():
+                continue
+            times[name.strip()] = times.get(name.strip(), 0) + int(cumulative)
+        return times
@@ -0,0 +1,124 @@
+"""
+Benchmark de serialización JSON y compresión de la respuesta de un informe
+
+Compara el JSONRenderer estándar de DRF con ORJSONRenderer sobre el payload
+de detalle de un informe y muestra el tamaño comprimido con gzip y brotli.
+
+Ejemplos:
+    python manage.py benchmark_json
+    python manage.py benchmark_json --scenario xl --copies 50
+    python manage.py benchmark_json --report 42
+"""
+
+import gzip
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from main.renderers import ORJSONRenderer
+from .benchmark_pdf import SCENARIOS, build_synthetic_service
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de serialización y los bytes transferidos del detalle de un informe'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--report', type=int, help='Id de un informe existente (por defecto uno sintético)')
+        parser.add_argument(
+            '--scenario', default='l',
+            help=f"Escenario sintético a usar ({', '.join(SCENARIOS)})"
+        )
+        parser.add_argument(
+            '--copies', type=int, default=20,
+            help='Veces que se repite el informe en el payload (simula listados grandes)'
+        )
+        parser.add_argument('--repeat', type=int, default=20, help='Repeticiones por medición (se usa la mediana)')
+
+    def handle(self, *args, **options):
+        from reports.serializers import ReportSerializer
+
+        report = self._get_report(options)
+        data = ReportSerializer(report).data
+        if options['copies'] > 1:
+            data = [data] * options['copies']
+
+        rows = [['renderer', 'ms', 'bytes', 'gzip', 'gzip ms', 'br', 'br ms']]
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            content, render_ms = self._time(lambda: renderer.render(data), options['repeat'])
+            gzipped, gzip_ms = self._time(lambda: gzip.compress(content, compresslevel=6), options['repeat'])
+            brotli_size, brotli_ms = self._brotli(content, options['repeat'])
+            rows.append([
+                type(renderer).__name__, f"{render_ms:.2f}", len(content),
+                len(gzipped), f"{gzip_ms:.2f}", brotli_size, brotli_ms,
+            ])
+        self._print_rows(rows)
+
+    def _get_report(self, options):
+        """
+        Obtiene el informe a serializar, real o sintético
+        """
+        from reports.models import Category, Product, Region, Report, SalesData
+
+        if options['report']:
+            from django.db.models import Prefetch
+            from reports.serializers import ReportSerializer, SAMPLE_RELATED
+
+            try:
+                return Report.objects.select_related('csv_file').prefetch_related(
+                    Prefetch(
+                        'sales_data',
+                        queryset=SalesData.objects.select_related(*SAMPLE_RELATED).order_by('id')[:ReportSerializer.SAMPLE_SIZE],
+                        to_attr='sales_data_sample_rows'
+                    )
+                ).get(pk=options['report'])
+            except Report.DoesNotExist:
+                raise CommandError(f"No existe el informe {options['report']}")
+
+        if options['scenario'] not in SCENARIOS:
+            raise CommandError(f"Escenario desconocido: {options['scenario']}")
+        products, months, rows = SCENARIOS[options['scenario']]
+        service = build_synthetic_service(products, months, rows, include_appendix=False, seed=42)
+        service.report.sales_data_sample_rows = [
+            SalesData(
+                date=date, product=Product(name=product), category=Category(name=category),
+                region=Region(name=region), sales_amount=sales_amount,
+            )
+            for date, product, category, region, sales_amount in service._get_sample_rows()
+        ]
+        return service.report
+
+    def _time(self, func, repeat):
+        """
+        Ejecuta una función varias veces y devuelve su resultado y la mediana en ms
+        """
+        samples = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = func()
+            samples.append(time.perf_counter() - started)
+        return result, statistics.median(samples) * 1000
+
+    def _brotli(self, content, repeat):
+        """
+        Mide la compresión con brotli si está instalado
+        """
+        try:
+            import brotli
+        except ImportError:
+            return '-', '-'
+        quality = settings.RESPONSE_COMPRESSION_BROTLI_QUALITY
+        compressed, elapsed = self._time(lambda: brotli.compress(content, quality=quality), repeat)
+        return len(compressed), f"{elapsed:.2f}"
+
+    def _print_rows(self, rows):
+        """
+        Imprime filas alineadas en columnas
+        """
+        widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+        for index, row in enumerate(rows):
+            self.stdout.write('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
+            if index == 0:
+                self.stdout.write('  '.join('-' * width for width in widths))
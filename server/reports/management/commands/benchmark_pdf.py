@@ -0,0 +1,234 @@
+"""
+Benchmark reproducible de PDFReportService con informes sintéticos
+
+Ejemplos:
+    python manage.py benchmark_pdf
+    python manage.py benchmark_pdf --scenarios s,m,l --save base.json
+    python manage.py benchmark_pdf --compare base.json --fail-on-regression
+"""
+
+import json
+import random
+import statistics
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Escenarios de tamaño creciente: (productos, meses, filas de datos)
+SCENARIOS = {
+    'xs': (5, 6, 100),
+    's': (20, 12, 1000),
+    'm': (100, 36, 10000),
+    'l': (500, 60, 50000),
+    'xl': (2000, 120, 200000),
+}
+
+SECTIONS = ['title', 'summary', 'metrics', 'charts', 'insights', 'data_table', 'appendix', 'layout']
+
+
+def build_synthetic_service(products, months, rows, include_appendix, seed):
+    """Crea un PDFReportService sobre un informe sintético que no toca la base de datos"""
+    from reports.models import CSVFile, Report
+    from reports.pdf_service import PDFReportService
+
+    rng = random.Random(seed)
+    product_names = [f"Producto {i:05d}" for i in range(products)]
+    regions = ['Norte', 'Sur', 'Este', 'Oeste', 'Centro']
+    start = date(2020, 1, 1)
+
+    product_sales = sorted(
+        ((name, round(rng.uniform(1000, 100000), 2)) for name in product_names),
+        key=lambda item: item[1], reverse=True
+    )[:10]
+    region_sales = [round(rng.uniform(10000, 500000), 2) for _ in regions]
+
+    monthly_trends = []
+    previous = None
+    for i in range(months):
+        sales = round(rng.uniform(50000, 150000), 2)
+        growth = round((sales - previous) / previous * 100, 2) if previous else 0
+        monthly_trends.append({
+            'month': f"{start.year + (start.month - 1 + i) // 12}-{(start.month - 1 + i) % 12 + 1:02d}",
+            'sales': sales,
+            'growth': growth,
+        })
+        previous = sales
+
+    report = Report(
+        csv_file=CSVFile(original_name=f"sintetico_{products}p_{months}m_{rows}f.csv"),
+        total_sales=Decimal(str(round(sum(item['sales'] for item in monthly_trends), 2))),
+        total_records=rows,
+        date_range_start=start,
+        date_range_end=start + timedelta(days=months * 30),
+        top_products={'labels': [name for name, _ in product_sales], 'data': [value for _, value in product_sales]},
+        sales_by_region={'labels': regions, 'data': region_sales},
+        sales_by_date={
+            'labels': [item['month'] for item in monthly_trends],
+            'data': [item['sales'] for item in monthly_trends],
+        },
+        monthly_trends=monthly_trends,
+        auto_insights='\n'.join(f"Insight sintético número {i + 1}." for i in range(5)),
+    )
+
+    def iter_rows():
+        row_rng = random.Random(seed)
+        for i in range(rows):
+            yield (
+                start + timedelta(days=i * months * 30 // max(rows, 1)),
+                row_rng.choice(product_names),
+                'Categoría',
+                row_rng.choice(regions),
+                Decimal(f"{row_rng.uniform(1, 5000):.2f}"),
+            )
+
+    class SyntheticPDFReportService(PDFReportService):
+        def _get_sample_rows(self):
+            return [row for _, row in zip(range(10), iter_rows())]
+
+        def _iter_appendix_rows(self):
+            return iter_rows()
+
+    return SyntheticPDFReportService(report, include_appendix=include_appendix)
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo y la memoria por sección de PDFReportService con informes sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenarios', default='xs,s,m',
+            help=f"Escenarios separados por coma ({', '.join(SCENARIOS)})"
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por escenario (se usa la mediana)')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla de los datos sintéticos')
+        parser.add_argument('--no-appendix', action='store_true', help='Genera los PDFs sin el anexo de datos')
+        parser.add_argument('--no-memory', action='store_true', help='No mide memoria (sin tracemalloc)')
+        parser.add_argument('--save', help='Guarda los resultados en un archivo JSON')
+        parser.add_argument('--compare', help='Archivo JSON de resultados base con el que comparar')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Porcentaje de aumento del tiempo total considerado regresión'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Termina con error si algún escenario supera el umbral'
+        )
+
+    def handle(self, *args, **options):
+        import tracemalloc
+
+        names = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(unknown)}")
+
+        results = {}
+        for name in names:
+            products, months, rows = SCENARIOS[name]
+            runs = []
+            for _ in range(max(options['repeat'], 1)):
+                service = build_synthetic_service(
+                    products, months, rows, not options['no_appendix'], options['seed']
+                )
+                pdf_content = service.render_pdf()
+                runs.append((service.timings, len(pdf_content)))
+
+            # tracemalloc distorsiona los tiempos: la memoria se mide en una pasada aparte
+            memory = {}
+            if not options['no_memory']:
+                service = build_synthetic_service(
+                    products, months, rows, not options['no_appendix'], options['seed']
+                )
+                tracemalloc.start()
+                try:
+                    service.render_pdf()
+                finally:
+                    tracemalloc.stop()
+                memory = service.timings
+
+            results[name] = self._summarize(products, months, rows, runs, memory)
+            self.stderr.write(f"  {name}: {results[name]['total_ms']:.0f} ms")
+
+        self._write_table(results)
+
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['save']}")
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = self._write_comparison(results, baseline, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"Regresión de rendimiento en: {', '.join(regressions)}")
+
+    def _summarize(self, products, months, rows, runs, memory):
+        """
+        Combina las repeticiones de un escenario usando la mediana
+        """
+        sections = {}
+        for section in SECTIONS:
+            values = [timings[section] for timings, _ in runs if section in timings]
+            if not values:
+                continue
+            sections[section] = {
+                'ms': round(statistics.median(v['seconds'] for v in values) * 1000, 1),
+                'peak_kb': memory.get(section, {}).get('peak_kb', 0),
+            }
+
+        # El anexo se dibuja dentro de 'layout': el total no lo cuenta dos veces
+        total_ms = sum(values['ms'] for section, values in sections.items() if section != 'appendix')
+        return {
+            'products': products,
+            'months': months,
+            'rows': rows,
+            'sections': sections,
+            'total_ms': round(total_ms, 1),
+            'peak_mb': round(max((v['peak_kb'] for v in sections.values()), default=0) / 1024, 1),
+            'pdf_kb': round(statistics.median(size for _, size in runs) / 1024, 1),
+        }
+
+    def _write_table(self, results):
+        """
+        Muestra los resultados como una tabla de texto
+        """
+        headers = ['escenario', 'prod', 'meses', 'filas'] + SECTIONS + ['total ms', 'pico MB', 'PDF KB']
+        table = [headers]
+        for name, result in results.items():
+            table.append(
+                [name, result['products'], result['months'], result['rows']]
+                + [result['sections'].get(section, {}).get('ms', '-') for section in SECTIONS]
+                + [result['total_ms'], result['peak_mb'], result['pdf_kb']]
+            )
+        self._print_rows(table)
+
+    def _write_comparison(self, results, baseline, threshold):
+        """
+        Compara con resultados anteriores y devuelve los escenarios con regresión
+        """
+        regressions = []
+        table = [['escenario', 'base ms', 'actual ms', 'cambio', '']]
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before = baseline[name]['total_ms']
+            change = (result['total_ms'] - before) / before * 100 if before else 0
+            flag = 'REGRESIÓN' if change > threshold else ''
+            if flag:
+                regressions.append(name)
+            table.append([name, before, result['total_ms'], f"{change:+.1f}%", flag])
+        self.stdout.write('')
+        self._print_rows(table)
+        return regressions
+
+    def _print_rows(self, rows):
+        """
+        Imprime filas alineadas en columnas
+        """
+        widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+        for index, row in enumerate(rows):
+            self.stdout.write('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
+            if index == 0:
+                self.stdout.write('  '.join('-' * width for width in widths))
@@ -0,0 +1,27 @@
+"""
+Elimina las subidas por partes abandonadas y sus archivos parciales
+
+Ejemplo (por ejemplo, en un cron diario):
+    python manage.py cleanup_uploads
+"""
+
+from django.core.management.base import BaseCommand
+
+from reports.uploads import abort_upload, expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Elimina las subidas por partes sin actividad desde hace más de CHUNKED_UPLOAD_EXPIRATION'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra las subidas que se eliminarían')
+
+    def handle(self, *args, **options):
+        count = 0
+        for session in expired_sessions().iterator():
+            self.stdout.write(f"  🗑️  {session}")
+            if not options['dry_run']:
+                abort_upload(session)
+            count += 1
+        action = 'se eliminarían' if options['dry_run'] else 'eliminadas'
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} subidas abandonadas {action}."))
@@ -0,0 +1,243 @@
+"""
+Comando para regenerar en paralelo los PDFs de los informes
+
+Ejemplos:
+    python manage.py regenerate_pdfs --only-stale
+    python manage.py regenerate_pdfs --user ana@empresa.com --since 2025-01-01
+    python manage.py regenerate_pdfs --workers 8 --checkpoint pdfs.json --resume
+    python manage.py regenerate_pdfs --appendix --user 42
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+
+
+def _init_worker():
+    """Inicializa Django en cada proceso del pool y precarga las librerías de PDF"""
+    import django
+    django.setup()
+
+    from reports.warmup import warm_up
+    warm_up()
+
+
+def _regenerate_report_pdf(report_id, include_appendix=False):
+    """Regenera el PDF de un informe dentro de un proceso del pool"""
+    from reports.models import Report
+    from reports.pdf_service import PDFReportService
+
+    started = time.perf_counter()
+    try:
+        report = Report.objects.select_related('csv_file').get(pk=report_id)
+        PDFReportService(report, include_appendix=include_appendix).generate_pdf()
+        return report_id, time.perf_counter() - started, None
+    except Exception as e:
+        return report_id, time.perf_counter() - started, str(e)
+
+
+def _format_duration(seconds):
+    """Formatea una duración en segundos como texto corto"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+class Command(BaseCommand):
+    help = 'Regenera en paralelo los PDFs de los informes completados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email o id del usuario cuyos informes se regeneran')
+        parser.add_argument('--since', help='Solo informes creados desde esta fecha (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Solo informes creados hasta esta fecha (YYYY-MM-DD)')
+        parser.add_argument(
+            '--only-stale', action='store_true',
+            help='Solo informes sin PDF o con un PDF de una versión anterior de la plantilla'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Número de procesos que generan PDFs en paralelo'
+        )
+        parser.add_argument(
+            '--max-rate', type=float, default=0,
+            help='Máximo de PDFs iniciados por segundo (0 = sin límite)'
+        )
+        parser.add_argument('--checkpoint', help='Archivo JSON donde se registra el progreso')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Omite los informes ya completados según el checkpoint'
+        )
+        parser.add_argument('--limit', type=int, help='Máximo de informes a procesar')
+        parser.add_argument(
+            '--appendix', action='store_true',
+            help='Incluye el anexo con el listado completo de transacciones'
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers debe ser al menos 1')
+        if options['resume'] and not options['checkpoint']:
+            raise CommandError('--resume requiere --checkpoint')
+
+        report_ids = self._get_report_ids(options)
+
+        checkpoint = {'completed': [], 'failed': {}}
+        if options['resume'] and os.path.exists(options['checkpoint']):
+            with open(options['checkpoint']) as f:
+                checkpoint = json.load(f)
+            checkpoint.setdefault('completed', [])
+            checkpoint.setdefault('failed', {})
+        completed = set(checkpoint['completed'])
+        pending = [report_id for report_id in report_ids if report_id not in completed]
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        if not pending:
+            self.stdout.write(self.style.SUCCESS('✅ No hay PDFs para regenerar.'))
+            return
+
+        self.stdout.write(
+            f"📄 Regenerando {len(pending)} PDFs con {options['workers']} procesos"
+            + (f" ({len(completed)} ya completados en el checkpoint)" if completed else '')
+        )
+        self._run(pending, checkpoint, completed, options)
+
+    def _get_report_ids(self, options):
+        """
+        Obtiene los ids de los informes que cumplen los filtros
+        """
+        from reports.models import Report
+        from reports.pdf_service import PDFReportService
+
+        queryset = Report.objects.filter(csv_file__status='completed')
+
+        if options['user']:
+            if options['user'].isdigit():
+                queryset = queryset.filter(csv_file__user_id=int(options['user']))
+            else:
+                queryset = queryset.filter(csv_file__user__email=options['user'])
+
+        for option, lookup in (('since', 'created_at__date__gte'), ('until', 'created_at__date__lte')):
+            if options[option]:
+                try:
+                    value = datetime.strptime(options[option], '%Y-%m-%d').date()
+                except ValueError:
+                    raise CommandError(f"--{option} debe tener el formato YYYY-MM-DD")
+                queryset = queryset.filter(**{lookup: value})
+
+        if options['only_stale']:
+            queryset = queryset.filter(
+                Q(pdf_file='') | Q(pdf_file__isnull=True) |
+                Q(pdf_template_version__isnull=True) |
+                ~Q(pdf_template_version=PDFReportService.TEMPLATE_VERSION)
+            )
+
+        return list(queryset.order_by('id').values_list('id', flat=True))
+
+    def _run(self, pending, checkpoint, completed, options):
+        """
+        Reparte los informes entre los procesos del pool y muestra el progreso
+        """
+        total = len(pending)
+        failed = checkpoint['failed']
+        max_in_flight = options['workers'] * 2
+        min_interval = 1.0 / options['max_rate'] if options['max_rate'] > 0 else 0
+
+        # Los procesos hijos no deben heredar conexiones abiertas
+        connections.close_all()
+
+        started = time.perf_counter()
+        last_report = last_checkpoint = started
+        next_submit = started
+        done = errors = 0
+        exhausted = False
+        queue = iter(pending)
+        in_flight = set()
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as executor:
+            try:
+                while True:
+                    # Mantener el pool alimentado respetando el límite de velocidad
+                    while not exhausted and len(in_flight) < max_in_flight:
+                        now = time.perf_counter()
+                        if now < next_submit:
+                            break
+                        report_id = next(queue, None)
+                        if report_id is None:
+                            exhausted = True
+                            break
+                        in_flight.add(executor.submit(_regenerate_report_pdf, report_id, options['appendix']))
+                        next_submit = max(next_submit, now) + min_interval
+
+                    if not in_flight:
+                        if exhausted:
+                            break
+                        time.sleep(max(next_submit - time.perf_counter(), 0))
+                        continue
+
+                    timeout = None
+                    if min_interval and not exhausted:
+                        timeout = max(next_submit - time.perf_counter(), 0.01)
+                    finished, in_flight = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                    for future in finished:
+                        report_id, elapsed, error = future.result()
+                        done += 1
+                        if error:
+                            errors += 1
+                            failed[str(report_id)] = error
+                            self.stderr.write(f"  ❌ Informe {report_id}: {error}")
+                        else:
+                            completed.add(report_id)
+                            failed.pop(str(report_id), None)
+
+                    now = time.perf_counter()
+                    if now - last_report >= 2 or done == total:
+                        self._write_progress(done, total, errors, now - started)
+                        last_report = now
+                    if options['checkpoint'] and now - last_checkpoint >= 5:
+                        self._save_checkpoint(options['checkpoint'], completed, failed)
+                        last_checkpoint = now
+            except KeyboardInterrupt:
+                executor.shutdown(wait=True, cancel_futures=True)
+                self.stderr.write('⏹️  Interrumpido por el usuario.')
+            finally:
+                if options['checkpoint']:
+                    self._save_checkpoint(options['checkpoint'], completed, failed)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Regeneración completada: {done - errors}/{total} PDFs en {_format_duration(elapsed)}"
+            f" ({done / elapsed if elapsed else 0:.1f} PDF/s, {errors} errores)."
+        ))
+
+    def _write_progress(self, done, total, errors, elapsed):
+        """
+        Muestra el avance, el rendimiento y el tiempo estimado restante
+        """
+        rate = done / elapsed if elapsed else 0
+        eta = (total - done) / rate if rate else 0
+        self.stdout.write(
+            f"  {done}/{total} ({done / total:.1%}) · {rate:.1f} PDF/s"
+            f" · ETA {_format_duration(eta)} · errores {errors}"
+        )
+
+    def _save_checkpoint(self, path, completed, failed):
+        """
+        Guarda el checkpoint de forma atómica
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'completed': sorted(completed), 'failed': failed}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='pdf_template_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
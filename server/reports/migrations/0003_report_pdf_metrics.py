@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_report_pdf_template_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='pdf_metrics',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
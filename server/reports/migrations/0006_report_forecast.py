@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_report_sketches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='forecast',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_report_forecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.CharField(max_length=255)),
+                ('region', models.CharField(blank=True, max_length=100)),
+                ('date', models.DateField()),
+                ('sales_amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('expected', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('score', models.FloatField()),
+                ('direction', models.CharField(choices=[('spike', 'Pico'), ('drop', 'Caída')], max_length=10)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to='reports.report')),
+            ],
+            options={
+                'verbose_name': 'Anomalía de Ventas',
+                'verbose_name_plural': 'Anomalías de Ventas',
+                'indexes': [models.Index(fields=['report', 'date'], name='reports_sal_report__81eb6f_idx'), models.Index(fields=['report', 'product'], name='reports_sal_report__67b439_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0007_salesanomaly'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='data_quality',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
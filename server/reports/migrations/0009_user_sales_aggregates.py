@@ -0,0 +1,97 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_aggregates(apps, schema_editor):
+    """Calcula los agregados de los informes completados existentes desde SalesData"""
+    Report = apps.get_model('reports', 'Report')
+    SalesData = apps.get_model('reports', 'SalesData')
+    ReportAggregate = apps.get_model('reports', 'ReportAggregate')
+    UserSalesAggregate = apps.get_model('reports', 'UserSalesAggregate')
+
+    totals = {}
+    reports = Report.objects.filter(csv_file__status='completed').values_list('id', 'csv_file__user_id')
+    for report_id, user_id in reports.iterator():
+        rows = SalesData.objects.filter(report_id=report_id)
+        groups = (
+            ('month', rows.annotate(group=TruncMonth('date'))),
+            ('product', rows.annotate(group=F('product'))),
+            ('region', rows.annotate(group=F('region'))),
+        )
+        aggregates = []
+        for dimension, queryset in groups:
+            for group, total, records in queryset.values('group').annotate(
+                total=Sum('sales_amount'), records=Count('id')
+            ).values_list('group', 'total', 'records'):
+                key = group.strftime('%Y-%m') if dimension == 'month' else group
+                aggregates.append(ReportAggregate(
+                    report_id=report_id, dimension=dimension, key=key, total_sales=total, records=records
+                ))
+                current = totals.setdefault((user_id, dimension, key), [0, 0, 0])
+                current[0] += total
+                current[1] += records
+                current[2] += 1
+        ReportAggregate.objects.bulk_create(aggregates, batch_size=1000)
+
+    UserSalesAggregate.objects.bulk_create(
+        [
+            UserSalesAggregate(
+                user_id=user_id, dimension=dimension, key=key,
+                total_sales=total, records=records, reports=reports_count,
+            )
+            for (user_id, dimension, key), (total, records, reports_count) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0008_report_data_quality'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('month', 'Mes'), ('product', 'Producto'), ('region', 'Región')], max_length=10)),
+                ('key', models.CharField(max_length=255)),
+                ('total_sales', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('records', models.PositiveIntegerField()),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='reports.report')),
+            ],
+            options={
+                'verbose_name': 'Agregado de Informe',
+                'verbose_name_plural': 'Agregados de Informes',
+                'constraints': [models.UniqueConstraint(fields=('report', 'dimension', 'key'), name='unique_report_aggregate')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserSalesAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('month', 'Mes'), ('product', 'Producto'), ('region', 'Región')], max_length=10)),
+                ('key', models.CharField(max_length=255)),
+                ('total_sales', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('records', models.PositiveBigIntegerField()),
+                ('reports', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_aggregates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Agregado de Usuario',
+                'verbose_name_plural': 'Agregados de Usuarios',
+                'indexes': [models.Index(fields=['user', 'dimension', '-total_sales'], name='reports_use_user_id_d03bdb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'dimension', 'key'), name='unique_user_sales_aggregate')],
+            },
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0009_user_sales_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortRetention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.DateField()),
+                ('period', models.PositiveSmallIntegerField()),
+                ('customers', models.PositiveIntegerField()),
+                ('retention', models.FloatField()),
+                ('sales_amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cohorts', to='reports.report')),
+            ],
+            options={
+                'verbose_name': 'Retención de Cohorte',
+                'verbose_name_plural': 'Retención de Cohortes',
+                'constraints': [models.UniqueConstraint(fields=('report', 'cohort', 'period'), name='unique_cohort_period')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer', models.CharField(max_length=255)),
+                ('first_purchase', models.DateField()),
+                ('last_purchase', models.DateField()),
+                ('orders', models.PositiveIntegerField()),
+                ('total_sales', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('recency_days', models.PositiveIntegerField()),
+                ('r_score', models.PositiveSmallIntegerField()),
+                ('f_score', models.PositiveSmallIntegerField()),
+                ('m_score', models.PositiveSmallIntegerField()),
+                ('segment', models.CharField(choices=[('champions', 'Campeones'), ('loyal', 'Leales'), ('new', 'Nuevos'), ('potential', 'Potenciales'), ('at_risk', 'En riesgo'), ('hibernating', 'Hibernando'), ('lost', 'Perdidos')], max_length=20)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customers', to='reports.report')),
+            ],
+            options={
+                'verbose_name': 'Métricas de Cliente',
+                'verbose_name_plural': 'Métricas de Clientes',
+                'indexes': [models.Index(fields=['report', '-total_sales'], name='reports_cus_report__972c6b_idx'), models.Index(fields=['report', 'segment'], name='reports_cus_report__4073c2_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SellerPerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seller', models.CharField(max_length=255)),
+                ('total_sales', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('records', models.PositiveIntegerField()),
+                ('customers', models.PositiveIntegerField()),
+                ('products', models.PositiveIntegerField()),
+                ('average_ticket', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('share', models.FloatField()),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sellers', to='reports.report')),
+            ],
+            options={
+                'verbose_name': 'Desempeño de Vendedor',
+                'verbose_name_plural': 'Desempeño de Vendedores',
+                'indexes': [models.Index(fields=['report', '-total_sales'], name='reports_sel_report__66559c_idx')],
+            },
+        ),
+    ]
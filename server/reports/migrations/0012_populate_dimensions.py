@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:39
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+DIMENSIONS = (
+    ('product', 'Product'),
+    ('category', 'Category'),
+    ('region', 'Region'),
+)
+
+
+def populate_dimensions(apps, schema_editor):
+    """
+    Crea las dimensiones de cada usuario con los textos de sus ventas y
+    apunta cada fila a ellas (un UPDATE por usuario y dimensión)
+    """
+    SalesData = apps.get_model('reports', 'SalesData')
+    user_ids = SalesData.objects.values_list('report__csv_file__user_id', flat=True).distinct()
+    for user_id in list(user_ids):
+        rows = SalesData.objects.filter(report__csv_file__user_id=user_id)
+        for field, model_name in DIMENSIONS:
+            Dimension = apps.get_model('reports', model_name)
+            names = rows.exclude(**{field: ''}).values_list(field, flat=True).distinct()
+            Dimension.objects.bulk_create(
+                [Dimension(user_id=user_id, name=name) for name in names.iterator()],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            rows.exclude(**{field: ''}).update(**{
+                f'{field}_dim': Subquery(
+                    Dimension.objects.filter(user_id=user_id, name=OuterRef(field)).values('id')[:1]
+                )
+            })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0011_dimensions'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_dimensions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0012_populate_dimensions'),
+    ]
+
+    operations = [
+        migrations.RemoveField(model_name='salesdata', name='product'),
+        migrations.RemoveField(model_name='salesdata', name='category'),
+        migrations.RemoveField(model_name='salesdata', name='region'),
+        migrations.RenameField(model_name='salesdata', old_name='product_dim', new_name='product'),
+        migrations.RenameField(model_name='salesdata', old_name='category_dim', new_name='category'),
+        migrations.RenameField(model_name='salesdata', old_name='region_dim', new_name='region'),
+        migrations.AlterField(
+            model_name='salesdata',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='sales', to='reports.product'),
+        ),
+        migrations.AlterField(
+            model_name='salesdata',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='sales', to='reports.category'),
+        ),
+        migrations.AlterField(
+            model_name='salesdata',
+            name='region',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='sales', to='reports.region'),
+        ),
+    ]
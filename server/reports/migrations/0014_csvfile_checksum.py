@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0013_salesdata_dimension_fks'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='uploadsession',
+            name='checksum',
+        ),
+        migrations.AddField(
+            model_name='csvfile',
+            name='checksum',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
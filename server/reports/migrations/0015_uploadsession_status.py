@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0014_csvfile_checksum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('receiving', 'Recibiendo partes'), ('writing', 'Guardando una parte'), ('completing', 'Completando'), ('aborting', 'Cancelando')], default='receiving', max_length=20),
+        ),
+    ]
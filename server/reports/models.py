@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
 import os
@@ -30,6 +32,7 @@ class CSVFile(models.Model):
     file = models.FileField(upload_to=upload_to)
     original_name = models.CharField(max_length=255)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploaded')
+    checksum = models.CharField(max_length=64, blank=True)  # SHA-256 del archivo tal como se subió
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -57,12 +60,17 @@ class Report(models.Model):
     sales_by_region = models.JSONField(default=dict, blank=True)
     sales_by_date = models.JSONField(default=dict, blank=True)
     monthly_trends = models.JSONField(default=dict, blank=True)
+    sketches = models.JSONField(default=dict, blank=True)  # Sketches combinables (reports.sketches)
+    forecast = models.JSONField(default=dict, blank=True)  # Proyección con bandas (reports.forecasting)
+    data_quality = models.JSONField(default=dict, blank=True)  # Formato de fecha y filas descartadas
     
     # Insights automáticos
     auto_insights = models.TextField(blank=True)
     
     # Archivo PDF generado
     pdf_file = models.FileField(upload_to='reports/pdf/', blank=True, null=True)
+    pdf_template_version = models.PositiveIntegerField(null=True, blank=True)
+    pdf_metrics = models.JSONField(default=dict, blank=True)  # Tiempo y memoria por sección
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -74,17 +82,56 @@ class Report(models.Model):
         verbose_name = "Informe"
         verbose_name_plural = "Informes"
 
+class Dimension(models.Model):
+    """
+    Valor de una dimensión de las ventas de un usuario (producto, categoría o
+    región)
+
+    SalesData lo referencia con una clave entera en vez de repetir el texto en
+    cada fila; renombrarlo cambia todas las ventas de todos los informes.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    name = models.CharField(max_length=255)
+    
+    def __str__(self):
+        return self.name
+    
+    class Meta:
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='unique_%(class)s_name'),
+        ]
+
+class Product(Dimension):
+    class Meta(Dimension.Meta):
+        verbose_name = "Producto"
+        verbose_name_plural = "Productos"
+
+class Category(Dimension):
+    name = models.CharField(max_length=100)
+    
+    class Meta(Dimension.Meta):
+        verbose_name = "Categoría"
+        verbose_name_plural = "Categorías"
+
+class Region(Dimension):
+    name = models.CharField(max_length=100)
+    
+    class Meta(Dimension.Meta):
+        verbose_name = "Región"
+        verbose_name_plural = "Regiones"
+
 class SalesData(models.Model):
     """
     Modelo para almacenar datos individuales de ventas procesados
     """
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='sales_data')
     
-    # Campos comunes de datos de ventas
+    # Campos comunes de datos de ventas (producto, categoría y región son dimensiones del usuario)
     date = models.DateField()
-    product = models.CharField(max_length=255)
-    category = models.CharField(max_length=100, blank=True)
-    region = models.CharField(max_length=100, blank=True)
+    product = models.ForeignKey(Product, on_delete=models.RESTRICT, related_name='sales')
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT, related_name='sales', null=True, blank=True)
+    region = models.ForeignKey(Region, on_delete=models.RESTRICT, related_name='sales', null=True, blank=True)
     sales_amount = models.DecimalField(max_digits=10, decimal_places=2)
     quantity = models.IntegerField(default=1)
     
@@ -98,4 +145,206 @@ class SalesData(models.Model):
     
     class Meta:
         verbose_name = "Dato de Venta"
-        verbose_name_plural = "Datos de Ventas" 
\ No newline at end of file
+        verbose_name_plural = "Datos de Ventas" 
+
+class SalesAnomaly(models.Model):
+    """
+    Día con ventas inusuales de un producto en una región (reports.anomalies)
+    """
+    DIRECTION_CHOICES = [
+        ('spike', 'Pico'),
+        ('drop', 'Caída'),
+    ]
+    
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='anomalies')
+    product = models.CharField(max_length=255)
+    region = models.CharField(max_length=100, blank=True)
+    date = models.DateField()
+    sales_amount = models.DecimalField(max_digits=15, decimal_places=2)
+    expected = models.DecimalField(max_digits=15, decimal_places=2)  # Mediana de los días previos
+    score = models.FloatField()  # z-score robusto (mediana/MAD)
+    direction = models.CharField(max_length=10, choices=DIRECTION_CHOICES)
+    
+    def __str__(self):
+        return f"{self.product} - {self.region} - {self.date} ({self.score:+.1f})"
+    
+    class Meta:
+        verbose_name = "Anomalía de Ventas"
+        verbose_name_plural = "Anomalías de Ventas"
+        indexes = [
+            models.Index(fields=['report', 'date']),
+            models.Index(fields=['report', 'product']),
+        ]
+
+class CustomerMetrics(models.Model):
+    """
+    Métricas RFM (recencia, frecuencia y monto) de un cliente en un informe
+    (reports.customers)
+    """
+    SEGMENT_CHOICES = [
+        ('champions', 'Campeones'),
+        ('loyal', 'Leales'),
+        ('new', 'Nuevos'),
+        ('potential', 'Potenciales'),
+        ('at_risk', 'En riesgo'),
+        ('hibernating', 'Hibernando'),
+        ('lost', 'Perdidos'),
+    ]
+    
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='customers')
+    customer = models.CharField(max_length=255)
+    first_purchase = models.DateField()
+    last_purchase = models.DateField()
+    orders = models.PositiveIntegerField()  # Días distintos con compras
+    total_sales = models.DecimalField(max_digits=15, decimal_places=2)
+    recency_days = models.PositiveIntegerField()  # Días desde la última compra hasta el fin del informe
+    r_score = models.PositiveSmallIntegerField()
+    f_score = models.PositiveSmallIntegerField()
+    m_score = models.PositiveSmallIntegerField()
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES)
+    
+    def __str__(self):
+        return f"{self.customer} - {self.get_segment_display()}"
+    
+    class Meta:
+        verbose_name = "Métricas de Cliente"
+        verbose_name_plural = "Métricas de Clientes"
+        indexes = [
+            models.Index(fields=['report', '-total_sales']),
+            models.Index(fields=['report', 'segment']),
+        ]
+
+class CohortRetention(models.Model):
+    """
+    Clientes de una cohorte (mes de la primera compra) que vuelven a comprar
+    `period` meses después
+    """
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='cohorts')
+    cohort = models.DateField()  # Primer día del mes de la primera compra
+    period = models.PositiveSmallIntegerField()  # Meses desde la primera compra
+    customers = models.PositiveIntegerField()
+    retention = models.FloatField()  # customers / clientes de la cohorte
+    sales_amount = models.DecimalField(max_digits=15, decimal_places=2)
+    
+    def __str__(self):
+        return f"{self.cohort:%Y-%m} +{self.period}: {self.retention:.1%}"
+    
+    class Meta:
+        verbose_name = "Retención de Cohorte"
+        verbose_name_plural = "Retención de Cohortes"
+        constraints = [
+            models.UniqueConstraint(fields=['report', 'cohort', 'period'], name='unique_cohort_period'),
+        ]
+
+class SellerPerformance(models.Model):
+    """
+    Desempeño de un vendedor en un informe
+    """
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='sellers')
+    seller = models.CharField(max_length=255)
+    total_sales = models.DecimalField(max_digits=15, decimal_places=2)
+    records = models.PositiveIntegerField()
+    customers = models.PositiveIntegerField()  # Clientes distintos (0 si el CSV no tiene clientes)
+    products = models.PositiveIntegerField()
+    average_ticket = models.DecimalField(max_digits=15, decimal_places=2)
+    share = models.FloatField()  # % de las ventas del informe
+    
+    def __str__(self):
+        return f"{self.seller} - {self.total_sales}"
+    
+    class Meta:
+        verbose_name = "Desempeño de Vendedor"
+        verbose_name_plural = "Desempeño de Vendedores"
+        indexes = [
+            models.Index(fields=['report', '-total_sales']),
+        ]
+
+class ReportAggregate(models.Model):
+    """
+    Totales de un informe por mes, producto o región: su aporte a los
+    agregados del usuario (reports.analytics)
+    """
+    DIMENSION_CHOICES = [
+        ('month', 'Mes'),
+        ('product', 'Producto'),
+        ('region', 'Región'),
+    ]
+    
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='aggregates')
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=255)
+    total_sales = models.DecimalField(max_digits=15, decimal_places=2)
+    records = models.PositiveIntegerField()
+    
+    def __str__(self):
+        return f"{self.report_id} - {self.dimension}: {self.key}"
+    
+    class Meta:
+        verbose_name = "Agregado de Informe"
+        verbose_name_plural = "Agregados de Informes"
+        constraints = [
+            models.UniqueConstraint(fields=['report', 'dimension', 'key'], name='unique_report_aggregate'),
+        ]
+
+class UserSalesAggregate(models.Model):
+    """
+    Totales de todos los informes completados de un usuario por mes, producto
+    o región, mantenidos de forma incremental
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sales_aggregates')
+    dimension = models.CharField(max_length=10, choices=ReportAggregate.DIMENSION_CHOICES)
+    key = models.CharField(max_length=255)
+    total_sales = models.DecimalField(max_digits=18, decimal_places=2)
+    records = models.PositiveBigIntegerField()
+    reports = models.PositiveIntegerField()  # Informes que aportan a la clave
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user} - {self.dimension}: {self.key}"
+    
+    class Meta:
+        verbose_name = "Agregado de Usuario"
+        verbose_name_plural = "Agregados de Usuarios"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'dimension', 'key'], name='unique_user_sales_aggregate'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'dimension', '-total_sales']),
+        ]
+
+class UploadSession(models.Model):
+    """
+    Subida reanudable de un archivo CSV enviada por partes
+
+    Cada parte se guarda como un archivo propio en el storage hasta completar
+    la subida y `offset` indica cuántos bytes se recibieron, de modo que el
+    cliente puede continuar desde ahí si se corta la conexión. `status` marca
+    la petición que está usando la sesión (reanudar, completar o cancelar),
+    que la toma con un UPDATE corto en vez de bloquear la fila mientras dura
+    la transferencia (reports.uploads.claim_session).
+    """
+    STATUS_CHOICES = [
+        ('receiving', 'Recibiendo partes'),
+        ('writing', 'Guardando una parte'),
+        ('completing', 'Completando'),
+        ('aborting', 'Cancelando'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    original_name = models.CharField(max_length=255)
+    file_name = models.CharField(max_length=500)  # Ruta del archivo en el storage
+    total_size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    header_validated = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='receiving')
+    claimed_at = models.DateTimeField(null=True, blank=True)  # Inicio de la petición que usa la sesión
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.original_name} ({self.offset}/{self.total_size}) - {self.user_id}"
+    
+    class Meta:
+        verbose_name = "Subida por Partes"
+        verbose_name_plural = "Subidas por Partes"
@@ -1,27 +1,63 @@
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.graphics.charts.linecharts import HorizontalLineChart
-from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from contextlib import contextmanager
 from io import BytesIO
+import tempfile
+import time
+import tracemalloc
+import matplotlib
+matplotlib.use('Agg')  # Backend sin interfaz gráfica: los gráficos solo se rasterizan a PNG
 import matplotlib.pyplot as plt
-import seaborn as sns
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.base import File
 import os
 from datetime import datetime
+from main.metrics import PDF_GENERATION_SECONDS, PDF_SECTION_SECONDS, PDF_SIZE
+
+# Columnas de las filas de ventas en la muestra y el anexo (fecha, producto,
+# categoría, región, ventas)
+SALES_ROW_FIELDS = ('date', 'product__name', 'category__name', 'region__name', 'sales_amount')
+
+class AppendixCanvas(canvas.Canvas):
+    """
+    Canvas que dibuja el anexo de datos justo antes de cerrar el documento
+    """
+    
+    draw_appendix = None
+    
+    def save(self):
+        if self.draw_appendix:
+            self.draw_appendix(self)
+        super().save()
 
 class PDFReportService:
     """
     Servicio para generar informes PDF a partir de los datos analizados
     """
     
-    def __init__(self, report):
+    # Incrementar cuando cambie la plantilla o el formato para que
+    # `manage.py regenerate_pdfs --only-stale` detecte los PDFs desactualizados
+    TEMPLATE_VERSION = 2
+    
+    # Columnas del anexo: (título, ancho, máximo de caracteres)
+    APPENDIX_COLUMNS = [
+        ('Fecha', 0.85 * inch, None),
+        ('Producto', 2.4 * inch, 42),
+        ('Categoría', 1.5 * inch, 24),
+        ('Región', 1.35 * inch, 20),
+        ('Ventas', 1.15 * inch, None),
+    ]
+    APPENDIX_ROW_HEIGHT = 12
+    
+    def __init__(self, report, include_appendix=False):
         self.report = report
+        self.include_appendix = include_appendix
+        self.timings = {}
+        self._memory_stack = []
         self.styles = getSampleStyleSheet()
         self.story = []
         
@@ -65,44 +101,161 @@ class PDFReportService:
     def generate_pdf(self):
         """
         Genera el informe PDF completo
+
+        El PDF anterior (si existe) se reemplaza de forma atómica: el nuevo
+        archivo se escribe con otro nombre, se actualiza la referencia en la
+        base de datos y solo después se elimina el archivo antiguo, de modo que
+        una descarga concurrente nunca encuentra el PDF ausente.
+
+        El PDF se escribe en un temporal que pasa a disco si supera
+        FILE_UPLOAD_MAX_MEMORY_SIZE y se sube al storage desde ese archivo.
+        """
+        started_tracing = settings.PDF_PROFILE_MEMORY and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        
+        try:
+            started = time.perf_counter()
+            
+            # Crear el nombre del archivo
+            filename = f"informe_{self.report.csv_file.original_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            
+            previous_name = self.report.pdf_file.name if self.report.pdf_file else None
+            
+            with tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE) as output:
+                self.render_to(output)
+                pdf_bytes = output.tell()
+                output.seek(0)
+                
+                # Guardar el archivo
+                with self._measure('save'):
+                    self.report.pdf_file.save(
+                        filename,
+                        File(output, name=filename),
+                        save=False
+                    )
+            
+            # Guardar en el modelo junto con las métricas de generación
+            self.report.pdf_template_version = self.TEMPLATE_VERSION
+            self.report.pdf_metrics = {
+                'sections': self.timings,
+                'total_seconds': round(time.perf_counter() - started, 4),
+                'pdf_bytes': pdf_bytes,
+                'include_appendix': self.include_appendix,
+                'template_version': self.TEMPLATE_VERSION,
+            }
+            self.report.save()
+            PDF_GENERATION_SECONDS.observe(self.report.pdf_metrics['total_seconds'])
+            PDF_SIZE.observe(pdf_bytes)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        
+        # Eliminar el PDF anterior una vez que el nuevo ya está referenciado
+        if previous_name and previous_name != self.report.pdf_file.name:
+            self.report.pdf_file.storage.delete(previous_name)
+        
+        return self.report.pdf_file
+    
+    def render_pdf(self):
+        """
+        Construye el documento y devuelve el contenido del PDF en bytes
         """
-        # Crear el documento PDF
         buffer = BytesIO()
+        self.render_to(buffer)
+        pdf_content = buffer.getvalue()
+        buffer.close()
+        return pdf_content
+    
+    def render_to(self, output):
+        """
+        Construye el documento y lo escribe en el archivo `output`
+        """
+        # Crear el documento PDF
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=A4,
             rightMargin=72,
             leftMargin=72,
             topMargin=72,
-            bottomMargin=18
+            bottomMargin=18,
+            pageCompression=1 if self.include_appendix else None
         )
         
         # Construir el contenido
-        self._build_title()
-        self._build_summary()
-        self._build_metrics_section()
-        self._build_charts_section()
-        self._build_insights_section()
-        self._build_data_table()
-        
-        # Construir el PDF
-        doc.build(self.story)
-        
-        # Guardar el archivo
-        pdf_content = buffer.getvalue()
-        buffer.close()
+        with self._measure('title'):
+            self._build_title()
+        with self._measure('summary'):
+            self._build_summary()
+        with self._measure('metrics'):
+            self._build_metrics_section()
+        with self._measure('charts'):
+            self._build_charts_section()
+        with self._measure('insights'):
+            self._build_insights_section()
+        with self._measure('data_table'):
+            self._build_data_table()
         
-        # Crear el nombre del archivo
-        filename = f"informe_{self.report.csv_file.original_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        
-        # Guardar en el modelo
-        self.report.pdf_file.save(
-            filename,
-            ContentFile(pdf_content),
-            save=True
-        )
+        # Construir el PDF (el anexo se dibuja directamente sobre el canvas
+        # y se mide por separado dentro de 'layout')
+        with self._measure('layout'):
+            doc.build(self.story, canvasmaker=self._make_canvas)
+    
+    @contextmanager
+    def _measure(self, section):
+        """
+        Registra el tiempo y la memoria asignada durante una sección
+
+        Con tracemalloc activo se guarda la memoria neta asignada y el pico
+        alcanzado dentro de la sección. Las secciones anidadas propagan su pico
+        a la sección que las contiene.
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current_start, peak_before = tracemalloc.get_traced_memory()
+            if self._memory_stack:
+                self._memory_stack[-1] = max(self._memory_stack[-1], peak_before)
+            tracemalloc.reset_peak()
+            self._memory_stack.append(current_start)
         
-        return self.report.pdf_file
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            PDF_SECTION_SECONDS.labels(section).observe(elapsed)
+            metrics = {'seconds': round(elapsed, 4)}
+            if tracing:
+                current_end, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, self._memory_stack.pop())
+                metrics['allocated_kb'] = round((current_end - current_start) / 1024, 1)
+                metrics['peak_kb'] = round((peak - current_start) / 1024, 1)
+                if self._memory_stack:
+                    self._memory_stack[-1] = max(self._memory_stack[-1], peak)
+            self.timings[section] = metrics
+    
+    def _make_canvas(self, *args, **kwargs):
+        """
+        Crea el canvas del documento, con el anexo de datos si se solicitó
+        """
+        pdf_canvas = AppendixCanvas(*args, **kwargs)
+        if self.include_appendix:
+            pdf_canvas.draw_appendix = self._draw_measured_appendix
+        return pdf_canvas
+    
+    def _draw_measured_appendix(self, pdf_canvas):
+        """
+        Dibuja el anexo registrando su tiempo como una sección propia
+        """
+        with self._measure('appendix'):
+            self._draw_appendix(pdf_canvas)
+    
+    def _truncate(self, text, max_length):
+        """
+        Recorta un texto largo agregando puntos suspensivos
+        """
+        text = text or ''
+        return text[:max_length] + '...' if len(text) > max_length else text
     
     def _build_title(self):
         """
@@ -133,7 +286,7 @@ class PDFReportService:
             ['Métrica', 'Valor'],
             ['Ventas Totales', self.format_currency(self.report.total_sales)],
             ['Total de Registros', f"{self.report.total_records:,}"],
-            ['Productos Únicos', f"{len(self.report.top_products.get('labels', []))}"],
+            ['Productos Únicos', self._format_distinct_products()],
             ['Regiones', f"{len(self.report.sales_by_region.get('labels', []))}"]
         ]
         
@@ -152,6 +305,19 @@ class PDFReportService:
         self.story.append(table)
         self.story.append(Spacer(1, 20))
     
+    def _format_distinct_products(self):
+        """
+        Cantidad de productos distintos (aproximada si el análisis usó sketches)
+        """
+        top_products = self.report.top_products or {}
+        distinct = top_products.get('distinct_products')
+        if distinct is None:
+            # Informes anteriores a los sketches: solo se conoce el top
+            return f"{len(top_products.get('labels', []))}"
+        if top_products.get('approximate'):
+            return f"~{distinct:,}"
+        return f"{distinct:,}"
+    
     def _build_metrics_section(self):
         """
         Construye la sección de métricas clave
@@ -296,18 +462,18 @@ class PDFReportService:
         self.story.append(heading)
         
         # Obtener una muestra de los datos
-        sample_data = self.report.sales_data.all()[:10]
+        sample_data = self._get_sample_rows()
         
         if sample_data:
             table_data = [['Fecha', 'Producto', 'Categoría', 'Región', 'Ventas']]
             
-            for data in sample_data:
+            for date, product, category, region, sales_amount in sample_data:
                 table_data.append([
-                    data.date.strftime('%d/%m/%Y'),
-                    data.product[:30] + '...' if len(data.product) > 30 else data.product,
-                    data.category[:20] + '...' if len(data.category) > 20 else data.category,
-                    data.region,
-                    self.format_currency(data.sales_amount)
+                    date.strftime('%d/%m/%Y'),
+                    self._truncate(product, 30),
+                    self._truncate(category, 20),
+                    region,
+                    self.format_currency(sales_amount)
                 ])
             
             table = Table(table_data, colWidths=[1*inch, 2.5*inch, 1.5*inch, 1*inch, 1*inch])
@@ -325,6 +491,114 @@ class PDFReportService:
             
             self.story.append(table)
             
-            note = Paragraph("<i>Nota: Se muestran solo los primeros 10 registros como muestra.</i>", self.normal_style)
+            if self.include_appendix:
+                note_text = (
+                    f"<i>Nota: Se muestran los primeros 10 registros; el listado completo de "
+                    f"{self.report.total_records or 0:,} registros se incluye en el anexo.</i>"
+                )
+            else:
+                note_text = "<i>Nota: Se muestran solo los primeros 10 registros como muestra.</i>"
+            note = Paragraph(note_text, self.normal_style)
             self.story.append(Spacer(1, 10))
-            self.story.append(note) 
\ No newline at end of file
+            self.story.append(note) 
+    
+    def _get_sample_rows(self):
+        """
+        Obtiene los registros de muestra para la tabla de datos
+        (fecha, producto, categoría, región, ventas)
+        """
+        return list(self.report.sales_data.values_list(*SALES_ROW_FIELDS)[:10])
+    
+    def _iter_appendix_rows(self):
+        """
+        Recorre todas las ventas del informe con un cursor del lado del servidor
+        """
+        return (
+            self.report.sales_data
+            .order_by('date', 'id')
+            .values_list(*SALES_ROW_FIELDS)
+            .iterator(chunk_size=settings.PDF_APPENDIX_CHUNK_SIZE)
+        )
+    
+    def _draw_appendix(self, pdf_canvas):
+        """
+        Dibuja el listado completo de transacciones página por página
+
+        Las filas se leen por lotes y solo se mantiene una página de filas a la
+        vez, con un costo lineal en el número de registros. ReportLab conserva
+        en memoria el contenido de cada página terminada hasta guardar el
+        documento, así que el PDF completo sí ocupa memoria proporcional a su
+        tamaño.
+        """
+        page_width, page_height = A4
+        margin = 36
+        top = page_height - margin - 40
+        rows_per_page = int((top - margin) // self.APPENDIX_ROW_HEIGHT)
+        
+        page_rows = []
+        page_number = 0
+        for row in self._iter_appendix_rows():
+            page_rows.append(row)
+            if len(page_rows) == rows_per_page:
+                page_number += 1
+                self._draw_appendix_page(pdf_canvas, page_rows, page_number, margin, top)
+                page_rows = []
+        
+        if page_rows or page_number == 0:
+            self._draw_appendix_page(pdf_canvas, page_rows, page_number + 1, margin, top)
+    
+    def _draw_appendix_page(self, pdf_canvas, rows, page_number, margin, top):
+        """
+        Dibuja una página del anexo usando un objeto de texto por columna
+        """
+        page_width, page_height = A4
+        
+        # Encabezado de la página
+        pdf_canvas.setFillColor(colors.HexColor('#1f2937'))
+        pdf_canvas.setFont('Helvetica-Bold', 12)
+        pdf_canvas.drawString(margin, page_height - margin - 12, "Anexo: Listado Completo de Transacciones")
+        pdf_canvas.setFont('Helvetica', 8)
+        pdf_canvas.drawRightString(
+            page_width - margin, page_height - margin - 12,
+            f"{self._truncate(self.report.csv_file.original_name, 50)} · Página {page_number} del anexo"
+        )
+        
+        # Fila de títulos
+        header_y = top + 4
+        pdf_canvas.setFillColor(colors.HexColor('#6366f1'))
+        pdf_canvas.rect(margin, header_y - 4, page_width - 2 * margin, self.APPENDIX_ROW_HEIGHT + 4, stroke=0, fill=1)
+        pdf_canvas.setFillColor(colors.white)
+        pdf_canvas.setFont('Helvetica-Bold', 8)
+        x = margin
+        for title, width, _ in self.APPENDIX_COLUMNS:
+            if title == 'Ventas':
+                pdf_canvas.drawRightString(x + width - 4, header_y, title)
+            else:
+                pdf_canvas.drawString(x + 4, header_y, title)
+            x += width
+        
+        # Filas de datos
+        pdf_canvas.setFillColor(colors.black)
+        first_y = top - self.APPENDIX_ROW_HEIGHT
+        x = margin
+        for index, (title, width, max_length) in enumerate(self.APPENDIX_COLUMNS):
+            text = pdf_canvas.beginText(x + 4, first_y)
+            text.setFont('Helvetica', 8, leading=self.APPENDIX_ROW_HEIGHT)
+            if index == 0:
+                for row in rows:
+                    text.textLine(row[0].strftime('%d/%m/%Y'))
+            elif index == 4:
+                # Montos alineados a la derecha
+                y = first_y
+                for row in rows:
+                    amount = self.format_currency(row[4])
+                    text.setTextOrigin(x + width - 4 - pdf_canvas.stringWidth(amount, 'Helvetica', 8), y)
+                    text.textOut(amount)
+                    y -= self.APPENDIX_ROW_HEIGHT
+            else:
+                for row in rows:
+                    text.textLine(self._truncate(row[index], max_length))
+            pdf_canvas.drawText(text)
+            x += width
+        
+        pdf_canvas.showPage()
@@ -0,0 +1,237 @@
+"""
+Progreso del procesamiento de archivos CSV
+
+`DataAnalysisService` publica en la caché la etapa actual, las filas
+procesadas, el rendimiento y el tiempo estimado restante; el endpoint SSE
+`csv-files/<id>/progress/` los envía al navegador. Con varios procesos la
+caché debe ser compartida (REDIS_URL). Al terminar cada etapa se registran su
+duración y sus filas en las métricas de Prometheus (main.metrics).
+"""
+
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from main.metrics import ANALYSIS_FILES, observe_analysis_stage
+
+STAGES = {
+    'queued': 'En cola',
+    'reading': 'Leyendo archivo',
+    'cleaning': 'Limpiando datos',
+    'analyzing': 'Analizando ventas',
+    'saving': 'Guardando registros',
+    'anomalies': 'Detectando anomalías',
+    'customers': 'Analizando clientes y vendedores',
+    'forecasting': 'Proyectando ventas',
+    'insights': 'Generando insights',
+    'aggregating': 'Actualizando totales del usuario',
+    'completed': 'Completado',
+    'error': 'Error',
+}
+
+FINAL_STAGES = ('completed', 'error')
+
+# Intervalo mínimo entre publicaciones de avance dentro de una misma etapa
+PUBLISH_INTERVAL = 0.25
+
+def progress_cache_key(csv_file_id):
+    return f"reports:progress:{csv_file_id}"
+
+def get_progress(csv_file_id):
+    """Devuelve el último estado publicado para un archivo o None"""
+    return cache.get(progress_cache_key(csv_file_id))
+
+class ProgressTracker:
+    """
+    Publica el avance del procesamiento de un CSVFile
+    """
+
+    def __init__(self, csv_file_id):
+        self.key = progress_cache_key(csv_file_id)
+        self.started = time.time()
+        self.state = {
+            'csv_file_id': csv_file_id,
+            'seq': 0,
+            'stage': 'queued',
+            'stage_label': STAGES['queued'],
+            'stages': [],
+            'processed': 0,
+            'total': None,
+            'unit': 'rows',
+            'rows': 0,
+            'percent': None,
+            'rows_per_second': None,
+            'eta_seconds': None,
+            'elapsed_seconds': 0,
+            'error': None,
+        }
+        self._stage_started = self.started
+        self._last_publish = 0
+
+    def stage(self, name, total=None, unit='rows'):
+        """
+        Inicia una etapa; `total` permite calcular porcentaje y ETA
+        """
+        self._observe_stage()
+        self._stage_started = time.time()
+        # Etapas recorridas: el stream puede no ver las etapas más breves
+        self.state['stages'].append(name)
+        self.state.update({
+            'stage': name,
+            'stage_label': STAGES[name],
+            'processed': 0,
+            'total': total,
+            'unit': unit,
+            'rows': 0,
+            'percent': 100.0 if name == 'completed' else None,
+            'rows_per_second': None,
+            'eta_seconds': None,
+        })
+        self._publish()
+
+    def advance(self, processed, total=None, rows=None):
+        """
+        Actualiza el avance de la etapa actual
+
+        `processed` y `total` se expresan en la unidad de la etapa (filas o
+        bytes leídos del archivo); `rows` son las filas procesadas hasta el
+        momento, para calcular el rendimiento.
+        """
+        now = time.time()
+        if total is not None:
+            self.state['total'] = total
+        total = self.state['total']
+        elapsed = now - self._stage_started
+
+        rows = processed if rows is None else rows
+        self.state['processed'] = processed
+        self.state['rows'] = rows
+        self.state['rows_per_second'] = round(rows / elapsed, 1) if elapsed > 0 else None
+        if total:
+            fraction = min(processed / total, 1.0)
+            self.state['percent'] = round(fraction * 100, 1)
+            self.state['eta_seconds'] = round(elapsed * (1 - fraction) / fraction, 1) if fraction > 0 else None
+
+        if now - self._last_publish >= PUBLISH_INTERVAL or processed == total:
+            self._publish()
+
+    def finish(self):
+        self.stage('completed')
+        ANALYSIS_FILES.labels('completed').inc()
+
+    def fail(self, message):
+        self.state['error'] = message
+        self.stage('error')
+        ANALYSIS_FILES.labels('error').inc()
+
+    def _observe_stage(self):
+        """Registra en las métricas la duración y las filas de la etapa que termina"""
+        name = self.state['stage']
+        if name == 'queued' or name in FINAL_STAGES:
+            return
+        rows = self.state['rows'] or (self.state['total'] if self.state['unit'] == 'rows' else 0)
+        observe_analysis_stage(name, time.time() - self._stage_started, rows)
+
+    def _publish(self):
+        now = time.time()
+        self.state['seq'] += 1
+        self.state['elapsed_seconds'] = round(now - self.started, 1)
+        self._last_publish = now
+        cache.set(self.key, self.state, settings.PROGRESS_CACHE_TIMEOUT)
+
+def _format_event(state):
+    return f"id: {state['seq']}\nevent: progress\ndata: {json.dumps(state)}\n\n"
+
+class ProgressStream:
+    """
+    Decide qué enviar al cliente en cada consulta del estado publicado
+
+    Lo comparten el stream síncrono y el async: emite un evento solo cuando
+    cambia el estado, un comentario cada PROGRESS_HEARTBEAT segundos sin
+    cambios (para que proxies y navegador no cierren la conexión) y termina
+    al llegar a una etapa final o tras PROGRESS_STREAM_TIMEOUT.
+    """
+
+    def __init__(self, csv_file_id):
+        self.csv_file_id = csv_file_id
+        self.started = self.last_sent = time.time()
+        self.last_seq = None
+        self.done = False
+
+    def active(self):
+        return not self.done and time.time() - self.started < settings.PROGRESS_STREAM_TIMEOUT
+
+    def step(self, state, status=None):
+        """
+        Texto a enviar para el último estado publicado, o None
+
+        Si no hay avance publicado y el archivo ya terminó (`status`, por
+        ejemplo porque se procesó en otro servidor sin caché compartida) se
+        emite su estado final.
+        """
+        if state is None and status in FINAL_STAGES:
+            self.done = True
+            return _format_event({
+                'csv_file_id': self.csv_file_id,
+                'seq': 0,
+                'stage': status,
+                'stage_label': STAGES[status],
+                'percent': 100.0 if status == 'completed' else None,
+                'error': None,
+            })
+
+        now = time.time()
+        if state is not None and state['seq'] != self.last_seq:
+            self.last_seq = state['seq']
+            self.last_sent = now
+            self.done = state['stage'] in FINAL_STAGES
+            return _format_event(state)
+        if now - self.last_sent >= settings.PROGRESS_HEARTBEAT:
+            self.last_sent = now
+            return ": ping\n\n"
+        return None
+
+def progress_events(csv_file):
+    """
+    Genera los eventos SSE del procesamiento de `csv_file`
+
+    Consulta la caché cada PROGRESS_POLL_INTERVAL segundos y ocupa el hilo
+    del worker mientras dura la conexión; ver `aprogress_events`.
+    """
+    stream = ProgressStream(csv_file.id)
+    yield f"retry: {settings.PROGRESS_RETRY_MS}\n\n"
+
+    while stream.active():
+        state = get_progress(csv_file.id)
+        status = None
+        if state is None:
+            csv_file.refresh_from_db(fields=['status'])
+            status = csv_file.status
+        event = stream.step(state, status)
+        if event:
+            yield event
+        if not stream.done:
+            time.sleep(settings.PROGRESS_POLL_INTERVAL)
+
+async def aprogress_events(csv_file):
+    """
+    Versión async de `progress_events` para servidores ASGI: la espera entre
+    consultas no ocupa ningún hilo
+    """
+    stream = ProgressStream(csv_file.id)
+    yield f"retry: {settings.PROGRESS_RETRY_MS}\n\n"
+
+    while stream.active():
+        state = await cache.aget(progress_cache_key(csv_file.id))
+        status = None
+        if state is None:
+            await csv_file.arefresh_from_db(fields=['status'])
+            status = csv_file.status
+        event = stream.step(state, status)
+        if event:
+            yield event
+        if not stream.done:
+            await asyncio.sleep(settings.PROGRESS_POLL_INTERVAL)
@@ -0,0 +1,218 @@
+"""
+Inferencia del esquema de un CSV a partir de una muestra
+
+Con los primeros SCHEMA_SAMPLE_BYTES del archivo (ya descomprimido) se
+detectan la codificación, el separador, el separador decimal y el
+encabezado. Los nombres de columna se normalizan con COLUMN_MAPPING y el tipo
+de cada columna y el formato de las fechas se infieren de la muestra. La
+lectura completa usa después `dtype`, `usecols` y esos parámetros en vez de
+dejar que pandas los adivine.
+
+La parte del esquema que depende solo del encabezado (separador y nombres
+de columna) se guarda en caché por usuario y huella del encabezado, así la
+siguiente subida con el mismo encabezado no la repite. El formato de los
+números, los tipos y el formato de las fechas dependen de los datos y se
+infieren siempre con la muestra del archivo nuevo.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import re
+
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from .columns import REQUIRED_COLUMNS, normalize_column, sniff_delimiter
+from .compression import open_csv
+from .dates import detect_date_format
+
+# Columnas normalizadas que se intentan leer como número; el resto se lee como texto
+NUMERIC_COLUMNS = ('sales_amount', 'quantity')
+
+# Números con coma decimal (1.234,56 / 12,5) o con punto decimal (1,234.56 / 12.5)
+COMMA_DECIMAL = re.compile(r'^[-+]?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?$')
+DOT_DECIMAL = re.compile(r'^[-+]?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?$')
+
+SCHEMA_VERSION = 3
+
+def detect_encoding(sample):
+    """UTF-8 (con o sin BOM) o, si no decodifica, Windows-1252/Latin-1"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # La muestra puede cortar un carácter multibyte al final
+        if e.reason == 'unexpected end of data' and e.start >= len(sample) - 3:
+            return 'utf-8'
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+def detect_number_format(values):
+    """
+    Devuelve (decimal, thousands) según los valores numéricos de la muestra
+
+    Solo se elige la coma decimal si hay valores que únicamente se pueden
+    leer así (por ejemplo 12,5 o 1.234,56).
+    """
+    values = [value.strip() for value in values if isinstance(value, str) and value.strip()]
+    comma_only = sum(1 for value in values if COMMA_DECIMAL.match(value) and not DOT_DECIMAL.match(value))
+    dot_only = sum(1 for value in values if DOT_DECIMAL.match(value) and not COMMA_DECIMAL.match(value))
+    if comma_only > dot_only:
+        return ',', '.' if any('.' in value for value in values) else None
+    return '.', ',' if any(',' in value for value in values) else None
+
+def infer_header(lines):
+    """
+    Separador y nombres de columna (original -> normalizado) a partir de las
+    primeras líneas
+
+    Lanza ValueError si falta alguna columna requerida.
+    """
+    delimiter = sniff_delimiter(lines[:50])
+    header = next(csv.reader([lines[0]], delimiter=delimiter))
+
+    # Columnas sin nombre (separadores al final de la línea) o repetidas tras
+    # normalizar no se leen
+    rename = {}
+    for name in header:
+        normalized = normalize_column(name)
+        if name.strip() and normalized not in rename.values():
+            rename[name] = normalized
+    for col in REQUIRED_COLUMNS:
+        if col not in rename.values():
+            raise ValueError(f"Columna requerida '{col}' no encontrada en el CSV")
+    return delimiter, rename
+
+def infer_schema(sample, complete=False, header=None):
+    """
+    Infiere el esquema de un CSV a partir de sus primeros bytes
+
+    Lanza ValueError si falta alguna columna requerida. `complete` indica
+    que la muestra es el archivo entero (la última línea no está cortada).
+    Con `header` (separador y columnas de la caché) solo se infiere lo que
+    depende de los datos.
+    """
+    encoding = detect_encoding(sample)
+    lines = sample.decode(encoding, errors='replace').lstrip('\ufeff').splitlines()
+    if not complete and len(lines) > 1:
+        lines = lines[:-1]
+    if not lines:
+        raise ValueError("El archivo CSV está vacío")
+
+    delimiter, rename = header or infer_header(lines)
+
+    try:
+        sample_df = pd.read_csv(
+            io.StringIO('\n'.join(lines)), sep=delimiter, dtype=str, usecols=list(rename)
+        ).rename(columns=rename)
+    except (ValueError, csv.Error):
+        sample_df = pd.DataFrame(columns=list(rename.values()))
+
+    numeric_values = []
+    for col in NUMERIC_COLUMNS:
+        if col in sample_df.columns:
+            numeric_values.extend(sample_df[col].dropna().tolist())
+    decimal, thousands = detect_number_format(numeric_values)
+
+    dtype = {}
+    for name, col in rename.items():
+        if col in NUMERIC_COLUMNS and col in sample_df.columns and _all_numeric(sample_df[col], decimal, thousands):
+            dtype[name] = 'float64'
+        else:
+            # Texto: columnas de texto, adicionales (se guardan como texto) y
+            # numéricas con valores no numéricos (se limpian en el análisis)
+            dtype[name] = 'str'
+
+    date_format = None
+    if 'date' in sample_df.columns:
+        date_format = detect_date_format(sample_df['date'], settings.CSV_DATE_DAYFIRST)
+
+    return {
+        'version': SCHEMA_VERSION,
+        'encoding': encoding,
+        'delimiter': delimiter,
+        'decimal': decimal,
+        'thousands': thousands,
+        'rename': rename,
+        'dtype': dtype,
+        'date_format': date_format,
+    }
+
+def to_numeric(values, decimal='.', thousands=None):
+    """Convierte una columna de texto a número con los separadores del archivo; lo inválido queda en NaN"""
+    values = values.astype('str').str.strip()
+    if thousands:
+        values = values.str.replace(thousands, '', regex=False)
+    if decimal != '.':
+        values = values.str.replace(decimal, '.', regex=False)
+    return pd.to_numeric(values, errors='coerce')
+
+def _all_numeric(values, decimal, thousands):
+    return to_numeric(values.dropna(), decimal, thousands).notna().all()
+
+def read_csv_kwargs(schema, typed=True):
+    """
+    Parámetros de `pd.read_csv` para leer el archivo completo
+
+    Sin `typed` solo se fijan los tipos de texto, pandas infiere los
+    numéricos y los bytes que no corresponden a la codificación se reemplazan
+    (se usa si el archivo tiene valores que la muestra no anticipó).
+    """
+    if not typed:
+        return {
+            **read_csv_kwargs(schema),
+            'encoding_errors': 'replace',
+            'dtype': {name: 'str' for name in schema['dtype'] if schema['rename'][name] not in NUMERIC_COLUMNS},
+        }
+    return {
+        'sep': schema['delimiter'],
+        'encoding': schema['encoding'],
+        'decimal': schema['decimal'],
+        'thousands': schema['thousands'],
+        'usecols': list(schema['rename']),
+        'dtype': schema['dtype'],
+    }
+
+def schema_cache_key(user_id, header_line):
+    fingerprint = hashlib.sha1(header_line).hexdigest()
+    return f"reports:schema:{user_id}:{fingerprint}"
+
+def get_csv_schema(csv_file, use_cache=True):
+    """
+    Esquema del archivo de un CSVFile
+
+    Si el usuario ya subió un archivo con el mismo encabezado y la misma
+    codificación, el separador y las columnas salen de la caché; el formato
+    de los números, los tipos y el formato de las fechas se infieren siempre
+    con la muestra de este archivo. Devuelve (esquema, si usó la caché).
+    """
+    with open_csv(csv_file.file, csv_file.original_name) as stream:
+        sample = stream.read(settings.SCHEMA_SAMPLE_BYTES)
+    complete = len(sample) < settings.SCHEMA_SAMPLE_BYTES
+
+    key = schema_cache_key(csv_file.user_id, sample.split(b'\n', 1)[0])
+    if use_cache:
+        header = cache.get(key)
+        if (
+            header is not None
+            and header.get('version') == SCHEMA_VERSION
+            and header['encoding'] == detect_encoding(sample)
+        ):
+            return infer_schema(sample, complete, (header['delimiter'], header['rename'])), True
+
+    schema = infer_schema(sample, complete)
+    cache.set(key, {
+        'version': SCHEMA_VERSION,
+        'encoding': schema['encoding'],
+        'delimiter': schema['delimiter'],
+        'rename': schema['rename'],
+    }, settings.SCHEMA_CACHE_TIMEOUT)
+    return schema, False
@@ -1,12 +1,17 @@
 from rest_framework import serializers
-from .models import CSVFile, Report, SalesData
+from .compression import check_magic_number, get_compression
+from .models import CSVFile, CustomerMetrics, Report, SalesAnomaly, SalesData, SellerPerformance
+import hashlib
 import os
 
+# Dimensiones que se cargan junto con la muestra de ventas
+SAMPLE_RELATED = ('product', 'category', 'region')
+
 class CSVFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = CSVFile
-        fields = ['id', 'original_name', 'status', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'status', 'created_at', 'updated_at']
+        fields = ['id', 'original_name', 'status', 'checksum', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'status', 'checksum', 'created_at', 'updated_at']
 
 class CSVFileUploadSerializer(serializers.ModelSerializer):
     file = serializers.FileField()
@@ -19,25 +24,63 @@ class CSVFileUploadSerializer(serializers.ModelSerializer):
         """
         Validar que el archivo sea un CSV válido
         """
-        if not value.name.endswith('.csv'):
-            raise serializers.ValidationError("Solo se permiten archivos CSV (.csv)")
+        try:
+            compression = get_compression(value.name)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
         
+        # El límite aplica al tamaño subido (comprimido); el descomprimido
+        # se limita con CSV_MAX_DECOMPRESSED_SIZE al procesar
         if value.size > 50 * 1024 * 1024:  # 50MB
             raise serializers.ValidationError("El archivo es demasiado grande. Máximo 50MB permitido.")
         
+        try:
+            check_magic_number(value, compression)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        
         return value
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         validated_data['original_name'] = validated_data['file'].name
+        hasher = hashlib.sha256()
+        for chunk in validated_data['file'].chunks():
+            hasher.update(chunk)
+        validated_data['checksum'] = hasher.hexdigest()
         return super().create(validated_data)
 
 class SalesDataSerializer(serializers.ModelSerializer):
+    # Nombres de las dimensiones (la consulta debe incluir select_related)
+    product = serializers.CharField(source='product.name', read_only=True)
+    category = serializers.CharField(source='category.name', read_only=True)
+    region = serializers.CharField(source='region.name', read_only=True)
+    
     class Meta:
         model = SalesData
         fields = ['id', 'date', 'product', 'category', 'region', 'sales_amount', 'quantity', 'additional_data']
 
+class SalesAnomalySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SalesAnomaly
+        fields = ['id', 'product', 'region', 'date', 'sales_amount', 'expected', 'score', 'direction']
+
+class CustomerMetricsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomerMetrics
+        fields = [
+            'customer', 'first_purchase', 'last_purchase', 'orders', 'total_sales',
+            'recency_days', 'r_score', 'f_score', 'm_score', 'segment'
+        ]
+
+class SellerPerformanceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SellerPerformance
+        fields = ['seller', 'total_sales', 'records', 'customers', 'products', 'average_ticket', 'share']
+
 class ReportSerializer(serializers.ModelSerializer):
+    SAMPLE_SIZE = 20
+    
     csv_file = CSVFileSerializer(read_only=True)
     sales_data_sample = serializers.SerializerMethodField()
     pdf_url = serializers.SerializerMethodField()
@@ -48,7 +91,7 @@ class ReportSerializer(serializers.ModelSerializer):
             'id', 'csv_file', 'total_sales', 'total_records', 
             'date_range_start', 'date_range_end', 'top_products', 
             'sales_by_region', 'sales_by_date', 'monthly_trends',
-            'auto_insights', 'created_at', 'updated_at', 
+            'forecast', 'data_quality', 'auto_insights', 'created_at', 'updated_at', 
             'sales_data_sample', 'pdf_url'
         ]
     
@@ -56,7 +99,10 @@ class ReportSerializer(serializers.ModelSerializer):
         """
         Obtener una muestra de los datos de ventas para el dashboard
         """
-        sample = obj.sales_data.all()[:20]  # Primeros 20 registros
+        # Usar la muestra precargada con Prefetch si la vista la incluyó
+        sample = getattr(obj, 'sales_data_sample_rows', None)
+        if sample is None:
+            sample = obj.sales_data.select_related(*SAMPLE_RELATED).order_by('id')[:self.SAMPLE_SIZE]  # Primeros 20 registros
         return SalesDataSerializer(sample, many=True).data
     
     def get_pdf_url(self, obj):
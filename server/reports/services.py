@@ -2,8 +2,21 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from decimal import Decimal
+from django.conf import settings
 from django.core.files.base import ContentFile
-from .models import CSVFile, Report, SalesData
+from .columns import COLUMN_MAPPING, REQUIRED_COLUMNS
+from .dates import parse_dates
+from .dimensions import dimension_maps
+from .compression import DecompressedSizeExceeded, open_csv
+from .analytics import remove_report_aggregates, update_report_aggregates
+from .anomalies import detect_anomalies
+from .customers import cohort_retention, rfm_table, seller_performance
+from .forecasting import build_forecast
+from .progress import ProgressTracker
+from .schema import NUMERIC_COLUMNS, get_csv_schema, read_csv_kwargs, to_numeric
+from .sketches import SalesSketches
+from .models import CSVFile, CohortRetention, CustomerMetrics, Report, SalesAnomaly, SalesData, SellerPerformance
+import io
 import os
 import json
 
@@ -15,6 +28,14 @@ class DataAnalysisService:
     def __init__(self, csv_file):
         self.csv_file = csv_file
         self.df = None
+        self.progress = ProgressTracker(csv_file.id)
+        self.anomalies = None
+        self.customers = None
+        self.cohorts = None
+        self.sellers = None
+        self.schema = None
+        self.source_columns = {}
+        self.data_quality = {}
         
     def process_csv(self):
         """
@@ -25,35 +46,119 @@ class DataAnalysisService:
             self.csv_file.status = 'processing'
             self.csv_file.save()
             
-            # Leer el archivo CSV
-            self.df = pd.read_csv(self.csv_file.file.path)
+            # Leer el archivo CSV (descomprimiéndolo al vuelo si es .gz/.zst/.bz2)
+            self._read_csv()
             
             # Limpiar y normalizar datos
+            self.progress.stage('cleaning', total=len(self.df))
             self._clean_data()
             
             # Crear o obtener el informe
             report, created = Report.objects.get_or_create(csv_file=self.csv_file)
             
             # Realizar análisis
+            self.progress.stage('analyzing', total=len(self.df))
             self._analyze_sales_data(report)
             
             # Guardar datos individuales
+            self.progress.stage('saving', total=len(self.df))
             self._save_sales_data(report)
             
+            # Detectar días con ventas inusuales
+            self.progress.stage('anomalies')
+            self._detect_anomalies(report)
+            
+            # RFM, cohortes de clientes y desempeño de vendedores
+            self.progress.stage('customers')
+            self._analyze_customers(report)
+            
+            # Proyectar ventas
+            self.progress.stage('forecasting')
+            self._generate_forecast(report)
+            
             # Generar insights automáticos
+            self.progress.stage('insights')
             self._generate_insights(report)
             
+            # Actualizar los totales del usuario con el aporte de este informe
+            self.progress.stage('aggregating')
+            update_report_aggregates(report, self.df)
+            
             # Actualizar estado a completado
             self.csv_file.status = 'completed'
             self.csv_file.save()
+            self.progress.finish()
             
             return report
             
         except Exception as e:
             self.csv_file.status = 'error'
             self.csv_file.save()
+            # Un informe con error no cuenta en los totales del usuario
+            report = Report.objects.filter(csv_file=self.csv_file).first()
+            if report is not None:
+                remove_report_aggregates(report)
+            self.progress.fail(str(e))
             raise e
     
+    def _read_csv(self):
+        """
+        Lee el CSV con el esquema inferido de una muestra (o el de la caché
+        del usuario): separador, codificación, columnas y tipos explícitos
+
+        Si el archivo completo no respeta el esquema (por ejemplo, un monto no
+        numérico más allá de la muestra), se vuelve a leer dejando que pandas
+        infiera los tipos numéricos.
+        """
+        schema, cached = get_csv_schema(self.csv_file)
+        try:
+            self.df = self._read_chunks(schema, typed=True)
+        except DecompressedSizeExceeded:
+            raise
+        except ValueError:
+            if cached:
+                schema, cached = get_csv_schema(self.csv_file, use_cache=False)
+            self.df = self._read_chunks(schema, typed=False)
+            for name in schema['rename']:
+                if schema['rename'][name] in NUMERIC_COLUMNS and self.df[name].dtype == object:
+                    self.df[name] = to_numeric(self.df[name], schema['decimal'], schema['thousands'])
+        
+        self.df.rename(columns=schema['rename'], inplace=True)
+        # Nombre de cada columna en el CSV: las columnas adicionales que se
+        # normalizan para el análisis (cliente, vendedor) se guardan en
+        # additional_data con su nombre original, igual que las demás
+        self.source_columns = {col: name.lower().strip() for name, col in schema['rename'].items()}
+        self.schema = schema
+    
+    def _read_chunks(self, schema, typed):
+        """
+        Lee el CSV por bloques de filas publicando el avance
+
+        El avance se mide en bytes leídos del archivo guardado (comprimido o
+        no) respecto de su tamaño total.
+        """
+        field_file = self.csv_file.file
+        total_bytes = field_file.size
+        self.progress.stage('reading', total=total_bytes, unit='bytes')
+        
+        chunks = []
+        rows = 0
+        kwargs = read_csv_kwargs(schema, typed)
+        with open_csv(field_file, self.csv_file.original_name) as stream:
+            if schema['encoding'] not in ('utf-8', 'utf-8-sig'):
+                # pandas no reconoce el FieldFile como binario y lo decodificaría como UTF-8
+                stream = io.TextIOWrapper(
+                    stream, encoding=kwargs.pop('encoding'), errors=kwargs.pop('encoding_errors', 'strict'), newline=''
+                )
+            reader = pd.read_csv(stream, chunksize=settings.CSV_READ_CHUNK_ROWS, **kwargs)
+            for chunk in reader:
+                chunks.append(chunk)
+                rows += len(chunk)
+                self.progress.advance(field_file.tell(), rows=rows)
+        self.progress.advance(total_bytes, rows=rows)
+        
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=list(schema['rename']))
+    
     def _clean_data(self):
         """
         Limpia y normaliza los datos del DataFrame
@@ -62,30 +167,16 @@ class DataAnalysisService:
         self.df.columns = self.df.columns.str.lower().str.strip()
         
         # Mapear posibles nombres de columnas
-        column_mapping = {
-            'fecha': 'date',
-            'producto': 'product',
-            'categoría': 'category',
-            'categoria': 'category',
-            'región': 'region',
-            'region': 'region',
-            'ventas': 'sales_amount',
-            'venta': 'sales_amount',
-            'monto': 'sales_amount',
-            'cantidad': 'quantity',
-            'qty': 'quantity'
-        }
-        
-        self.df.rename(columns=column_mapping, inplace=True)
+        self.df.rename(columns=COLUMN_MAPPING, inplace=True)
         
         # Asegurar que las columnas necesarias existan
-        required_columns = ['date', 'product', 'sales_amount']
-        for col in required_columns:
+        for col in REQUIRED_COLUMNS:
             if col not in self.df.columns:
                 raise ValueError(f"Columna requerida '{col}' no encontrada en el CSV")
         
-        # Convertir fecha
-        self.df['date'] = pd.to_datetime(self.df['date'], errors='coerce')
+        # Convertir fecha con el formato detectado en la muestra (día/mes ante la ambigüedad)
+        date_format = self.schema.get('date_format') if self.schema else None
+        self.df['date'], date_stats = parse_dates(self.df['date'], date_format, settings.CSV_DATE_DAYFIRST)
         
         # Convertir monto de ventas
         self.df['sales_amount'] = pd.to_numeric(self.df['sales_amount'], errors='coerce')
@@ -97,7 +188,15 @@ class DataAnalysisService:
             self.df['quantity'] = pd.to_numeric(self.df['quantity'], errors='coerce').fillna(1)
         
         # Eliminar filas con datos faltantes críticos
+        rows = len(self.df)
+        self.data_quality = {
+            'rows': rows,
+            **date_stats,
+            'invalid_amounts': int(self.df['sales_amount'].isna().sum()),
+            'missing_products': int(self.df['product'].isna().sum()),
+        }
         self.df.dropna(subset=['date', 'product', 'sales_amount'], inplace=True)
+        self.data_quality['dropped_rows'] = rows - len(self.df)
         
         # Rellenar valores faltantes opcionales
         self.df['category'].fillna('Sin Categoría', inplace=True)
@@ -112,13 +211,35 @@ class DataAnalysisService:
         report.total_records = len(self.df)
         report.date_range_start = self.df['date'].min().date()
         report.date_range_end = self.df['date'].max().date()
+        report.data_quality = self.data_quality
         
-        # Top productos
-        top_products = self.df.groupby('product')['sales_amount'].sum().sort_values(ascending=False).head(10)
-        report.top_products = {
-            'labels': top_products.index.tolist(),
-            'data': top_products.values.tolist()
-        }
+        # Top productos: exacto con groupby o, en archivos muy grandes, con
+        # sketches de memoria acotada (ver reports.sketches). Solo en ese caso
+        # se guardan los sketches; los del resto se arman al combinarlos
+        if settings.ANALYSIS_SKETCHES or len(self.df) >= settings.ANALYSIS_SKETCH_MIN_ROWS:
+            sketches = SalesSketches.from_frame(
+                self.df,
+                settings.ANALYSIS_SKETCH_CAPACITY,
+                settings.ANALYSIS_HLL_PRECISION,
+                chunk_rows=settings.CSV_READ_CHUNK_ROWS,
+            )
+            report.sketches = sketches.to_dict()
+            top = sketches.products.top(10)
+            report.top_products = {
+                'labels': [product for product, _, _ in top],
+                'data': [sales for _, sales, _ in top],
+                'errors': [error for _, _, error in top],
+                'approximate': True,
+                'distinct_products': sketches.distinct_products.estimate(),
+            }
+        else:
+            report.sketches = {}
+            top_products = self.df.groupby('product')['sales_amount'].sum().sort_values(ascending=False).head(10)
+            report.top_products = {
+                'labels': top_products.index.tolist(),
+                'data': top_products.values.tolist(),
+                'distinct_products': int(self.df['product'].nunique()),
+            }
         
         # Ventas por región
         if 'region' in self.df.columns:
@@ -158,34 +279,152 @@ class DataAnalysisService:
     def _save_sales_data(self, report):
         """
         Guarda los datos individuales de ventas
+
+        Producto, categoría y región se guardan como claves enteras de las
+        dimensiones del usuario, resueltas por lote de filas.
         """
         # Eliminar datos existentes
         SalesData.objects.filter(report=report).delete()
         
-        # Crear nuevos registros
-        sales_data_objects = []
-        for _, row in self.df.iterrows():
-            additional_data = {}
+        dimensions = dimension_maps(self.csv_file.user_id)
+        standard_columns = ['date', 'product', 'category', 'region', 'sales_amount', 'quantity', 'year_month']
+        extra_columns = [col for col in self.df.columns if col not in standard_columns]
+        
+        # Crear en lotes para mejor rendimiento
+        saved = 0
+        for start in range(0, len(self.df), 1000):
+            batch = self.df.iloc[start:start + 1000]
+            for field, dimension in dimensions.items():
+                dimension.resolve(batch[field].unique())
             
-            # Agregar columnas adicionales que no son campos estándar
-            for col in self.df.columns:
-                if col not in ['date', 'product', 'category', 'region', 'sales_amount', 'quantity', 'year_month']:
-                    additional_data[col] = str(row[col]) if pd.notna(row[col]) else None
+            sales_data_objects = []
+            for _, row in batch.iterrows():
+                # Agregar columnas adicionales que no son campos estándar
+                additional_data = {
+                    self.source_columns.get(col, col): str(row[col]) if pd.notna(row[col]) else None
+                    for col in extra_columns
+                }
+                
+                sales_data_objects.append(SalesData(
+                    report=report,
+                    date=row['date'].date(),
+                    product_id=dimensions['product'].get(row['product']),
+                    category_id=dimensions['category'].get(row['category']),
+                    region_id=dimensions['region'].get(row['region']),
+                    sales_amount=Decimal(str(row['sales_amount'])),
+                    quantity=int(row['quantity']),
+                    additional_data=additional_data
+                ))
             
-            sales_data = SalesData(
+            SalesData.objects.bulk_create(sales_data_objects)
+            saved += len(sales_data_objects)
+            self.progress.advance(saved)
+    
+    def _detect_anomalies(self, report):
+        """
+        Guarda los días con ventas inusuales por producto y región
+        """
+        SalesAnomaly.objects.filter(report=report).delete()
+        anomalies = detect_anomalies(
+            self.df,
+            window=settings.ANOMALY_WINDOW_DAYS,
+            threshold=settings.ANOMALY_Z_THRESHOLD,
+            min_active_days=settings.ANOMALY_MIN_ACTIVE_DAYS,
+            max_results=settings.ANOMALY_MAX_STORED,
+        )
+        SalesAnomaly.objects.bulk_create([
+            SalesAnomaly(
                 report=report,
-                date=row['date'].date(),
-                product=row['product'],
-                category=row.get('category', 'Sin Categoría'),
-                region=row.get('region', 'Sin Región'),
-                sales_amount=Decimal(str(row['sales_amount'])),
-                quantity=int(row['quantity']),
-                additional_data=additional_data
+                product=str(row.product),
+                region=str(row.region),
+                date=row.date.date(),
+                sales_amount=Decimal(str(round(row.sales_amount, 2))),
+                expected=Decimal(str(round(row.expected, 2))),
+                score=round(row.score, 2),
+                direction='spike' if row.score > 0 else 'drop',
             )
-            sales_data_objects.append(sales_data)
+            for row in anomalies.itertuples(index=False)
+        ], batch_size=1000)
+        self.anomalies = anomalies
+    
+    def _analyze_customers(self, report):
+        """
+        Guarda las métricas RFM, la retención por cohorte y el desempeño de
+        los vendedores (si el CSV tiene columnas de cliente o vendedor)
+        """
+        CustomerMetrics.objects.filter(report=report).delete()
+        CohortRetention.objects.filter(report=report).delete()
+        SellerPerformance.objects.filter(report=report).delete()
         
-        # Crear en lotes para mejor rendimiento
-        SalesData.objects.bulk_create(sales_data_objects, batch_size=1000)
+        customers = rfm_table(self.df)
+        CustomerMetrics.objects.bulk_create([
+            CustomerMetrics(
+                report=report,
+                customer=row.customer,
+                first_purchase=row.first_purchase.date(),
+                last_purchase=row.last_purchase.date(),
+                orders=row.orders,
+                total_sales=Decimal(str(round(row.total_sales, 2))),
+                recency_days=row.recency_days,
+                r_score=row.r_score,
+                f_score=row.f_score,
+                m_score=row.m_score,
+                segment=row.segment,
+            )
+            for row in customers.itertuples(index=False)
+        ], batch_size=2000)
+        
+        cohorts = cohort_retention(self.df, max_periods=settings.COHORT_MAX_PERIODS)
+        CohortRetention.objects.bulk_create([
+            CohortRetention(
+                report=report,
+                cohort=row.cohort.date(),
+                period=row.period,
+                customers=row.customers,
+                retention=round(row.retention, 4),
+                sales_amount=Decimal(str(round(row.sales_amount, 2))),
+            )
+            for row in cohorts.itertuples(index=False)
+        ], batch_size=2000)
+        
+        sellers = seller_performance(self.df)
+        SellerPerformance.objects.bulk_create([
+            SellerPerformance(
+                report=report,
+                seller=row.seller,
+                total_sales=Decimal(str(round(row.total_sales, 2))),
+                records=row.records,
+                customers=row.customers,
+                products=row.products,
+                average_ticket=Decimal(str(round(row.average_ticket, 2))),
+                share=round(row.share, 2),
+            )
+            for row in sellers.itertuples(index=False)
+        ], batch_size=2000)
+        
+        self.customers = customers
+        self.cohorts = cohorts
+        self.sellers = sellers
+    
+    def _generate_forecast(self, report):
+        """
+        Proyecta las ventas totales y de los productos principales
+
+        El ajuste tiene un presupuesto de FORECAST_TIME_BUDGET segundos para
+        que la latencia del procesamiento sea predecible.
+        """
+        if not settings.FORECAST_ENABLED:
+            report.forecast = {}
+            return
+        
+        top_products = report.top_products.get('labels', [])[:settings.FORECAST_TOP_PRODUCTS]
+        report.forecast = build_forecast(
+            self.df,
+            top_products,
+            horizon_days=settings.FORECAST_HORIZON_DAYS,
+            horizon_months=settings.FORECAST_HORIZON_MONTHS,
+            time_budget=settings.FORECAST_TIME_BUDGET,
+        )
     
     def _generate_insights(self, report):
         """
@@ -215,9 +454,12 @@ class DataAnalysisService:
                 insights.append(f"Las ventas se mantuvieron estables en {last_month['month']} con un cambio de {last_month['growth']:.1f}%.")
         
         # Insight sobre diversificación de productos
-        num_products = len(report.top_products['labels']) if report.top_products else 0
+        num_products = report.top_products.get('distinct_products', 0) if report.top_products else 0
         if num_products > 0:
-            insights.append(f"El portafolio incluye {num_products} productos diferentes en el top 10.")
+            if report.top_products.get('approximate'):
+                insights.append(f"El portafolio incluye aproximadamente {num_products:,} productos diferentes.")
+            else:
+                insights.append(f"El portafolio incluye {num_products} productos diferentes.")
         
         # Insight sobre regiones
         if report.sales_by_region:
@@ -226,5 +468,49 @@ class DataAnalysisService:
                 top_region = report.sales_by_region['labels'][0]
                 insights.append(f"Las operaciones abarcan {num_regions} regiones, siendo '{top_region}' la más exitosa.")
         
+        # Insights sobre anomalías (las de mayor z-score)
+        anomalies = self.anomalies
+        if anomalies is not None and not anomalies.empty:
+            insights.append(f"Se detectaron {len(anomalies)} días con ventas inusuales por producto y región.")
+            for row in anomalies.head(3).itertuples(index=False):
+                kind = 'Pico' if row.score > 0 else 'Caída'
+                insights.append(
+                    f"{kind} inusual: '{row.product}' en {row.region} vendió S/.{row.sales_amount:,.2f} "
+                    f"el {row.date:%d/%m/%Y} (lo habitual era S/.{row.expected:,.2f})."
+                )
+        
+        # Insights sobre clientes y vendedores
+        customers = self.customers
+        if customers is not None and not customers.empty:
+            champions = int((customers['segment'] == 'champions').sum())
+            at_risk = int(customers['segment'].isin(['at_risk', 'hibernating']).sum())
+            insights.append(
+                f"Se analizaron {len(customers)} clientes: {champions} campeones y {at_risk} en riesgo o sin compras recientes."
+            )
+            next_month = self.cohorts[self.cohorts['period'] == 1]
+            if not next_month.empty:
+                insights.append(f"En promedio, el {next_month['retention'].mean():.1%} de los clientes vuelve a comprar al mes siguiente de su primera compra.")
+        sellers = self.sellers
+        if sellers is not None and len(sellers) > 1:
+            top = sellers.iloc[0]
+            insights.append(f"El vendedor con más ventas es '{top['seller']}' con S/.{top['total_sales']:,.2f} ({top['share']:.1f}% del total).")
+        
+        # Insight sobre la proyección
+        if report.forecast:
+            total_forecast = report.forecast['series'][0]['forecast']
+            horizon = report.forecast['horizon']
+            unit = 'meses' if report.forecast['frequency'] == 'month' else 'días'
+            projected = sum(total_forecast)
+            insights.append(f"Se proyectan ventas de aproximadamente S/.{projected:,.2f} para los próximos {horizon} {unit}.")
+        
+        # Insight sobre la calidad de los datos
+        quality = report.data_quality
+        if quality and quality.get('dropped_rows'):
+            insights.append(
+                f"Se descartaron {quality['dropped_rows']} filas de {quality['rows']}: "
+                f"{quality['invalid_dates']} con fecha no reconocida, {quality['invalid_amounts']} con monto "
+                f"inválido y {quality['missing_products']} sin producto."
+            )
+        
         report.auto_insights = '\n'.join(insights)
         report.save() 
\ No newline at end of file
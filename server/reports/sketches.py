@@ -0,0 +1,304 @@
+"""
+Resúmenes aproximados (sketches) de las ventas con memoria acotada
+
+- `SpaceSaving`: productos con más ventas (heavy hitters) con una cota de
+  error por producto; ocupa `capacity` contadores sin importar cuántos
+  productos distintos haya.
+- `HyperLogLog`: cantidad de productos y clientes distintos con un error
+  relativo típico de 1.04 / sqrt(2 ** precision).
+
+Ambos se actualizan por bloques de filas y se pueden combinar (`merge`), tanto
+entre bloques de un archivo como entre informes de distintos archivos. Solo
+los archivos analizados en modo aproximado los guardan en `Report.sketches`;
+para el resto se construyen al combinar, a partir de los totales exactos por
+producto (`ReportAggregate`) y de los clientes (`CustomerMetrics`).
+"""
+
+import base64
+
+import numpy as np
+import pandas as pd
+
+from .models import CustomerMetrics, ReportAggregate
+
+SKETCHES_VERSION = 1
+
+class SpaceSaving:
+    """
+    Resumen Space-Saving ponderado (suma de ventas por producto)
+
+    Para cada producto guardado, la venta real está en el intervalo
+    [count - error, count]. Los productos que no están en el resumen tienen
+    ventas de a lo sumo `bound`.
+    """
+
+    def __init__(self, capacity, counts=None, errors=None, bound=0.0, total=0.0):
+        self.capacity = capacity
+        self.counts = counts if counts is not None else pd.Series(dtype='float64')
+        self.errors = errors if errors is not None else pd.Series(dtype='float64')
+        self.bound = bound
+        self.total = total
+
+    @classmethod
+    def from_totals(cls, totals, capacity):
+        """
+        Resumen exacto a partir de los totales por producto de un bloque
+
+        Conserva los `capacity` mayores; la cota de los descartados es el
+        mayor total descartado.
+        """
+        totals = totals.sort_values(ascending=False)
+        kept = totals.iloc[:capacity]
+        bound = max(float(totals.iloc[capacity]), 0.0) if len(totals) > capacity else 0.0
+        return cls(
+            capacity,
+            counts=kept.astype('float64'),
+            errors=pd.Series(0.0, index=kept.index),
+            bound=bound,
+            total=float(totals.sum()),
+        )
+
+    def update(self, keys, weights):
+        """Agrega un bloque de filas (producto y monto de cada venta)"""
+        totals = pd.Series(np.asarray(weights, dtype='float64')).groupby(np.asarray(keys)).sum()
+        self.merge(SpaceSaving.from_totals(totals, self.capacity))
+
+    def merge(self, other):
+        """
+        Combina otro resumen en este
+
+        Un producto ausente en uno de los resúmenes puede tener en él hasta su
+        `bound`, que se suma tanto a la estimación como al error.
+        """
+        index = self.counts.index.union(other.counts.index)
+        counts = (
+            self.counts.reindex(index, fill_value=self.bound)
+            + other.counts.reindex(index, fill_value=other.bound)
+        )
+        errors = (
+            self.errors.reindex(index, fill_value=self.bound)
+            + other.errors.reindex(index, fill_value=other.bound)
+        )
+        counts = counts.sort_values(ascending=False, kind='stable')
+        dropped = counts.iloc[self.capacity:]
+        self.bound = max(self.bound + other.bound, float(dropped.max()) if len(dropped) else 0.0)
+        self.counts = counts.iloc[:self.capacity]
+        self.errors = errors.reindex(self.counts.index)
+        self.total += other.total
+        return self
+
+    def top(self, n):
+        """Devuelve los `n` productos con mayor estimación: (producto, ventas, error máximo)"""
+        counts = self.counts.iloc[:n]
+        return list(zip(counts.index.tolist(), counts.tolist(), self.errors.reindex(counts.index).tolist()))
+
+    def to_dict(self):
+        return {
+            'capacity': self.capacity,
+            'bound': self.bound,
+            'total': self.total,
+            'items': [
+                [key, count, error]
+                for key, count, error in zip(self.counts.index.tolist(), self.counts.tolist(), self.errors.tolist())
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        keys = [item[0] for item in data['items']]
+        return cls(
+            data['capacity'],
+            counts=pd.Series([item[1] for item in data['items']], index=keys, dtype='float64'),
+            errors=pd.Series([item[2] for item in data['items']], index=keys, dtype='float64'),
+            bound=data['bound'],
+            total=data['total'],
+        )
+
+def _bit_length(values):
+    """Cantidad de bits significativos de cada entero sin signo de 64 bits"""
+    high = (values >> np.uint64(32)).astype('float64')
+    low = (values & np.uint64(0xFFFFFFFF)).astype('float64')
+    # log2 es exacto para enteros de 32 bits representados en float64
+    with np.errstate(divide='ignore'):
+        high_bits = np.where(high > 0, np.floor(np.log2(high)) + 33, 0)
+        low_bits = np.where(low > 0, np.floor(np.log2(low)) + 1, 0)
+    return np.where(high > 0, high_bits, low_bits).astype('int64')
+
+class HyperLogLog:
+    """
+    Estimador de cantidad de valores distintos con 2 ** precision registros
+    """
+
+    def __init__(self, precision=12, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values):
+        """Agrega un bloque de valores (se comparan como texto)"""
+        # Los repetidos no cambian los registros: basta con los únicos del bloque
+        values = pd.Series(pd.Series(values).dropna().unique())
+        if values.empty:
+            return
+        # hash_array usa una clave fija: el mismo valor tiene el mismo hash en
+        # todos los procesos, necesario para combinar sketches guardados
+        hashes = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        shift = np.uint64(64 - self.precision)
+        index = (hashes >> shift).astype('int64')
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(remainder) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Solo se pueden combinar HyperLogLog con la misma precisión")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype('float64')))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Corrección para cardinalidades bajas (linear counting)
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    def to_dict(self):
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(self.registers.tobytes()).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return cls(data['precision'], registers)
+
+class SalesSketches:
+    """
+    Sketches de un informe: top de productos y productos/clientes distintos
+    """
+
+    def __init__(self, capacity, precision, products=None, distinct_products=None, distinct_customers=None):
+        self.products = products or SpaceSaving(capacity)
+        self.distinct_products = distinct_products or HyperLogLog(precision)
+        self.distinct_customers = distinct_customers or HyperLogLog(precision)
+
+    @classmethod
+    def from_frame(cls, df, capacity, precision, chunk_rows=None):
+        """
+        Construye los sketches de un DataFrame ya limpio
+
+        Con `chunk_rows` el top de productos se calcula por bloques (memoria
+        acotada por `capacity`); sin él se parte de los totales exactos.
+        """
+        sketches = cls(capacity, precision)
+        if chunk_rows is None:
+            totals = df.groupby('product')['sales_amount'].sum()
+            sketches.products = SpaceSaving.from_totals(totals, capacity)
+            chunk_rows = max(len(df), 1)
+            update_products = False
+        else:
+            update_products = True
+
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            if update_products:
+                sketches.products.update(chunk['product'].to_numpy(), chunk['sales_amount'].to_numpy())
+            sketches.distinct_products.update(chunk['product'])
+            if 'customer' in chunk.columns:
+                sketches.distinct_customers.update(chunk['customer'])
+        return sketches
+
+    def merge(self, other):
+        self.products.merge(other.products)
+        self.distinct_products.merge(other.distinct_products)
+        self.distinct_customers.merge(other.distinct_customers)
+        return self
+
+    def summary(self, n=10):
+        """Top de productos y conteos distintos con sus cotas de error"""
+        return {
+            'top_products': [
+                {'product': product, 'sales': round(sales, 2), 'max_error': round(error, 2)}
+                for product, sales, error in self.products.top(n)
+            ],
+            'other_products_max_sales': round(self.products.bound, 2),
+            'total_sales': round(self.products.total, 2),
+            'distinct_products': {
+                'estimate': self.distinct_products.estimate(),
+                'relative_error': round(self.distinct_products.relative_error, 4),
+            },
+            'distinct_customers': {
+                'estimate': self.distinct_customers.estimate(),
+                'relative_error': round(self.distinct_customers.relative_error, 4),
+            },
+        }
+
+    def to_dict(self):
+        return {
+            'version': SKETCHES_VERSION,
+            'products': self.products.to_dict(),
+            'distinct_products': self.distinct_products.to_dict(),
+            'distinct_customers': self.distinct_customers.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        products = SpaceSaving.from_dict(data['products'])
+        distinct_products = HyperLogLog.from_dict(data['distinct_products'])
+        return cls(
+            products.capacity,
+            distinct_products.precision,
+            products=products,
+            distinct_products=distinct_products,
+            distinct_customers=HyperLogLog.from_dict(data['distinct_customers']),
+        )
+
+def sketches_from_aggregates(report_ids, capacity, precision):
+    """
+    Construye los sketches de informes guardados sin ellos
+
+    Usa los totales por producto de `ReportAggregate` (exactos, por lo que el
+    Space-Saving no tiene error) y los clientes de `CustomerMetrics`, con una
+    consulta por tabla para todos los informes. Devuelve {report_id: SalesSketches}.
+    """
+    sketches = {report_id: SalesSketches(capacity, precision) for report_id in report_ids}
+    totals = pd.DataFrame(
+        ReportAggregate.objects.filter(report_id__in=report_ids, dimension='product')
+        .values_list('report_id', 'key', 'total_sales'),
+        columns=['report_id', 'key', 'total_sales'],
+    )
+    for report_id, group in totals.groupby('report_id'):
+        products = pd.Series(group['total_sales'].astype('float64').to_numpy(), index=group['key'].to_numpy())
+        sketches[report_id].products = SpaceSaving.from_totals(products, capacity)
+        sketches[report_id].distinct_products.update(group['key'])
+
+    customers = pd.DataFrame(
+        CustomerMetrics.objects.filter(report_id__in=report_ids).values_list('report_id', 'customer'),
+        columns=['report_id', 'customer'],
+    )
+    for report_id, group in customers.groupby('report_id'):
+        sketches[report_id].distinct_customers.update(group['customer'])
+    return sketches
+
+def merge_report_sketches(reports, capacity, precision):
+    """
+    Combina los sketches de varios informes
+
+    Los informes sin sketches guardados se resumen a partir de sus agregados.
+    Devuelve None si no hay informes.
+    """
+    built = sketches_from_aggregates(
+        [report.id for report in reports if not report.sketches], capacity, precision
+    )
+    merged = None
+    for report in reports:
+        sketches = SalesSketches.from_dict(report.sketches) if report.sketches else built[report.id]
+        merged = sketches if merged is None else merged.merge(sketches)
+    return merged
@@ -0,0 +1,86 @@
+"""
+Acceso a los archivos a través del storage de Django
+
+Los CSV subidos, las partes de las subidas reanudables y los PDFs se leen y
+escriben solo con la API de storage (open, save, delete, exists, url), nunca
+con rutas del disco. Así el mismo código funciona con el disco local
+(MEDIA_ROOT) y con un bucket S3 compatible (AWS S3, MinIO) compartido por
+varios servidores.
+"""
+
+import io
+import posixpath
+
+from django.http import FileResponse, HttpResponseRedirect
+
+# Bytes por lectura al recorrer varios archivos del storage como uno solo
+READ_BLOCK_SIZE = 1024 * 1024
+
+def file_exists(field_file):
+    """Indica si el FieldFile tiene nombre y el archivo existe en su storage"""
+    return bool(field_file) and field_file.storage.exists(field_file.name)
+
+def delete_file(field_file):
+    """Elimina el archivo de su storage (sin modificar el registro)"""
+    if field_file:
+        field_file.storage.delete(field_file.name)
+
+def signs_urls(storage):
+    """El storage entrega URLs firmadas de corta duración (S3 y compatibles)"""
+    return getattr(storage, 'querystring_auth', False)
+
+def download_response(field_file, content_type):
+    """
+    Respuesta para descargar un archivo del storage como adjunto
+
+    Si el storage firma URLs se redirige a una URL firmada de corta duración
+    y el archivo no pasa por el servidor; si no, se envía en bloques con
+    FileResponse a partir del stream del storage.
+    """
+    filename = posixpath.basename(field_file.name)
+    storage = field_file.storage
+    if signs_urls(storage):
+        return HttpResponseRedirect(storage.url(field_file.name, parameters={
+            'ResponseContentDisposition': f'attachment; filename="{filename}"',
+            'ResponseContentType': content_type,
+        }))
+    return FileResponse(field_file.open('rb'), as_attachment=True, filename=filename, content_type=content_type)
+
+class ConcatenatedReader(io.RawIOBase):
+    """
+    Stream de lectura que recorre varios archivos del storage en orden, como
+    si fueran uno solo; abre cada archivo recién cuando llega a él
+
+    Con `hasher` (por ejemplo hashlib.sha256()) se actualiza el hash con cada
+    bloque leído.
+    """
+
+    def __init__(self, storage, names, hasher=None):
+        self.storage = storage
+        self.names = list(names)
+        self.hasher = hasher
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                if not self.names:
+                    return 0
+                self.current = self.storage.open(self.names.pop(0), 'rb')
+            data = self.current.read(min(len(buffer), READ_BLOCK_SIZE))
+            if data:
+                buffer[:len(data)] = data
+                if self.hasher is not None:
+                    self.hasher.update(data)
+                return len(data)
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
@@ -0,0 +1,54 @@
+"""
+Datos de prueba: usuarios e informes con ventas creados sin procesar archivos
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from reports.dimensions import dimension_maps
+from reports.models import CSVFile, Report, SalesData
+
+
+def create_user(name='ventas'):
+    return get_user_model().objects.create_user(
+        username=name, email=f'{name}@example.com', password='clave-segura-123'
+    )
+
+
+def create_report(user, rows, name='ventas.csv', **fields):
+    """
+    Crea un CSVFile completado, su Report y una venta por cada fila
+
+    Cada fila es un dict con date, product, sales_amount y opcionalmente
+    category, region, quantity y additional_data.
+    """
+    csv_file = CSVFile.objects.create(
+        user=user, file=f'csv_files/{user.id}/{name}', original_name=name, status='completed'
+    )
+    report = Report.objects.create(
+        csv_file=csv_file,
+        total_sales=sum((Decimal(str(row['sales_amount'])) for row in rows), Decimal('0')),
+        total_records=len(rows),
+        date_range_start=min((row['date'] for row in rows), default=date(2024, 1, 1)),
+        date_range_end=max((row['date'] for row in rows), default=date(2024, 1, 1)),
+        **fields,
+    )
+    maps = dimension_maps(user.id)
+    for field, dimension in maps.items():
+        dimension.resolve(row.get(field, 'Sin dato') for row in rows)
+    SalesData.objects.bulk_create([
+        SalesData(
+            report=report,
+            date=row['date'],
+            product_id=maps['product'].get(row['product']),
+            category_id=maps['category'].get(row.get('category', 'Sin dato')),
+            region_id=maps['region'].get(row.get('region', 'Sin dato')),
+            sales_amount=Decimal(str(row['sales_amount'])),
+            quantity=row.get('quantity', 1),
+            additional_data=row.get('additional_data', {}),
+        )
+        for row in rows
+    ])
+    return report
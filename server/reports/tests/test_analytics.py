@@ -0,0 +1,155 @@
+from decimal import Decimal
+
+import pandas as pd
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.analytics import remove_report_aggregates, update_report_aggregates
+from reports.models import CSVFile, Report, ReportAggregate, UserSalesAggregate
+
+from .factories import create_report, create_user
+from .test_uploads import TemporaryMediaMixin
+
+
+def frame(rows):
+    """DataFrame limpio como el del análisis: (fecha, producto, región, monto)"""
+    return pd.DataFrame(rows, columns=['date', 'product', 'region', 'sales_amount']).assign(
+        date=lambda df: pd.to_datetime(df['date'])
+    )
+
+
+def aggregates(user):
+    return {
+        (row.dimension, row.key): (row.total_sales, row.records, row.reports)
+        for row in UserSalesAggregate.objects.filter(user=user)
+    }
+
+
+class UserSalesAggregateTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        self.first = create_report(self.user, [], name='enero.csv')
+        self.second = create_report(self.user, [], name='febrero.csv')
+        update_report_aggregates(self.first, frame([
+            ('2024-01-05', 'Laptop', 'Norte', 100.0),
+            ('2024-01-20', 'Mouse', 'Sur', 20.0),
+        ]))
+        update_report_aggregates(self.second, frame([
+            ('2024-01-25', 'Laptop', 'Sur', 50.0),
+            ('2024-02-03', 'Laptop', 'Sur', 30.0),
+        ]))
+
+    def test_reports_are_added(self):
+        result = aggregates(self.user)
+        self.assertEqual(result[('product', 'Laptop')], (Decimal('180.00'), 3, 2))
+        self.assertEqual(result[('product', 'Mouse')], (Decimal('20.00'), 1, 1))
+        self.assertEqual(result[('month', '2024-01')], (Decimal('170.00'), 3, 2))
+        self.assertEqual(result[('month', '2024-02')], (Decimal('30.00'), 1, 1))
+        self.assertEqual(result[('region', 'Sur')], (Decimal('100.00'), 3, 2))
+        # Un mes, dos productos y dos regiones
+        self.assertEqual(ReportAggregate.objects.filter(report=self.first).count(), 5)
+
+    def test_reprocess_replaces_previous_contribution(self):
+        update_report_aggregates(self.first, frame([('2024-03-01', 'Teclado', 'Norte', 40.0)]))
+        result = aggregates(self.user)
+        # Se descuenta el aporte anterior del primer informe: Mouse desaparece
+        self.assertEqual(result[('product', 'Laptop')], (Decimal('80.00'), 2, 1))
+        self.assertNotIn(('product', 'Mouse'), result)
+        self.assertEqual(result[('month', '2024-01')], (Decimal('50.00'), 1, 1))
+        self.assertEqual(result[('product', 'Teclado')], (Decimal('40.00'), 1, 1))
+        self.assertEqual(result[('region', 'Norte')], (Decimal('40.00'), 1, 1))
+
+    def test_reprocess_with_same_data_is_idempotent(self):
+        before = aggregates(self.user)
+        update_report_aggregates(self.second, frame([
+            ('2024-01-25', 'Laptop', 'Sur', 50.0),
+            ('2024-02-03', 'Laptop', 'Sur', 30.0),
+        ]))
+        self.assertEqual(aggregates(self.user), before)
+
+    def test_remove_contribution(self):
+        remove_report_aggregates(self.second)
+        remove_report_aggregates(self.second)
+        result = aggregates(self.user)
+        self.assertEqual(result[('product', 'Laptop')], (Decimal('100.00'), 1, 1))
+        self.assertNotIn(('month', '2024-02'), result)
+        self.assertFalse(ReportAggregate.objects.filter(report=self.second).exists())
+
+    def test_deleting_report_or_csv_file_decrements(self):
+        self.second.delete()
+        self.assertEqual(aggregates(self.user)[('product', 'Laptop')], (Decimal('100.00'), 1, 1))
+        # La eliminación en cascada desde el CSVFile también dispara pre_delete
+        self.first.csv_file.delete()
+        self.assertEqual(aggregates(self.user), {})
+
+    def test_users_are_independent(self):
+        other = create_user('otro')
+        report = create_report(other, [], name='otro.csv')
+        update_report_aggregates(report, frame([('2024-01-05', 'Laptop', 'Norte', 7.0)]))
+        self.assertEqual(aggregates(other), {
+            ('month', '2024-01'): (Decimal('7.00'), 1, 1),
+            ('product', 'Laptop'): (Decimal('7.00'), 1, 1),
+            ('region', 'Norte'): (Decimal('7.00'), 1, 1),
+        })
+        self.assertEqual(aggregates(self.user)[('product', 'Laptop')], (Decimal('180.00'), 3, 2))
+
+
+CSV = (
+    'fecha,producto,categoria,region,ventas\n'
+    '2024-03-01,Laptop,Electronica,Norte,100\n'
+    '2024-03-02,Mouse,Electronica,Sur,20\n'
+)
+
+
+class UserAnalyticsFlowTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse('csv-upload'), {'file': SimpleUploadedFile('ventas.csv', CSV.encode())}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.csv_file = CSVFile.objects.get(pk=response.data['csv_file']['id'])
+
+    def _rewrite(self, content):
+        name = self.csv_file.file.name
+        default_storage.delete(name)
+        default_storage.save(name, SimpleUploadedFile(name, content.encode()))
+
+    def _reprocess(self):
+        return self.client.post(reverse('reprocess-csv', kwargs={'csv_file_id': self.csv_file.id}))
+
+    def test_analytics_endpoint(self):
+        response = self.client.get(reverse('user-analytics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['reports_count'], 1)
+        self.assertEqual(response.data['total_sales'], 120.0)
+        self.assertEqual(response.data['top_products']['labels'], ['Laptop', 'Mouse'])
+        self.assertEqual(self.client.get(reverse('user-analytics'), {'n': 0}).status_code, 400)
+
+    def test_reprocess_updates_aggregates(self):
+        self._rewrite(CSV.replace('Mouse,Electronica,Sur,20', 'Teclado,Electronica,Sur,35'))
+        self.assertEqual(self._reprocess().status_code, 200)
+        result = aggregates(self.user)
+        self.assertNotIn(('product', 'Mouse'), result)
+        self.assertEqual(result[('product', 'Teclado')], (Decimal('35.00'), 1, 1))
+        self.assertEqual(result[('month', '2024-03')], (Decimal('135.00'), 2, 1))
+
+    def test_failed_reprocess_removes_contribution(self):
+        self._rewrite('fecha,producto\n2024-03-01,Laptop\n')
+        self.assertEqual(self._reprocess().status_code, 400)
+        self.assertEqual(aggregates(self.user), {})
+        self.assertEqual(self.client.get(reverse('user-analytics')).data['reports_count'], 0)
+
+    def test_delete_view_removes_contribution(self):
+        response = self.client.delete(reverse('delete-csv', kwargs={'csv_file_id': self.csv_file.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Report.objects.exists())
+        self.assertEqual(aggregates(self.user), {})
@@ -0,0 +1,141 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.anomalies import daily_matrix, detect_anomalies, robust_zscores
+from reports.models import SalesAnomaly
+
+from .factories import create_report, create_user
+
+
+def daily_sales(days, product='Laptop', region='Norte', start='2024-01-01', seed=3):
+    """Ventas diarias alrededor de 100 con ruido"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=days, freq='D'),
+        'product': product,
+        'region': region,
+        'sales_amount': 100 + rng.normal(0, 5, size=days),
+    })
+
+
+class RobustZscoreTests(SimpleTestCase):
+
+    def test_daily_matrix_fills_days_without_sales(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-01', '2024-01-03', '2024-01-03']),
+            'product': ['Laptop', 'Laptop', 'Mouse'],
+            'region': ['Norte', 'Norte', 'Sur'],
+            'sales_amount': [10.0, 5.0, 2.0],
+        })
+        pairs, dates, matrix = daily_matrix(df)
+        self.assertEqual(list(pairs), [('Laptop', 'Norte'), ('Mouse', 'Sur')])
+        self.assertEqual(len(dates), 3)
+        np.testing.assert_array_equal(matrix, [[10, 0, 5], [0, 0, 2]])
+
+    def test_matches_per_series_loop(self):
+        rng = np.random.default_rng(11)
+        matrix = rng.gamma(2.0, 50.0, size=(5, 60))
+        matrix[2, ::3] = 0.0
+        # Bloques de una fila para recorrer también la partición por bloques
+        expected, scores = robust_zscores(matrix, 28, 14, block_cells=1)
+
+        for row in range(5):
+            for t in range(28, 60):
+                window = matrix[row, t - 28:t]
+                median = np.median(window)
+                mad = np.median(np.abs(window - median))
+                self.assertAlmostEqual(expected[row, t], median)
+                self.assertAlmostEqual(scores[row, t], 0.6745 * (matrix[row, t] - median) / mad)
+        self.assertTrue(np.isnan(scores[:, :28]).all())
+
+    def test_constant_window_uses_mean_absolute_deviation(self):
+        matrix = np.full((2, 40), 10.0)
+        matrix[0, 10] = 20.0
+        matrix[0, 30] = 20.0
+        _, scores = robust_zscores(matrix, 28, 14)
+        # MAD = 0 con un solo día distinto en la ventana: la escala es la
+        # desviación media absoluta (10 / 28) / 0.7979
+        self.assertAlmostEqual(scores[0, 30], 10.0 / (10.0 / 28 / 0.7979))
+        # Sin ninguna variación no hay escala y el día no se evalúa
+        self.assertTrue(np.isnan(scores[1]).all())
+
+    def test_sparse_or_short_series_are_skipped(self):
+        sparse = np.zeros((1, 60))
+        sparse[0, ::10] = 100.0
+        _, scores = robust_zscores(sparse, 28, 14)
+        self.assertTrue(np.isnan(scores).all())
+
+        _, scores = robust_zscores(np.ones((1, 20)), 28, 14)
+        self.assertTrue(np.isnan(scores).all())
+
+
+class DetectAnomaliesTests(SimpleTestCase):
+
+    def test_detects_spike_and_drop(self):
+        df = pd.concat([daily_sales(60), daily_sales(60, product='Mouse', region='Sur', seed=4)], ignore_index=True)
+        df.loc[45, 'sales_amount'] = 400.0
+        df.loc[60 + 50, 'sales_amount'] = 5.0
+
+        anomalies = detect_anomalies(df, window=28, threshold=5.0)
+        self.assertEqual(
+            [(row.product, row.region, row.date.date()) for row in anomalies.itertuples()],
+            [('Laptop', 'Norte', date(2024, 2, 15)), ('Mouse', 'Sur', date(2024, 2, 20))],
+        )
+        self.assertGreater(anomalies['score'].iloc[0], 0)
+        self.assertLess(anomalies['score'].iloc[1], 0)
+        self.assertAlmostEqual(anomalies['sales_amount'].iloc[0], 400.0)
+
+    def test_max_results_keeps_strongest(self):
+        df = daily_sales(60)
+        df.loc[40, 'sales_amount'] = 300.0
+        df.loc[50, 'sales_amount'] = 600.0
+        anomalies = detect_anomalies(df, threshold=5.0, max_results=1)
+        self.assertEqual(len(anomalies), 1)
+        self.assertEqual(anomalies['date'].iloc[0].date(), date(2024, 2, 20))
+
+    def test_empty_frame(self):
+        anomalies = detect_anomalies(daily_sales(0))
+        self.assertTrue(anomalies.empty)
+        self.assertEqual(list(anomalies.columns), ['product', 'region', 'date', 'sales_amount', 'expected', 'score'])
+
+
+class ReportAnomaliesViewTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.report = create_report(self.user, [{'date': date(2024, 3, 1), 'product': 'Laptop', 'sales_amount': 100}])
+        SalesAnomaly.objects.bulk_create([
+            SalesAnomaly(report=self.report, product='Laptop', region='Norte', date=date(2024, 3, 5),
+                         sales_amount=400, expected=100, score=8.0, direction='spike'),
+            SalesAnomaly(report=self.report, product='Mouse', region='Sur', date=date(2024, 3, 9),
+                         sales_amount=5, expected=100, score=-12.0, direction='drop'),
+        ])
+        self.url = reverse('report-anomalies', kwargs={'report_id': self.report.id})
+
+    def test_ordered_by_absolute_score(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['product'] for item in response.data], ['Mouse', 'Laptop'])
+
+    def test_filters(self):
+        self.assertEqual([item['product'] for item in self.client.get(self.url, {'direction': 'spike'}).data], ['Laptop'])
+        self.assertEqual([item['product'] for item in self.client.get(self.url, {'date_from': '2024-03-06'}).data], ['Mouse'])
+        self.assertEqual(self.client.get(self.url, {'date_to': '2024-03-01'}).data, [])
+
+    def test_invalid_dates_return_400(self):
+        for value in ('2024-02-30', '05/03/2024'):
+            with self.subTest(value=value):
+                response = self.client.get(self.url, {'date_from': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('date_from', str(response.data['error']))
+
+    def test_other_users_report(self):
+        self.client.force_authenticate(create_user('otro'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,102 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from main.admission import admit, detach_admission
+from reports.background import _analyze
+from reports.models import CSVFile
+
+from .factories import create_user
+from .test_uploads import CONTENT, TemporaryMediaMixin
+
+
+class _QueuedExecutor:
+    """Executor que solo guarda los trabajos enviados"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+
+@override_settings(
+    ADMISSION_HEAVY_LIMIT=8,
+    ADMISSION_LIMITS={'upload': 8, 'reprocess': 8, 'pdf': 8},
+    ADMISSION_PER_USER_LIMIT=2,
+)
+class BackgroundAdmissionTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        settings_override = override_settings(ADMISSION_LOCK_DIR=lock_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.executor = _QueuedExecutor()
+        patcher = mock.patch('reports.background._get_executor', return_value=self.executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Libera los cupos de los trabajos que el test no llegó a ejecutar
+        self.addCleanup(self._run_pending)
+
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _run_pending(self):
+        jobs, self.executor.jobs = self.executor.jobs, []
+        with mock.patch('reports.background.connections'), \
+                mock.patch('reports.services.DataAnalysisService.process_csv'):
+            for fn, args in jobs:
+                fn(*args)
+
+    def _upload_async(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('csv-upload') + '?async=true',
+                {'file': SimpleUploadedFile('ventas.csv', CONTENT)}, format='multipart'
+            )
+
+    def test_pending_analyses_count_against_user_limit(self):
+        self.assertEqual(self._upload_async().status_code, 202)
+        self.assertEqual(self._upload_async().status_code, 202)
+        self.assertEqual(len(self.executor.jobs), 2)
+
+        response = self._upload_async()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(CSVFile.objects.count(), 2)
+
+        # Al terminar los análisis pendientes el usuario recupera sus cupos
+        self._run_pending()
+        self.assertEqual(self._upload_async().status_code, 202)
+
+    @override_settings(ADMISSION_LIMITS={'upload': 1, 'reprocess': 8, 'pdf': 8})
+    def test_pending_analyses_bound_the_queue(self):
+        self.assertEqual(self._upload_async().status_code, 202)
+
+        self.client.force_authenticate(create_user('otro'))
+        self.assertEqual(self._upload_async().status_code, 429)
+        self.assertEqual(len(self.executor.jobs), 1)
+
+    def test_analyze_releases_slots_on_error(self):
+        request = mock.Mock(user=self.user)
+        with admit(request, 'upload'):
+            handles = detach_admission(request)
+
+        with mock.patch('reports.background.connections'), \
+                mock.patch('reports.services.DataAnalysisService.process_csv', side_effect=ValueError), \
+                self.assertLogs('reports.background', 'ERROR'):
+            csv_file = CSVFile.objects.create(user=self.user, file='ventas.csv', original_name='ventas.csv')
+            _analyze(csv_file.pk, handles)
+
+        with admit(request, 'upload'), admit(request, 'upload'):
+            pass
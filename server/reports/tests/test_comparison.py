@@ -0,0 +1,90 @@
+from datetime import date
+
+import pandas as pd
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.comparison import compare_series
+
+from .factories import create_report, create_user
+
+
+class CompareSeriesTests(SimpleTestCase):
+
+    def test_growth_and_missing_labels(self):
+        rows = compare_series(pd.Series({'Norte': 100.0, 'Sur': 50.0}), pd.Series({'Norte': 150.0, 'Este': 20.0}))
+        self.assertEqual(rows, [
+            {'key': 'Este', 'base': 0.0, 'target': 20.0, 'delta': 20.0, 'growth': None},
+            {'key': 'Norte', 'base': 100.0, 'target': 150.0, 'delta': 50.0, 'growth': 50.0},
+            {'key': 'Sur', 'base': 50.0, 'target': 0.0, 'delta': -50.0, 'growth': -100.0},
+        ])
+
+    def test_zero_base_has_no_growth(self):
+        rows = compare_series(pd.Series({'total': 0.0}), pd.Series({'total': 0.0}))
+        self.assertEqual(rows, [{'key': 'total', 'base': 0.0, 'target': 0.0, 'delta': 0.0, 'growth': None}])
+
+    def test_negative_base_uses_absolute_value(self):
+        rows = compare_series(pd.Series({'a': -50.0}), pd.Series({'a': 25.0}))
+        self.assertEqual(rows[0]['growth'], 150.0)
+
+    def test_limit_orders_by_absolute_delta(self):
+        base = pd.Series({'a': 10.0, 'b': 10.0, 'c': 10.0})
+        rows = compare_series(base, pd.Series({'a': 11.0, 'b': -40.0, 'c': 30.0}), limit=2)
+        self.assertEqual([row['key'] for row in rows], ['b', 'c'])
+
+    def test_empty_series(self):
+        self.assertEqual(compare_series(pd.Series(dtype='float64'), pd.Series(dtype='float64')), [])
+
+
+class ReportCompareViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.base = create_report(self.user, [
+            {'date': date(2024, 1, 5), 'product': 'Laptop', 'sales_amount': 100},
+            {'date': date(2024, 1, 9), 'product': 'Mouse', 'sales_amount': 40},
+        ], name='enero.csv', sales_by_region={'labels': ['Norte', 'Sur'], 'data': [100.0, 40.0]})
+        self.target = create_report(self.user, [
+            {'date': date(2024, 2, 5), 'product': 'Laptop', 'sales_amount': 150},
+            {'date': date(2024, 2, 7), 'product': 'Laptop', 'sales_amount': 50},
+            {'date': date(2024, 2, 9), 'product': 'Teclado', 'sales_amount': 30},
+        ], name='febrero.csv', sales_by_region={'labels': ['Norte'], 'data': [230.0]})
+
+    def _compare(self, base, target):
+        return self.client.get(reverse('report-compare'), {'base': base, 'target': target})
+
+    def test_compare_reports(self):
+        response = self._compare(self.base.id, self.target.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['base']['name'], 'enero.csv')
+        self.assertEqual(response.data['totals'], {'base': 140.0, 'target': 230.0, 'delta': 90.0, 'growth': 64.29})
+        self.assertEqual(response.data['products_count'], 3)
+        self.assertEqual(
+            [(row['key'], row['delta']) for row in response.data['products']],
+            [('Laptop', 100.0), ('Mouse', -40.0), ('Teclado', 30.0)],
+        )
+        self.assertEqual(
+            [(row['key'], row['growth']) for row in response.data['regions']],
+            [('Norte', 130.0), ('Sur', -100.0)],
+        )
+
+    def test_reprocessing_invalidates_cached_comparison(self):
+        self.assertEqual(self._compare(self.base.id, self.target.id).data['regions'][0]['target'], 230.0)
+        self.target.sales_by_region = {'labels': ['Norte'], 'data': [300.0]}
+        self.target.save()
+        self.assertEqual(self._compare(self.base.id, self.target.id).data['regions'][0]['target'], 300.0)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(reverse('report-compare'), {'base': self.base.id}).status_code, 400)
+        self.assertEqual(self._compare('uno', self.target.id).status_code, 400)
+
+    def test_other_users_reports_are_not_found(self):
+        other = create_report(create_user('otro'), [
+            {'date': date(2024, 1, 5), 'product': 'Laptop', 'sales_amount': 10},
+        ])
+        self.assertEqual(self._compare(self.base.id, other.id).status_code, 404)
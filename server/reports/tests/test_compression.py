@@ -0,0 +1,107 @@
+import bz2
+import gzip
+import io
+
+import zstandard
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.compression import (
+    DecompressedSizeExceeded, check_magic_number, decompress_stream, get_compression,
+    read_decompressed_prefix, strip_csv_extension
+)
+from reports.models import CSVFile, SalesData
+
+from .factories import create_user
+from .test_uploads import CONTENT, TemporaryMediaMixin
+
+COMPRESSORS = {
+    'gzip': gzip.compress,
+    'bz2': bz2.compress,
+    'zstd': lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+class CompressionHelpersTests(SimpleTestCase):
+
+    def test_get_compression_by_extension(self):
+        self.assertIsNone(get_compression('ventas.csv'))
+        self.assertEqual(get_compression('ventas.CSV.GZ'), 'gzip')
+        self.assertEqual(get_compression('ventas.csv.zst'), 'zstd')
+        self.assertEqual(get_compression('ventas.csv.bz2'), 'bz2')
+        with self.assertRaises(ValueError):
+            get_compression('ventas.gz')
+
+    def test_strip_csv_extension(self):
+        self.assertEqual(strip_csv_extension('ventas.csv.gz'), 'ventas')
+        self.assertEqual(strip_csv_extension('ventas.csv'), 'ventas')
+        self.assertEqual(strip_csv_extension('ventas.txt'), 'ventas.txt')
+
+    def test_check_magic_number_keeps_position(self):
+        fileobj = io.BytesIO(gzip.compress(CONTENT))
+        check_magic_number(fileobj, 'gzip')
+        self.assertEqual(fileobj.tell(), 0)
+        check_magic_number(io.BytesIO(CONTENT), None)
+
+    def test_check_magic_number_rejects_mismatched_content(self):
+        for compression in COMPRESSORS:
+            with self.subTest(compression=compression):
+                with self.assertRaises(ValueError):
+                    check_magic_number(io.BytesIO(CONTENT), compression)
+
+    def test_decompress_stream_round_trip(self):
+        for compression, compress in COMPRESSORS.items():
+            with self.subTest(compression=compression):
+                stream = decompress_stream(io.BytesIO(compress(CONTENT)), compression, max_size=len(CONTENT))
+                self.assertEqual(stream.read(), CONTENT)
+
+    def test_decompress_stream_enforces_max_size(self):
+        for compression, compress in COMPRESSORS.items():
+            with self.subTest(compression=compression):
+                stream = decompress_stream(io.BytesIO(compress(CONTENT)), compression, max_size=len(CONTENT) - 1)
+                with self.assertRaises(DecompressedSizeExceeded):
+                    stream.read()
+
+    def test_read_decompressed_prefix_of_incomplete_file(self):
+        content = CONTENT + b''.join(b'2024-03-%02d,Producto %d,Otros,Sur,%d,1\n' % (i % 28 + 1, i, i) for i in range(2000))
+        compressed = gzip.compress(content)
+        partial = io.BytesIO(compressed[:len(compressed) // 2])
+        prefix = read_decompressed_prefix(partial, 'gzip', 200)
+        self.assertEqual(prefix, content[:200])
+
+
+class CompressedUploadViewTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _upload(self, name, data):
+        return self.client.post(
+            reverse('csv-upload'), {'file': SimpleUploadedFile(name, data)}, format='multipart'
+        )
+
+    def test_compressed_csv_is_processed(self):
+        for compression, compress in COMPRESSORS.items():
+            with self.subTest(compression=compression):
+                extension = {'gzip': 'gz', 'bz2': 'bz2', 'zstd': 'zst'}[compression]
+                response = self._upload(f'ventas.csv.{extension}', compress(CONTENT))
+                self.assertEqual(response.status_code, 201, response.data)
+                self.assertEqual(SalesData.objects.filter(report_id=response.data['report_id']).count(), 50)
+
+    def test_content_not_matching_extension_is_rejected(self):
+        response = self._upload('ventas.csv.gz', CONTENT)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.data)
+        self.assertFalse(CSVFile.objects.exists())
+
+    def test_decompressed_size_limit(self):
+        with override_settings(CSV_MAX_DECOMPRESSED_SIZE=len(CONTENT) // 2):
+            response = self._upload('ventas.csv.gz', gzip.compress(CONTENT))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('supera el máximo', response.data['error'])
+        self.assertEqual(CSVFile.objects.get().status, 'error')
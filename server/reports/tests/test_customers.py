@@ -0,0 +1,132 @@
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.customers import cohort_retention, rfm_table, seller_performance
+from reports.models import CustomerMetrics, SalesData
+
+from .factories import create_user
+from .test_uploads import TemporaryMediaMixin
+
+ROWS = [
+    # fecha, cliente, vendedor, producto, monto
+    ('2024-01-05', 'Ana', 'Rosa', 'Laptop', 1000.0),
+    ('2024-01-20', 'Ana', 'Rosa', 'Mouse', 20.0),
+    ('2024-02-10', 'Ana', 'Rosa', 'Laptop', 900.0),
+    ('2024-03-30', 'Ana', 'Rosa', 'Teclado', 50.0),
+    ('2024-01-08', 'Luis', 'Rosa', 'Mouse', 25.0),
+    ('2024-02-15', 'Eva', 'Juan', 'Laptop', 800.0),
+    ('2024-03-01', 'Eva', 'Juan', 'Mouse', 30.0),
+    ('2024-03-28', 'Carlos', 'Juan', 'Mouse', 15.0),
+    ('2024-03-29', None, 'Juan', 'Mouse', 10.0),
+]
+
+
+def sales_frame(rows=ROWS):
+    df = pd.DataFrame(rows, columns=['date', 'customer', 'seller', 'product', 'sales_amount'])
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+class RFMTests(SimpleTestCase):
+
+    def test_metrics_per_customer(self):
+        table = rfm_table(sales_frame()).set_index('customer')
+        self.assertEqual(list(table.index), ['Ana', 'Eva', 'Luis', 'Carlos'])
+        self.assertEqual(table.loc['Ana', 'orders'], 4)
+        self.assertAlmostEqual(table.loc['Ana', 'total_sales'], 1970.0)
+        # La recencia se mide desde el último día del informe (2024-03-30)
+        self.assertEqual(table.loc['Ana', 'recency_days'], 0)
+        self.assertEqual(table.loc['Luis', 'recency_days'], 82)
+        self.assertEqual(table.loc['Ana', 'segment'], 'champions')
+        self.assertEqual(table.loc['Luis', 'segment'], 'hibernating')
+        self.assertEqual(table.loc['Carlos', 'segment'], 'new')
+        self.assertTrue(table[['r_score', 'f_score', 'm_score']].isin(range(1, 6)).all().all())
+
+    def test_without_customer_column(self):
+        df = sales_frame().drop(columns=['customer'])
+        self.assertTrue(rfm_table(df).empty)
+        self.assertTrue(cohort_retention(df).empty)
+
+
+class CohortRetentionTests(SimpleTestCase):
+
+    def test_retention_by_month_since_first_purchase(self):
+        cohorts = cohort_retention(sales_frame())
+        rows = {
+            (row.cohort.strftime('%Y-%m'), row.period): (row.customers, row.retention)
+            for row in cohorts.itertuples()
+        }
+        self.assertEqual(rows[('2024-01', 0)], (2, 1.0))
+        self.assertEqual(rows[('2024-01', 1)], (1, 0.5))
+        self.assertEqual(rows[('2024-01', 2)], (1, 0.5))
+        self.assertEqual(rows[('2024-02', 0)], (1, 1.0))
+        self.assertEqual(rows[('2024-02', 1)], (1, 1.0))
+        self.assertEqual(rows[('2024-03', 0)], (1, 1.0))
+
+    def test_max_periods(self):
+        cohorts = cohort_retention(sales_frame(), max_periods=1)
+        self.assertEqual(cohorts['period'].max(), 1)
+
+
+class SellerPerformanceTests(SimpleTestCase):
+
+    def test_sellers(self):
+        table = seller_performance(sales_frame()).set_index('seller')
+        self.assertEqual(list(table.index), ['Rosa', 'Juan'])
+        self.assertEqual(table.loc['Rosa', 'records'], 5)
+        self.assertEqual(table.loc['Rosa', 'customers'], 2)
+        self.assertEqual(table.loc['Juan', 'products'], 2)
+        self.assertAlmostEqual(table.loc['Juan', 'average_ticket'], 855.0 / 4)
+        self.assertAlmostEqual(table['share'].sum(), 100.0)
+
+    def test_without_seller_column(self):
+        self.assertTrue(seller_performance(sales_frame().drop(columns=['seller'])).empty)
+
+
+class ReportCustomersViewTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user())
+        lines = ['fecha,producto,categoria,region,ventas,cliente,vendedor'] + [
+            f"{day},{product},Electronica,Norte,{amount},{customer or ''},{seller}"
+            for day, customer, seller, product, amount in ROWS
+        ]
+        response = self.client.post(
+            reverse('csv-upload'),
+            {'file': SimpleUploadedFile('ventas.csv', '\n'.join(lines).encode())},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.report_id = response.data['report_id']
+        self.url = reverse('report-customers', kwargs={'report_id': self.report_id})
+
+    def test_customers_cohorts_and_sellers(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['customers_count'], 4)
+        self.assertEqual(response.data['customers'][0]['customer'], 'Ana')
+        self.assertEqual(response.data['cohorts']['labels'], ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(response.data['cohorts']['sizes'], [2, 1, 1])
+        self.assertEqual(response.data['cohorts']['retention'][0], [1.0, 0.5, 0.5])
+        self.assertEqual([seller['seller'] for seller in response.data['sellers']], ['Rosa', 'Juan'])
+
+    def test_segment_filter_and_limit(self):
+        response = self.client.get(self.url, {'segment': 'hibernating', 'limit': 5})
+        self.assertEqual([row['customer'] for row in response.data['customers']], ['Luis'])
+        self.assertEqual(len(self.client.get(self.url, {'limit': 1}).data['customers']), 1)
+        self.assertEqual(self.client.get(self.url, {'segment': 'vip'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+
+    def test_customer_and_seller_columns_keep_original_names(self):
+        self.assertEqual(CustomerMetrics.objects.filter(report_id=self.report_id).count(), 4)
+        additional_data = SalesData.objects.filter(report_id=self.report_id).order_by('date', 'id').first().additional_data
+        self.assertEqual(additional_data, {'cliente': 'Ana', 'vendedor': 'Rosa'})
+
+        response = self.client.get(reverse('report-export', args=[self.report_id]), {'format': 'csv'})
+        header = b''.join(response.streaming_content).decode().splitlines()[0].split(',')
+        self.assertEqual(header[-2:], ['cliente', 'vendedor'])
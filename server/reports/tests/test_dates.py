@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from reports.dates import detect_date_format, parse_dates
+
+
+class DetectDateFormatTests(SimpleTestCase):
+
+    def test_ambiguous_dates_follow_dayfirst(self):
+        values = pd.Series(['01/02/2024', '03/04/2024', '05/06/2024'])
+        self.assertEqual(detect_date_format(values, dayfirst=True), '%d/%m/%Y')
+        self.assertEqual(detect_date_format(values, dayfirst=False), '%m/%d/%Y')
+
+    def test_unambiguous_day_overrides_dayfirst(self):
+        values = pd.Series(['01/02/2024', '12/25/2024'])
+        self.assertEqual(detect_date_format(values, dayfirst=True), '%m/%d/%Y')
+
+    def test_two_and_four_digit_years(self):
+        self.assertEqual(detect_date_format(pd.Series(['15/03/24', '16/03/24'])), '%d/%m/%y')
+        self.assertEqual(detect_date_format(pd.Series(['15/03/2024', '16/03/2024'])), '%d/%m/%Y')
+
+    def test_iso_dates(self):
+        self.assertEqual(detect_date_format(pd.Series(['2024-03-15', '2024-03-16'])), 'ISO8601')
+
+    def test_nulls_and_blanks_are_ignored(self):
+        values = pd.Series([None, '', '  ', np.nan, '15/03/2024'])
+        self.assertEqual(detect_date_format(values), '%d/%m/%Y')
+        self.assertIsNone(detect_date_format(pd.Series([None, '', np.nan])))
+
+    def test_unrecognized_values(self):
+        self.assertIsNone(detect_date_format(pd.Series(['ayer', 'mañana'])))
+
+
+class ParseDatesTests(SimpleTestCase):
+
+    def test_exact_format(self):
+        dates, stats = parse_dates(pd.Series(['01/02/2024', '15/03/2024']))
+        self.assertEqual(dates.tolist(), [pd.Timestamp('2024-02-01'), pd.Timestamp('2024-03-15')])
+        self.assertEqual(stats, {'date_format': '%d/%m/%Y', 'fallback_dates': 0, 'invalid_dates': 0})
+
+    def test_two_digit_years(self):
+        dates, stats = parse_dates(pd.Series(['15/03/24', '01/12/99']))
+        self.assertEqual(stats['date_format'], '%d/%m/%y')
+        self.assertEqual(dates.tolist(), [pd.Timestamp('2024-03-15'), pd.Timestamp('1999-12-01')])
+
+    def test_mixed_formats_fall_back_to_flexible_parsing(self):
+        values = pd.Series(['15/03/2024', '16/03/2024', '17/03/2024', '2024-03-18', 'sin fecha'])
+        dates, stats = parse_dates(values, cache_ratio=0)
+        self.assertEqual(stats['date_format'], '%d/%m/%Y')
+        self.assertEqual(stats['fallback_dates'], 1)
+        self.assertEqual(stats['invalid_dates'], 1)
+        self.assertEqual(dates[3], pd.Timestamp('2024-03-18'))
+        self.assertTrue(pd.isna(dates[4]))
+
+    def test_fallback_respects_dayfirst(self):
+        values = pd.Series(['2024-03-15', '2024-03-16', '01.02.2024 10:00'])
+        dates, stats = parse_dates(values, dayfirst=True, cache_ratio=0)
+        self.assertEqual(stats['fallback_dates'], 1)
+        self.assertEqual(dates[2], pd.Timestamp('2024-02-01 10:00'))
+
+    def test_nulls_are_invalid_but_not_fallback(self):
+        values = pd.Series(['15/03/2024', None, np.nan, '16/03/2024'])
+        dates, stats = parse_dates(values, cache_ratio=0)
+        self.assertEqual(stats['fallback_dates'], 0)
+        self.assertEqual(stats['invalid_dates'], 2)
+        self.assertTrue(dates[[1, 2]].isna().all())
+
+    def test_cached_path_matches_direct_conversion(self):
+        # Pocos valores distintos y repetidos: se convierte cada uno una vez
+        values = pd.Series(['15/03/2024', '2024-03-18', None, 'sin fecha', '15/03/2024'] * 200, name='date')
+        cached, cached_stats = parse_dates(values, '%d/%m/%Y')
+        direct, direct_stats = parse_dates(values, '%d/%m/%Y', cache_ratio=0)
+        pd.testing.assert_series_equal(cached, direct, check_dtype=False)
+        self.assertEqual(cached_stats, direct_stats)
+        self.assertEqual(cached_stats['fallback_dates'], 200)
+        self.assertEqual(cached_stats['invalid_dates'], 400)
+        self.assertEqual(cached.name, 'date')
+
+    def test_cached_path_keeps_index(self):
+        values = pd.Series(['15/03/2024', '16/03/2024'] * 50, index=range(100, 200))
+        dates, _ = parse_dates(values)
+        self.assertEqual(dates.index.tolist(), list(range(100, 200)))
+        self.assertEqual(dates[101], pd.Timestamp('2024-03-16'))
@@ -0,0 +1,106 @@
+from datetime import date
+from unittest import mock
+
+from django.db.models import RestrictedError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.dimensions import DimensionMap, dimension_maps
+from reports.models import Product, Region, SalesData
+
+from .factories import create_report, create_user
+
+
+class DimensionMapTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+
+    def test_resolve_creates_missing_names_once(self):
+        products = DimensionMap(Product, self.user.id)
+        ids = products.resolve(['Laptop', 'Mouse', 'Laptop'])
+        self.assertEqual(set(ids), {'Laptop', 'Mouse'})
+        with self.assertNumQueries(0):
+            products.resolve(['Mouse', 'Laptop'])
+        self.assertEqual(products.get('Laptop'), Product.objects.get(name='Laptop').id)
+
+    def test_names_created_concurrently_are_reused(self):
+        # Otro proceso guardó 'Laptop' después de que este mapa se creó
+        products = DimensionMap(Product, self.user.id)
+        existing = Product.objects.create(user=self.user, name='Laptop')
+
+        ids = products.resolve(['Laptop', 'Mouse'])
+        self.assertEqual(ids['Laptop'], existing.id)
+        self.assertEqual(Product.objects.filter(user=self.user).count(), 2)
+
+        # Un segundo mapa (otro proceso) obtiene los mismos ids sin duplicar filas
+        other = DimensionMap(Product, self.user.id)
+        self.assertEqual(other.resolve(['Mouse', 'Laptop']), ids)
+        self.assertEqual(Product.objects.filter(user=self.user).count(), 2)
+
+    def test_batches(self):
+        names = [f'Producto {i}' for i in range(7)]
+        with mock.patch('reports.dimensions.LOOKUP_BATCH', 3):
+            ids = DimensionMap(Product, self.user.id).resolve(names)
+        self.assertEqual(set(ids), set(names))
+        self.assertEqual(Product.objects.filter(user=self.user).count(), 7)
+
+    def test_names_are_truncated_to_the_field_length(self):
+        regions = DimensionMap(Region, self.user.id)
+        long_name = 'Región ' + 'x' * 200
+        regions.resolve([long_name, 15])
+        self.assertEqual(regions.get(long_name), Region.objects.get(name=long_name[:100]).id)
+        self.assertEqual(regions.get(15), Region.objects.get(name='15').id)
+
+    def test_dimensions_are_per_user(self):
+        other = create_user('otro')
+        mine = dimension_maps(self.user.id)['product'].resolve(['Laptop'])
+        theirs = dimension_maps(other.id)['product'].resolve(['Laptop'])
+        self.assertNotEqual(mine['Laptop'], theirs['Laptop'])
+
+
+class DimensionStorageTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        self.rows = [
+            {'date': date(2024, 3, 1), 'product': 'Laptop', 'category': 'Electrónica', 'region': 'Norte', 'sales_amount': 100},
+            {'date': date(2024, 3, 2), 'product': 'Laptop', 'category': 'Electrónica', 'region': 'Sur', 'sales_amount': 50},
+        ]
+
+    def test_reports_share_dimension_rows(self):
+        first = create_report(self.user, self.rows, name='enero.csv')
+        second = create_report(self.user, self.rows, name='febrero.csv')
+        self.assertEqual(Product.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(
+            set(SalesData.objects.filter(report=first).values_list('product_id', flat=True)),
+            set(SalesData.objects.filter(report=second).values_list('product_id', flat=True)),
+        )
+
+    def test_products_in_use_cannot_be_deleted(self):
+        report = create_report(self.user, self.rows)
+        with self.assertRaises(RestrictedError):
+            Product.objects.get(name='Laptop').delete()
+
+        # Al eliminar el informe las ventas se borran y la dimensión queda libre
+        report.csv_file.delete()
+        self.assertTrue(Product.objects.filter(name='Laptop').exists())
+        Product.objects.get(name='Laptop').delete()
+
+    def test_deleting_user_removes_sales_and_dimensions(self):
+        create_report(self.user, self.rows)
+        self.user.delete()
+        self.assertFalse(SalesData.objects.exists())
+        self.assertFalse(Product.objects.exists())
+
+    def test_report_detail_returns_dimension_names(self):
+        report = create_report(self.user, self.rows)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('report-detail', kwargs={'pk': report.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['product'], row['category'], row['region']) for row in response.data['sales_data_sample']],
+            [('Laptop', 'Electrónica', 'Norte'), ('Laptop', 'Electrónica', 'Sur')],
+        )
@@ -0,0 +1,92 @@
+import csv
+import gzip
+import io
+from datetime import date
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.exports import ReportDataExporter
+
+from .factories import create_report, create_user
+
+ROWS = [
+    {'date': date(2024, 1, day), 'product': f'Producto {day}', 'category': 'Bebidas', 'region': 'Norte',
+     'sales_amount': 10.5 * day, 'quantity': day, 'additional_data': {'seller': f'Vendedor {day % 2}'}}
+    for day in range(1, 8)
+]
+
+
+@override_settings(EXPORT_CHUNK_SIZE=3)
+class ReportDataExporterTests(TestCase):
+
+    def setUp(self):
+        self.report = create_report(create_user(), ROWS, name='ventas_enero.csv')
+
+    def _read_csv(self, content):
+        return list(csv.reader(io.StringIO(content.decode('utf-8'))))
+
+    def test_csv_includes_extra_columns_in_order(self):
+        exporter = ReportDataExporter(self.report, 'csv')
+        rows = self._read_csv(b''.join(exporter.stream()))
+        self.assertEqual(rows[0], ['date', 'product', 'category', 'region', 'sales_amount', 'quantity', 'seller'])
+        self.assertEqual(rows[1], ['2024-01-01', 'Producto 1', 'Bebidas', 'Norte', '10.50', '1', 'Vendedor 1'])
+        self.assertEqual(len(rows), len(ROWS) + 1)
+        self.assertEqual(exporter.filename, 'ventas_enero_datos.csv')
+
+    def test_csv_is_streamed_in_chunks(self):
+        chunks = list(ReportDataExporter(self.report, 'csv').stream())
+        # Encabezado y un bloque por cada EXPORT_CHUNK_SIZE filas
+        self.assertEqual(len(chunks), 1 + 3)
+
+    def test_gzip_round_trip(self):
+        exporter = ReportDataExporter(self.report, 'csv', compress=True)
+        content = gzip.decompress(b''.join(exporter.stream()))
+        self.assertEqual(content, b''.join(ReportDataExporter(self.report, 'csv').stream()))
+        self.assertEqual(exporter.filename, 'ventas_enero_datos.csv.gz')
+        self.assertEqual(exporter.content_type, 'application/gzip')
+
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(io.BytesIO(b''.join(ReportDataExporter(self.report, 'xlsx').stream())))
+        rows = list(workbook['Datos'].values)
+        self.assertEqual(rows[0][-1], 'seller')
+        self.assertEqual(len(rows), len(ROWS) + 1)
+
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(b''.join(ReportDataExporter(self.report, 'parquet').stream())))
+        self.assertEqual(table.num_rows, len(ROWS))
+        self.assertEqual(table.column('product').to_pylist()[0], 'Producto 1')
+        self.assertEqual(table.column('seller').to_pylist()[1], 'Vendedor 0')
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ReportDataExporter(self.report, 'json')
+
+
+class ReportExportViewTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        self.report = create_report(self.user, ROWS)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_download(self):
+        response = self.client.get(reverse('report-export', args=[self.report.pk]), {'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ventas_datos.csv"')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), len(ROWS) + 1)
+
+    def test_unsupported_format(self):
+        response = self.client.get(reverse('report-export', args=[self.report.pk]), {'format': 'json'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_report(self):
+        self.client.force_authenticate(create_user('otro'))
+        response = self.client.get(reverse('report-export', args=[self.report.pk]))
+        self.assertEqual(response.status_code, 404)
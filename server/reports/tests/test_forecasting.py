@@ -0,0 +1,108 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from reports.forecasting import ForecastTimeout, build_forecast, build_series, fit_holt_winters, forecast
+
+
+def sales_frame(days, products=('Laptop', 'Mouse'), start='2024-01-01'):
+    """Ventas diarias con tendencia y estacionalidad semanal por producto"""
+    dates = pd.date_range(start, periods=days, freq='D')
+    frames = []
+    for i, product in enumerate(products):
+        weekly = 10 * np.sin(2 * np.pi * np.arange(days) / 7)
+        frames.append(pd.DataFrame({
+            'date': dates,
+            'product': product,
+            'sales_amount': 100 * (i + 1) + 0.5 * np.arange(days) + weekly,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+class BuildSeriesTests(SimpleTestCase):
+
+    def test_daily_series_fills_missing_days(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-04']),
+            'product': ['Laptop', 'Mouse', 'Laptop'],
+            'sales_amount': [10.0, 5.0, 7.0],
+        })
+        frequency, season_length, index, keys, matrix = build_series(df, ['Laptop', 'Mouse'])
+        self.assertEqual((frequency, season_length), ('day', 7))
+        self.assertEqual(len(index), 4)
+        self.assertEqual(keys, ['total', 'Laptop', 'Mouse'])
+        np.testing.assert_array_equal(matrix, [[15, 0, 0, 7], [10, 0, 0, 7], [5, 0, 0, 0]])
+
+    def test_monthly_series_from_24_months(self):
+        df = sales_frame(24 * 31, products=('Laptop',))
+        frequency, season_length, index, keys, matrix = build_series(df, ['Laptop'])
+        self.assertEqual((frequency, season_length), ('month', 12))
+        self.assertEqual(matrix.shape, (2, len(index)))
+        self.assertAlmostEqual(matrix[0].sum(), df['sales_amount'].sum())
+
+
+class HoltWintersTests(SimpleTestCase):
+
+    def test_forecast_follows_trend_and_season(self):
+        t = np.arange(70)
+        y = (50 + 2 * t + 10 * np.sin(2 * np.pi * t / 7))[None, :]
+        fit = fit_holt_winters(y, 7)
+        self.assertEqual(fit['season_length'], 7)
+
+        mean, lower, upper = forecast(fit, 14)
+        future = np.arange(70, 84)
+        expected = 50 + 2 * future + 10 * np.sin(2 * np.pi * future / 7)
+        np.testing.assert_allclose(mean[0], expected, rtol=0.05)
+        self.assertTrue(np.all(lower <= mean) and np.all(mean <= upper))
+        # La incertidumbre crece con el horizonte
+        self.assertGreaterEqual((upper - lower)[0, -1], (upper - lower)[0, 0])
+
+    def test_fits_every_series_independently(self):
+        t = np.arange(42)
+        y = np.vstack([10 + t, 100 - t, np.full(42, 30.0)])
+        fit = fit_holt_winters(y, 7)
+        mean, _, _ = forecast(fit, 1)
+        np.testing.assert_allclose(mean[:, 0], [52, 58, 30], atol=1.5)
+
+    def test_short_series_drops_seasonality(self):
+        fit = fit_holt_winters(np.arange(10, dtype='float64')[None, :], 7)
+        self.assertEqual(fit['season_length'], 1)
+        self.assertTrue(np.all(fit['params'][:, 2] == 0))
+
+    def test_deadline(self):
+        with self.assertRaises(ForecastTimeout):
+            fit_holt_winters(np.ones((1, 30)), 7, deadline=0)
+
+
+class BuildForecastTests(SimpleTestCase):
+
+    def test_daily_forecast(self):
+        result = build_forecast(sales_frame(60), ['Laptop', 'Mouse'], horizon_days=10)
+        self.assertEqual(result['frequency'], 'day')
+        self.assertEqual(result['horizon'], 10)
+        self.assertEqual(result['labels'][0], '2024-03-01')
+        self.assertEqual([series['key'] for series in result['series']], ['total', 'Laptop', 'Mouse'])
+        self.assertFalse(result['truncated'])
+        for series in result['series']:
+            self.assertEqual(len(series['forecast']), 10)
+            self.assertTrue(all(low >= 0 for low in series['lower']))
+
+    def test_monthly_forecast(self):
+        result = build_forecast(sales_frame(24 * 31, products=('Laptop',)), ['Laptop'], horizon_months=3)
+        self.assertEqual(result['frequency'], 'month')
+        self.assertEqual(result['labels'], ['2026-02', '2026-03', '2026-04'])
+
+    def test_short_or_empty_series(self):
+        self.assertEqual(build_forecast(sales_frame(10), ['Laptop']), {})
+        self.assertEqual(build_forecast(sales_frame(0), ['Laptop']), {})
+
+    def test_time_budget_skips_products(self):
+        df = sales_frame(60)
+        with mock.patch(
+            'reports.forecasting.fit_holt_winters', side_effect=[fit_holt_winters(np.ones((1, 60)), 7), ForecastTimeout()]
+        ):
+            result = build_forecast(df, ['Laptop', 'Mouse'], time_budget=1)
+        self.assertTrue(result['truncated'])
+        self.assertEqual([series['key'] for series in result['series']], ['total'])
@@ -0,0 +1,84 @@
+"""
+Presupuesto de consultas SQL de los endpoints de informes
+
+Cada endpoint debe ejecutar la misma cantidad de consultas sin importar
+cuántos informes, archivos o ventas devuelva, y esa cantidad no puede superar
+el máximo de ENDPOINT_BUDGETS (sin contar la autenticación).
+"""
+
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import CachedJWTAuthentication
+
+from .factories import create_report, create_user
+
+ENDPOINT_BUDGETS = {
+    'user-reports': 2,
+    'report-detail': 2,
+    'user-csv-files': 2,
+    'dashboard-summary': 3,
+}
+
+# Cantidades de informes (y de ventas por informe) que se comparan
+SIZES = (1, 10)
+
+
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('presupuesto')
+        # Token real (las vistas async no admiten force_authenticate)
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def _add_reports(self, count, rows):
+        return [
+            create_report(self.user, [
+                {
+                    'date': date(2024, 1, 1) + timedelta(days=row),
+                    'product': f'Producto {row}',
+                    'sales_amount': 100,
+                    'additional_data': {'cliente': f'Cliente {row}'},
+                }
+                for row in range(rows)
+            ], name=f'presupuesto_{index}.csv')
+            for index in range(count)
+        ]
+
+    def _url(self, name, reports):
+        if name == 'report-detail':
+            return reverse(name, kwargs={'pk': reports[-1].pk})
+        return reverse(name)
+
+    def test_queries_are_constant_and_within_budget(self):
+        measurements = {name: {} for name in ENDPOINT_BUDGETS}
+        reports = []
+        for size in SIZES:
+            reports += self._add_reports(size - len(reports), rows=size)
+            for name in ENDPOINT_BUDGETS:
+                # Usuario ya en caché, como en cualquier petición después de la primera
+                CachedJWTAuthentication().get_cached_user(self.user.pk)
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(self._url(name, reports))
+                self.assertEqual(response.status_code, 200, name)
+                measurements[name][size] = [query['sql'] for query in context.captured_queries]
+
+        for name, budget in ENDPOINT_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                queries = measurements[name]
+                smallest, largest = queries[SIZES[0]], queries[SIZES[-1]]
+                self.assertEqual(
+                    len(largest), len(smallest),
+                    "Las consultas crecen con el resultado. Consultas adicionales:\n"
+                    + '\n'.join(largest[len(smallest):][:10])
+                )
+                self.assertLessEqual(len(largest), budget, '\n'.join(largest))
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase
+
+from reports.models import CSVFile
+from reports.schema import detect_encoding, detect_number_format, get_csv_schema, infer_schema
+
+from .factories import create_user
+from .test_uploads import TemporaryMediaMixin
+
+
+class InferSchemaTests(SimpleTestCase):
+
+    def test_semicolon_and_comma_decimal(self):
+        sample = 'Fecha;Producto;Ventas;Notas\n15/03/2024;Laptop;1.234,50;x\n16/03/2024;Mouse;12,5;y\n'.encode()
+        schema = infer_schema(sample, complete=True)
+        self.assertEqual(schema['delimiter'], ';')
+        self.assertEqual((schema['decimal'], schema['thousands']), (',', '.'))
+        self.assertEqual(schema['rename'], {'Fecha': 'date', 'Producto': 'product', 'Ventas': 'sales_amount', 'Notas': 'notas'})
+        self.assertEqual(schema['dtype']['Ventas'], 'float64')
+        self.assertEqual(schema['dtype']['Notas'], 'str')
+        self.assertEqual(schema['date_format'], '%d/%m/%Y')
+
+    def test_non_numeric_amounts_are_read_as_text(self):
+        sample = b'date,product,sales_amount\n2024-03-15,Laptop,100\n2024-03-16,Mouse,sin dato\n'
+        self.assertEqual(infer_schema(sample, complete=True)['dtype']['sales_amount'], 'str')
+
+    def test_missing_required_column(self):
+        with self.assertRaisesMessage(ValueError, "Columna requerida 'sales_amount'"):
+            infer_schema(b'date,product\n2024-03-15,Laptop\n', complete=True)
+
+    def test_incomplete_sample_drops_last_line(self):
+        sample = b'date,product,sales_amount\n2024-03-15,Laptop,100\n2024-03-16,Mouse,1x'
+        self.assertEqual(infer_schema(sample)['dtype']['sales_amount'], 'float64')
+
+    def test_detect_encoding(self):
+        self.assertEqual(detect_encoding(b'\xef\xbb\xbfdate'), 'utf-8-sig')
+        self.assertEqual(detect_encoding('región'.encode()), 'utf-8')
+        # Carácter multibyte cortado al final de la muestra
+        self.assertEqual(detect_encoding('región'.encode()[:-4]), 'utf-8')
+        self.assertEqual(detect_encoding('región'.encode('cp1252')), 'cp1252')
+
+    def test_detect_number_format(self):
+        self.assertEqual(detect_number_format(['1,234.50', '12']), ('.', ','))
+        self.assertEqual(detect_number_format(['1.234,50', '12,5']), (',', '.'))
+        # 1.234 es ambiguo: se prefiere el punto decimal
+        self.assertEqual(detect_number_format(['1.234', '15']), ('.', None))
+
+
+class SchemaCacheTests(TemporaryMediaMixin, TestCase):
+
+    HEADER = 'fecha;producto;ventas\n'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = create_user()
+
+    def _csv_file(self, content):
+        csv_file = CSVFile(user=self.user, original_name='ventas.csv')
+        csv_file.file.save('ventas.csv', ContentFile(content.encode()), save=True)
+        return csv_file
+
+    def test_header_is_cached_but_data_formats_are_not(self):
+        first, cached = get_csv_schema(self._csv_file(self.HEADER + '2024-03-15;Laptop;1.234,50\n'))
+        self.assertFalse(cached)
+        self.assertEqual((first['decimal'], first['thousands']), (',', '.'))
+
+        # Mismo encabezado con punto decimal y fechas día/mes
+        second, cached = get_csv_schema(self._csv_file(self.HEADER + '15/03/2024;Laptop;1234.50\n'))
+        self.assertTrue(cached)
+        self.assertEqual(second['delimiter'], ';')
+        self.assertEqual(second['rename'], first['rename'])
+        self.assertEqual((second['decimal'], second['thousands']), ('.', None))
+        self.assertEqual(second['date_format'], '%d/%m/%Y')
+
+    def test_cache_is_per_user_and_encoding(self):
+        get_csv_schema(self._csv_file(self.HEADER + '2024-03-15;Laptop;100\n'))
+        self.user = create_user('otro')
+        self.assertFalse(get_csv_schema(self._csv_file(self.HEADER + '2024-03-15;Laptop;100\n'))[1])
+
+        schema, cached = get_csv_schema(self._csv_file('\ufeff' + self.HEADER + '2024-03-15;Café;100\n'))
+        self.assertFalse(cached)
+        self.assertEqual(schema['encoding'], 'utf-8-sig')
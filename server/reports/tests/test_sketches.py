@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.models import Report, SalesData
+from reports.sketches import HyperLogLog, SpaceSaving
+
+from .factories import create_user
+from .test_uploads import TemporaryMediaMixin
+
+
+class SpaceSavingTests(SimpleTestCase):
+
+    def test_from_totals_is_exact_with_bound(self):
+        summary = SpaceSaving.from_totals(pd.Series({'a': 50.0, 'b': 30.0, 'c': 20.0, 'd': 5.0}), 2)
+        self.assertEqual(summary.top(2), [('a', 50.0, 0.0), ('b', 30.0, 0.0)])
+        self.assertEqual(summary.bound, 20.0)
+        self.assertEqual(summary.total, 105.0)
+
+    def test_merge_bounds_contain_true_totals(self):
+        rng = np.random.default_rng(7)
+        popularity = np.linspace(2, 0.1, 40)
+        keys = rng.choice([f'p{i}' for i in range(40)], size=5000, p=popularity / popularity.sum())
+        weights = rng.uniform(1, 100, size=5000)
+        exact = pd.Series(weights).groupby(keys).sum()
+
+        summary = SpaceSaving(8)
+        for start in range(0, 5000, 500):
+            part = SpaceSaving(8)
+            part.update(keys[start:start + 500], weights[start:start + 500])
+            summary.merge(part)
+
+        self.assertAlmostEqual(summary.total, float(weights.sum()))
+        for product, count, error in summary.top(8):
+            self.assertGreaterEqual(count + 1e-6, exact[product])
+            self.assertLessEqual(count - error, exact[product] + 1e-6)
+        missing = exact.drop(summary.counts.index)
+        self.assertLessEqual(missing.max(), summary.bound + 1e-6)
+
+    def test_round_trip(self):
+        summary = SpaceSaving.from_totals(pd.Series({'a': 5.0, 'b': 3.0, 'c': 1.0}), 2)
+        restored = SpaceSaving.from_dict(summary.to_dict())
+        self.assertEqual(restored.top(2), summary.top(2))
+        self.assertEqual(restored.bound, summary.bound)
+
+
+class HyperLogLogTests(SimpleTestCase):
+
+    def test_estimate_within_error(self):
+        sketch = HyperLogLog(12)
+        values = [f'cliente-{i}' for i in range(20000)]
+        for start in range(0, len(values), 3000):
+            # Los repetidos entre bloques no cambian la estimación
+            sketch.update(values[start:start + 3000] + values[:100])
+        self.assertLess(abs(sketch.estimate() - 20000) / 20000, 4 * sketch.relative_error)
+
+    def test_small_cardinality_is_exact(self):
+        sketch = HyperLogLog(12)
+        sketch.update(['a', 'b', 'c', 'a', None])
+        self.assertEqual(sketch.estimate(), 3)
+
+    def test_merge_is_union(self):
+        left, right, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+        left.update(range(0, 3000))
+        right.update(range(2000, 5000))
+        union.update(range(0, 5000))
+        self.assertEqual(left.merge(right).estimate(), union.estimate())
+        self.assertEqual(HyperLogLog.from_dict(union.to_dict()).estimate(), union.estimate())
+        with self.assertRaises(ValueError):
+            union.merge(HyperLogLog(12))
+
+
+CSV = (
+    'fecha,producto,categoria,region,ventas,cliente\n'
+    '2024-03-01,Laptop,Electronica,Norte,100,Ana\n'
+    '2024-03-02,Mouse,Electronica,Sur,20,Luis\n'
+    '2024-03-03,Laptop,Electronica,Norte,50,Ana\n'
+    '2024-03-04,Teclado,Electronica,Sur,30,Eva\n'
+)
+
+
+class SketchAnalysisTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user())
+
+    def _upload(self, content=CSV):
+        response = self.client.post(
+            reverse('csv-upload'), {'file': SimpleUploadedFile('ventas.csv', content.encode())}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return Report.objects.get(pk=response.data['report_id'])
+
+    def test_small_files_skip_sketches(self):
+        report = self._upload()
+        self.assertEqual(report.sketches, {})
+        self.assertNotIn('approximate', report.top_products)
+        self.assertEqual(report.top_products['labels'][0], 'Laptop')
+        self.assertEqual(report.top_products['distinct_products'], 3)
+
+    def test_customer_column_keeps_original_name(self):
+        report = self._upload()
+        additional_data = SalesData.objects.filter(report=report).order_by('date').first().additional_data
+        self.assertEqual(additional_data, {'cliente': 'Ana'})
+
+    @override_settings(ANALYSIS_SKETCH_MIN_ROWS=3)
+    def test_large_files_store_sketches(self):
+        report = self._upload()
+        self.assertEqual(report.sketches['version'], 1)
+        self.assertTrue(report.top_products['approximate'])
+        self.assertEqual(report.top_products['labels'][0], 'Laptop')
+        self.assertEqual(report.top_products['errors'][0], 0.0)
+
+    def test_top_products_merges_stored_and_built_sketches(self):
+        small = self._upload()
+        with override_settings(ANALYSIS_SKETCHES=True):
+            large = self._upload(CSV.replace('Teclado,Electronica,Sur,30,Eva', 'Monitor,Electronica,Sur,500,Rosa'))
+        self.assertEqual(small.sketches, {})
+        self.assertNotEqual(large.sketches, {})
+
+        response = self.client.get(reverse('report-top-products'), {'n': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data['reports']), [small.id, large.id])
+        self.assertEqual(
+            [(item['product'], item['sales']) for item in response.data['top_products']],
+            [('Monitor', 500.0), ('Laptop', 300.0)],
+        )
+        self.assertEqual(response.data['total_sales'], 870.0)
+        self.assertEqual(response.data['distinct_products']['estimate'], 4)
+        self.assertEqual(response.data['distinct_customers']['estimate'], 4)
+
+    def test_top_products_without_reports(self):
+        response = self.client.get(reverse('report-top-products'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,111 @@
+import hashlib
+import io
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponseRedirect
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.models import CSVFile
+from reports.storage import ConcatenatedReader, delete_file, download_response, file_exists
+
+from .factories import create_report, create_user
+from .test_uploads import TemporaryMediaMixin
+
+
+class ConcatenatedReaderTests(TemporaryMediaMixin, TestCase):
+
+    def _save(self, *parts):
+        return [default_storage.save(f'parts/parte-{i}', ContentFile(part)) for i, part in enumerate(parts)]
+
+    def test_reads_files_in_order_and_hashes(self):
+        parts = [b'fecha,producto\n', b'', b'2024-03-15,Laptop\n' * 1000, b'2024-03-16,Mouse\n']
+        hasher = hashlib.sha256()
+        with io.BufferedReader(ConcatenatedReader(default_storage, self._save(*parts), hasher=hasher)) as f:
+            content = f.read()
+        self.assertEqual(content, b''.join(parts))
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(content).hexdigest())
+
+    def test_small_reads_cross_file_boundaries(self):
+        names = self._save(b'abc', b'de', b'fgh')
+        with mock.patch('reports.storage.READ_BLOCK_SIZE', 2):
+            reader = io.BufferedReader(ConcatenatedReader(default_storage, names), buffer_size=2)
+            self.assertEqual([reader.read(3) for _ in range(3)], [b'abc', b'def', b'gh'])
+            self.assertEqual(reader.read(), b'')
+
+    def test_opens_each_file_when_reached_and_closes_it(self):
+        names = self._save(b'uno', b'dos')
+        opened = []
+        real_open = default_storage.open
+
+        def tracking_open(name, mode='rb'):
+            opened.append(real_open(name, mode))
+            return opened[-1]
+
+        with mock.patch.object(default_storage, 'open', side_effect=tracking_open):
+            reader = ConcatenatedReader(default_storage, names)
+            buffer = bytearray(3)
+            reader.readinto(buffer)
+            self.assertEqual(len(opened), 1)
+            reader.close()
+        self.assertTrue(opened[0].closed)
+
+
+class StorageHelpersTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+        self.csv_file = CSVFile(user=self.user, original_name='ventas.csv')
+
+    def test_file_exists_and_delete(self):
+        self.assertFalse(file_exists(self.csv_file.file))
+        delete_file(self.csv_file.file)
+
+        self.csv_file.file.save('ventas.csv', ContentFile(b'fecha,producto,ventas\n'), save=True)
+        self.assertTrue(file_exists(self.csv_file.file))
+        delete_file(self.csv_file.file)
+        self.assertFalse(file_exists(self.csv_file.file))
+        # El registro conserva el nombre del archivo eliminado
+        self.assertTrue(self.csv_file.file.name)
+
+    def test_local_download_streams_from_storage(self):
+        self.csv_file.file.save('ventas.csv', ContentFile(b'contenido'), save=True)
+        response = download_response(self.csv_file.file, 'text/csv')
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment; filename="', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), b'contenido')
+
+    def test_signed_url_storage_redirects(self):
+        storage = mock.Mock(querystring_auth=True)
+        storage.url.return_value = 'https://bucket.example.com/pdfs/informe.pdf?X-Amz-Signature=abc'
+        field_file = mock.Mock(storage=storage)
+        field_file.name = 'pdfs/informe.pdf'
+
+        response = download_response(field_file, 'application/pdf')
+        self.assertIsInstance(response, HttpResponseRedirect)
+        self.assertEqual(response.url, storage.url.return_value)
+        storage.url.assert_called_once_with('pdfs/informe.pdf', parameters={
+            'ResponseContentDisposition': 'attachment; filename="informe.pdf"',
+            'ResponseContentType': 'application/pdf',
+        })
+        field_file.open.assert_not_called()
+
+
+class DownloadPDFViewTests(TemporaryMediaMixin, TestCase):
+
+    def test_download_existing_pdf(self):
+        user = create_user()
+        report = create_report(user, [])
+        report.pdf_file.save('informe.pdf', ContentFile(b'%PDF-1.4 prueba'), save=True)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get(reverse('download-pdf', kwargs={'report_id': report.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 prueba')
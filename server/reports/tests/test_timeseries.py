@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reports.timeseries import lttb, resample_weekly
+
+from .factories import create_report, create_user
+
+
+class LTTBTests(SimpleTestCase):
+
+    def test_short_series_is_not_reduced(self):
+        x = np.arange(5, dtype=float)
+        self.assertEqual(lttb(x, x, 10).tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(lttb(x, x, 2).tolist(), [0, 1, 2, 3, 4])
+
+    def test_keeps_endpoints_and_threshold(self):
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50)
+        indices = lttb(x, y, 50)
+        self.assertEqual(len(indices), 50)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_keeps_spikes(self):
+        x = np.arange(300, dtype=float)
+        y = np.zeros(300)
+        y[[40, 150, 260]] = [100, -80, 120]
+        indices = lttb(x, y, 20)
+        for spike in (40, 150, 260):
+            self.assertIn(spike, indices)
+
+
+class ResampleWeeklyTests(SimpleTestCase):
+
+    def test_weeks_start_on_monday(self):
+        # 2024-01-03 es miércoles: la primera semana empieza el lunes 2024-01-01
+        days = np.datetime64('2024-01-03') + np.arange(10)
+        weeks, totals = resample_weekly(days, np.ones(10))
+        self.assertEqual([str(week) for week in weeks], ['2024-01-01', '2024-01-08'])
+        self.assertEqual(totals.tolist(), [5.0, 5.0])
+
+    def test_empty_series(self):
+        days, values = resample_weekly(np.array([], dtype='datetime64[D]'), np.array([]))
+        self.assertEqual(days.size, 0)
+        self.assertEqual(values.size, 0)
+
+
+class ReportTimeseriesViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        # 60 días con ventas salteadas: los días sin ventas se completan con 0
+        self.report = create_report(self.user, [
+            {'date': date(2024, 1, 1) + timedelta(days=day), 'product': 'Café', 'sales_amount': day + 1}
+            for day in range(0, 60, 2)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('report-timeseries', args=[self.report.pk])
+
+    def test_daily_series_is_filled_and_reduced(self):
+        response = self.client.get(self.url, {'points': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_points'], 59)
+        self.assertEqual(response.data['points'], 10)
+        self.assertEqual(response.data['labels'][0], '2024-01-01')
+        self.assertEqual(response.data['labels'][-1], '2024-02-28')
+
+    def test_full_daily_series(self):
+        response = self.client.get(self.url, {'points': 100})
+        self.assertEqual(response.data['points'], 59)
+        self.assertEqual(response.data['data'][:3], [1.0, 0.0, 3.0])
+
+    def test_weekly_series(self):
+        response = self.client.get(self.url, {'resolution': 'week', 'points': 100})
+        self.assertEqual(response.data['labels'][0], '2024-01-01')
+        self.assertEqual(sum(response.data['data']), sum(range(1, 60, 2)))
+
+    def test_invalid_parameters(self):
+        for params in ({'resolution': 'hour'}, {'points': 'x'}, {'points': 2}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
@@ -0,0 +1,251 @@
+import base64
+import hashlib
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reports.models import CSVFile, UploadSession
+from reports.uploads import (
+    UploadError, abort_upload, append_chunk, claim_session, complete_upload, create_upload_session
+)
+
+from .factories import create_user
+
+
+class TemporaryMediaMixin:
+    """Guarda los archivos de cada test en un MEDIA_ROOT temporal"""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+CONTENT = b'date,product,category,region,sales_amount,quantity\n' + b'2024-03-15,Laptop,Electronica,Norte,100.5,1\n' * 50
+
+
+class ChunkedUploadTests(TemporaryMediaMixin, TestCase):
+
+    CONTENT = CONTENT
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+
+    def _session(self):
+        return create_upload_session(self.user, 'ventas.csv', len(self.CONTENT))
+
+    def _append(self, session, start, end, expected_digest=None):
+        return append_chunk(session, io.BytesIO(self.CONTENT[start:end]), start, end - start, expected_digest)
+
+    def test_complete_stores_content_and_checksum(self):
+        session = self._session()
+        self.assertEqual(self._append(session, 0, 100), 100)
+        self.assertTrue(session.header_validated)
+        self.assertEqual(self._append(session, 100, len(self.CONTENT)), len(self.CONTENT))
+
+        csv_file = complete_upload(session, hashlib.sha256(self.CONTENT).digest())
+        self.assertEqual(csv_file.checksum, hashlib.sha256(self.CONTENT).hexdigest())
+        with csv_file.file.open('rb') as f:
+            self.assertEqual(f.read(), self.CONTENT)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(default_storage.exists(f"{session.file_name}.parts/{0:015d}"))
+
+    def test_wrong_offset_is_conflict(self):
+        session = self._session()
+        self._append(session, 0, 100)
+        with self.assertRaises(UploadError) as context:
+            self._append(session, 50, 150)
+        self.assertEqual(context.exception.status_code, 409)
+        session.refresh_from_db()
+        self.assertEqual(session.offset, 100)
+
+    def test_interrupted_chunk_keeps_received_bytes(self):
+        session = self._session()
+        offset = append_chunk(session, io.BytesIO(self.CONTENT[:80]), 0, 120)
+        self.assertEqual(offset, 80)
+        self.assertEqual(self._append(session, 80, len(self.CONTENT)), len(self.CONTENT))
+        with complete_upload(session).file.open('rb') as f:
+            self.assertEqual(f.read(), self.CONTENT)
+
+    def test_chunk_checksum_mismatch_is_rejected(self):
+        session = self._session()
+        with self.assertRaises(UploadError) as context:
+            self._append(session, 0, 100, hashlib.sha256(b'otra cosa').digest())
+        self.assertEqual(context.exception.status_code, 460)
+        session.refresh_from_db()
+        self.assertEqual(session.offset, 0)
+
+    def test_incomplete_upload_cannot_complete(self):
+        session = self._session()
+        self._append(session, 0, 100)
+        with self.assertRaises(UploadError) as context:
+            complete_upload(session)
+        self.assertEqual(context.exception.status_code, 409)
+
+    def test_file_checksum_mismatch_aborts(self):
+        session = self._session()
+        self._append(session, 0, len(self.CONTENT))
+        with self.assertRaises(UploadError) as context:
+            complete_upload(session, b'\0' * 32)
+        self.assertEqual(context.exception.status_code, 460)
+        self.assertTrue(context.exception.abort)
+        self.assertFalse(CSVFile.objects.exists())
+
+    def test_invalid_header_aborts(self):
+        session = create_upload_session(self.user, 'ventas.csv', 100)
+        with self.assertRaises(UploadError) as context:
+            append_chunk(session, io.BytesIO(b'nombre,edad\nAna,30\n'), 0, 19)
+        self.assertTrue(context.exception.abort)
+
+    def test_abort_removes_parts_and_reserved_file(self):
+        session = self._session()
+        self._append(session, 0, 100)
+        part = f"{session.file_name}.parts/{0:015d}"
+        self.assertTrue(default_storage.exists(part))
+        self.assertTrue(default_storage.exists(session.file_name))
+
+        abort_upload(session)
+        self.assertFalse(default_storage.exists(part))
+        self.assertFalse(default_storage.exists(session.file_name))
+        self.assertFalse(UploadSession.objects.exists())
+
+
+class ClaimSessionTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+        self.session = create_upload_session(self.user, 'ventas.csv', len(CONTENT))
+
+    def _status(self):
+        return UploadSession.objects.values_list('status', flat=True).get(pk=self.session.pk)
+
+    def test_claim_and_release(self):
+        with claim_session(self.session.pk, self.user, 'writing', offset=0) as session:
+            self.assertEqual(self._status(), 'writing')
+            self.assertEqual(session.status, 'writing')
+        self.assertEqual(self._status(), 'receiving')
+
+    def test_second_claim_is_conflict(self):
+        with claim_session(self.session.pk, self.user, 'writing', offset=0):
+            for status in ('writing', 'completing', 'aborting'):
+                with self.subTest(status=status):
+                    with self.assertRaises(UploadError) as context:
+                        with claim_session(self.session.pk, self.user, status):
+                            pass
+                    self.assertEqual(context.exception.status_code, 409)
+                    self.assertEqual(context.exception.session.offset, 0)
+            # La petición rechazada no libera la reserva de la otra
+            self.assertEqual(self._status(), 'writing')
+
+    def test_wrong_offset_is_conflict(self):
+        with self.assertRaises(UploadError) as context:
+            with claim_session(self.session.pk, self.user, 'writing', offset=10):
+                pass
+        self.assertEqual(context.exception.status_code, 409)
+        self.assertIn('se esperaba 0', str(context.exception))
+        self.assertEqual(self._status(), 'receiving')
+
+    def test_released_after_error(self):
+        with self.assertRaises(ValueError):
+            with claim_session(self.session.pk, self.user, 'completing'):
+                raise ValueError
+        self.assertEqual(self._status(), 'receiving')
+
+    @override_settings(CHUNKED_UPLOAD_CLAIM_TIMEOUT=60)
+    def test_stale_claim_can_be_taken(self):
+        UploadSession.objects.filter(pk=self.session.pk).update(
+            status='writing', claimed_at=timezone.now() - timedelta(seconds=120)
+        )
+        with claim_session(self.session.pk, self.user, 'writing', offset=0):
+            self.assertEqual(self._status(), 'writing')
+        self.assertEqual(self._status(), 'receiving')
+
+    def test_other_users_session(self):
+        with self.assertRaises(Http404):
+            with claim_session(self.session.pk, create_user('otro'), 'writing'):
+                pass
+
+
+class ChunkedUploadViewTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse('chunked-upload-create'), {'filename': 'ventas.csv', 'size': len(CONTENT)}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.url = reverse('chunked-upload', args=[response.data['id']])
+        self.complete_url = reverse('chunked-upload-complete', args=[response.data['id']])
+        self.session = UploadSession.objects.get(pk=response.data['id'])
+
+    def _patch(self, start, end, **headers):
+        return self.client.generic(
+            'PATCH', self.url, CONTENT[start:end], content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(start), **headers
+        )
+
+    def test_resume_and_complete(self):
+        response = self._patch(0, 100)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Upload-Offset'], '100')
+
+        response = self._patch(50, 150)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '100')
+
+        self.assertEqual(self.client.head(self.url)['Upload-Offset'], '100')
+        self.assertEqual(self._patch(100, len(CONTENT)).status_code, 200)
+
+        digest = base64.b64encode(hashlib.sha256(CONTENT).digest()).decode()
+        response = self.client.post(
+            self.complete_url, HTTP_UPLOAD_CHECKSUM=f'sha256 {digest}', HTTP_PREFER='respond-async'
+        )
+        self.assertEqual(response.status_code, 202)
+        csv_file = CSVFile.objects.get(pk=response.data['csv_file']['id'])
+        self.assertEqual(csv_file.checksum, hashlib.sha256(CONTENT).hexdigest())
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_busy_session_is_conflict(self):
+        UploadSession.objects.filter(pk=self.session.pk).update(status='completing', claimed_at=timezone.now())
+        response = self._patch(0, 100)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error'], 'La subida se está completando')
+        self.assertEqual(self.client.post(self.complete_url).status_code, 409)
+        self.assertEqual(self.client.delete(self.url).status_code, 409)
+
+    def test_incomplete_upload_is_released(self):
+        self._patch(0, 100)
+        self.assertEqual(self.client.post(self.complete_url).status_code, 409)
+        self.assertEqual(UploadSession.objects.get(pk=self.session.pk).status, 'receiving')
+        self.assertEqual(self._patch(100, len(CONTENT)).status_code, 200)
+
+    def test_invalid_header_aborts(self):
+        response = self.client.generic(
+            'PATCH', self.url, b'nombre,edad\nAna,30\n', content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET='0'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_delete(self):
+        self._patch(0, 100)
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(default_storage.exists(self.session.file_name))
+        self.assertEqual(self.client.delete(self.url).status_code, 404)
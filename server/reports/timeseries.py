@@ -0,0 +1,122 @@
+"""
+Series temporales de ventas con reducción de puntos LTTB
+
+Los totales diarios se agregan en la base de datos y el resto del cálculo
+(relleno de días sin ventas, agrupación semanal y LTTB) se hace con NumPy.
+"""
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+RESOLUTIONS = ('day', 'week')
+
+def get_daily_totals(report):
+    """
+    Obtiene los días y los totales de ventas diarios de un informe
+
+    Los días sin ventas se completan con 0 para que la serie sea continua.
+    """
+    rows = list(
+        report.sales_data
+        .values('date')
+        .annotate(total=Sum('sales_amount'))
+        .order_by('date')
+        .values_list('date', 'total')
+    )
+    if not rows:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=float)
+
+    dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    totals = np.array([row[1] for row in rows], dtype=float)
+
+    offsets = (dates - dates[0]).astype(np.int64)
+    filled = np.zeros(offsets[-1] + 1, dtype=float)
+    filled[offsets] = totals
+    return dates[0] + np.arange(filled.size), filled
+
+def resample_weekly(days, values):
+    """
+    Agrupa una serie diaria continua en semanas que empiezan el lunes
+    """
+    if days.size == 0:
+        return days, values
+    # 1970-01-01 fue jueves: se desplaza para que las semanas empiecen en lunes
+    weekday = (days[0].astype(np.int64) + 3) % 7
+    week_index = (np.arange(days.size) + weekday) // 7
+    totals = np.bincount(week_index, weights=values)
+    week_start = days[0] - weekday
+    return week_start + np.arange(totals.size) * 7, totals
+
+def lttb(x, y, threshold):
+    """
+    Reduce una serie a `threshold` puntos con Largest-Triangle-Three-Buckets
+
+    Conserva el primer y el último punto y, en cada bucket intermedio, el
+    punto que forma el triángulo de mayor área con el punto elegido en el
+    bucket anterior y el promedio del bucket siguiente. Devuelve los índices
+    de los puntos elegidos.
+    """
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Límites de los threshold - 2 buckets intermedios
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Promedio de cada bucket (el siguiente al último es el punto final)
+    x_sum = np.add.reduceat(x[1:n - 1], starts - 1)
+    y_sum = np.add.reduceat(y[1:n - 1], starts - 1)
+    counts = ends - starts
+    next_x = np.append((x_sum / counts)[1:], x[-1])
+    next_y = np.append((y_sum / counts)[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        bucket_x, bucket_y = x[start:end], y[start:end]
+        areas = np.abs(
+            (x[previous] - next_x[bucket]) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (next_y[bucket] - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+def build_timeseries(report, resolution='day', points=None):
+    """
+    Construye la serie de ventas de un informe reducida a `points` puntos
+    """
+    days, values = get_daily_totals(report)
+    if resolution == 'week':
+        days, values = resample_weekly(days, values)
+
+    total_points = int(days.size)
+    if points and total_points > points:
+        indices = lttb(days.astype(np.int64).astype(float), values, points)
+        days, values = days[indices], values[indices]
+
+    return {
+        'resolution': resolution,
+        'total_points': total_points,
+        'points': int(days.size),
+        'labels': [str(day) for day in days],
+        'data': np.round(values, 2).tolist(),
+    }
+
+def get_cached_timeseries(report, resolution='day', points=None):
+    """
+    Devuelve la serie desde la caché o la calcula
+
+    La clave incluye `updated_at` para que reprocesar el archivo invalide la
+    serie guardada.
+    """
+    key = f"reports:timeseries:{report.pk}:{report.updated_at.timestamp()}:{resolution}:{points}"
+    data = cache.get(key)
+    if data is None:
+        data = build_timeseries(report, resolution, points)
+        cache.set(key, data, settings.TIMESERIES_CACHE_TIMEOUT)
+    return data
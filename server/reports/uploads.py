@@ -0,0 +1,312 @@
+"""
+Subidas reanudables de archivos CSV por partes
+
+Protocolo (inspirado en tus.io):
+    1. POST   /api/uploads/                 crea la sesión con el nombre y el tamaño total
+    2. PATCH  /api/uploads/<id>/            envía una parte con el encabezado Upload-Offset
+    3. HEAD   /api/uploads/<id>/            consulta el offset para reanudar tras un corte
+    4. POST   /api/uploads/<id>/complete/   crea el CSVFile y procesa el archivo
+
+Cada parte se lee del cuerpo de la petición en bloques y se guarda como un
+archivo propio en el storage (`<archivo>.parts/<offset>`); al completar, las
+partes se copian en orden al archivo definitivo como un solo stream. Así la
+subida no depende del disco de un servidor: cada PATCH puede llegar a un
+nodo distinto y el storage puede ser un bucket S3 compatible. El encabezado
+del CSV se valida apenas llega la primera línea.
+
+Ninguna transferencia de archivos ocurre dentro de una transacción: cada
+petición toma la sesión con un UPDATE condicional (`claim_session`), mueve los
+bytes y la libera con otro UPDATE, así dos peticiones no escriben la misma
+sesión a la vez sin bloquear filas ni conexiones durante la subida.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404, UnreadablePostError
+from django.utils import timezone
+
+from .columns import validate_header_line
+from .compression import MAGIC_NUMBERS, check_magic_number, get_compression, read_decompressed_prefix
+from .models import CSVFile, UploadSession, upload_to
+from .storage import ConcatenatedReader
+
+# Tamaño de cada lectura del cuerpo de la petición
+READ_BLOCK_SIZE = 64 * 1024
+
+# Máximo de bytes en los que debe aparecer la línea de encabezado
+HEADER_MAX_BYTES = 64 * 1024
+
+class UploadError(Exception):
+    """
+    Error de una subida por partes con el código HTTP que debe responderse
+
+    `abort` indica que la subida no puede continuar (por ejemplo, un
+    encabezado de CSV inválido) y debe descartarse. `session` es la sesión en
+    conflicto, para responder con su offset actual.
+    """
+
+    def __init__(self, message, status_code=400, abort=False, session=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.abort = abort
+        self.session = session
+
+def create_upload_session(user, original_name, total_size):
+    """
+    Crea una sesión de subida y reserva el archivo vacío en el storage
+    """
+    try:
+        get_compression(original_name)
+    except ValueError as e:
+        raise UploadError(str(e))
+    if total_size <= 0:
+        raise UploadError("El tamaño del archivo debe ser mayor que cero")
+    if total_size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(
+            f"El archivo es demasiado grande. Máximo {settings.CHUNKED_UPLOAD_MAX_SIZE // (1024 * 1024)}MB permitido.",
+            status_code=413
+        )
+
+    file_name = default_storage.save(
+        upload_to(CSVFile(user=user), os.path.basename(original_name)), ContentFile(b'')
+    )
+    return UploadSession.objects.create(
+        user=user,
+        original_name=original_name,
+        file_name=file_name,
+        total_size=total_size,
+    )
+
+# Mensajes de la respuesta 409 según lo que está haciendo la otra petición
+BUSY_MESSAGES = {
+    'writing': "Otra parte de esta subida se está recibiendo; reintenta desde Upload-Offset",
+    'completing': "La subida se está completando",
+    'aborting': "La subida se está cancelando",
+}
+
+@contextmanager
+def claim_session(upload_id, user, status, offset=None):
+    """
+    Reserva la sesión para una petición y la libera al terminar
+
+    La reserva es un único UPDATE que solo afecta a la sesión si está libre
+    (o si la petición que la tenía no terminó en CHUNKED_UPLOAD_CLAIM_TIMEOUT)
+    y, con `offset`, si ese es su offset actual. Lanza Http404 si la sesión no
+    existe y UploadError 409 si otra petición la está usando o el offset no
+    coincide.
+    """
+    now = timezone.now()
+    sessions = UploadSession.objects.filter(id=upload_id, user=user)
+    claimable = sessions.filter(
+        Q(status='receiving')
+        | Q(claimed_at__lt=now - timedelta(seconds=settings.CHUNKED_UPLOAD_CLAIM_TIMEOUT))
+    )
+    if offset is not None:
+        claimable = claimable.filter(offset=offset)
+    if not claimable.update(status=status, claimed_at=now):
+        session = sessions.first()
+        if session is None:
+            raise Http404("La subida no existe")
+        if session.status in BUSY_MESSAGES:
+            raise UploadError(BUSY_MESSAGES[session.status], status_code=409, session=session)
+        raise UploadError(f"Offset incorrecto: se esperaba {session.offset}", status_code=409, session=session)
+
+    session = sessions.get()
+    try:
+        yield session
+    finally:
+        # Si la sesión se completó o canceló ya no existe y no se actualiza nada
+        sessions.filter(status=status, claimed_at=now).update(status='receiving', claimed_at=None)
+
+def parse_checksum_header(value):
+    """
+    Interpreta el encabezado `Upload-Checksum: sha256 <base64>`
+    """
+    if not value:
+        return None
+    algorithm, _, digest = value.partition(' ')
+    if algorithm.lower() != 'sha256':
+        raise UploadError("Solo se admite el checksum sha256")
+    try:
+        return base64.b64decode(digest.strip(), validate=True)
+    except ValueError:
+        raise UploadError("Checksum inválido")
+
+def append_chunk(session, stream, offset, length, expected_digest=None):
+    """
+    Agrega una parte al archivo de la sesión y devuelve el nuevo offset
+
+    Si la conexión se corta a mitad de la parte se conservan los bytes
+    recibidos (el cliente reanuda desde el nuevo offset), salvo que la parte
+    traiga checksum: en ese caso solo se acepta completa y correcta.
+    """
+    if offset != session.offset:
+        raise UploadError(
+            f"Offset incorrecto: se esperaba {session.offset}", status_code=409
+        )
+    if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise UploadError(
+            f"Cada parte puede tener como máximo {settings.CHUNKED_UPLOAD_CHUNK_SIZE} bytes", status_code=413
+        )
+    if session.offset + length > session.total_size:
+        raise UploadError("La parte supera el tamaño total declarado", status_code=413)
+
+    hasher = hashlib.sha256()
+    written = 0
+    # La parte se junta en un temporal (en disco si es grande) antes de subirla
+    with tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE) as buffer:
+        try:
+            while written < length:
+                block = stream.read(min(READ_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                buffer.write(block)
+                hasher.update(block)
+                written += len(block)
+        except (UnreadablePostError, OSError):
+            pass
+
+        digest = hasher.digest()
+        if expected_digest is not None and (written < length or digest != expected_digest):
+            raise UploadError("El checksum de la parte no coincide", status_code=460)
+        if written:
+            _save_part(session, buffer)
+
+    if written:
+        session.offset += written
+        if not session.header_validated:
+            _validate_header(session)
+        session.save(update_fields=['offset', 'header_validated', 'updated_at'])
+    return session.offset
+
+def _parts_dir(session):
+    return f"{session.file_name}.parts"
+
+def _save_part(session, buffer):
+    """
+    Guarda una parte en el offset actual de la sesión
+
+    Reemplaza la parte de un intento anterior en el mismo offset que no llegó
+    a registrarse (el offset de la sesión nunca retrocede, así que no puede
+    haber partes guardadas más adelante).
+    """
+    name = f"{_parts_dir(session)}/{session.offset:015d}"
+    default_storage.delete(name)
+    buffer.seek(0)
+    saved = default_storage.save(name, File(buffer, name=name))
+    if saved != name:
+        default_storage.delete(saved)
+        raise UploadError("Otra petición está enviando la misma parte", status_code=409)
+
+def _part_names(session):
+    """Nombres de las partes recibidas, en orden de offset"""
+    directory = _parts_dir(session)
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return []
+    offsets = sorted(int(name) for name in files if name.isdigit())
+    return [f"{directory}/{offset:015d}" for offset in offsets]
+
+def _validate_header(session):
+    """
+    Valida el encabezado del CSV en cuanto se recibió la primera línea completa
+    """
+    compression = get_compression(session.original_name)
+    parts = _part_names(session)
+    if compression and session.offset >= len(MAGIC_NUMBERS[compression]):
+        with ConcatenatedReader(default_storage, parts) as f:
+            magic = read_decompressed_prefix(f, None, len(MAGIC_NUMBERS[compression]))
+        try:
+            check_magic_number(io.BytesIO(magic), compression)
+        except ValueError as e:
+            raise UploadError(str(e), abort=True)
+    with io.BufferedReader(ConcatenatedReader(default_storage, parts)) as f:
+        start = read_decompressed_prefix(f, compression, HEADER_MAX_BYTES)
+
+    line, newline, _ = start.partition(b'\n')
+    if not newline:
+        if len(start) >= HEADER_MAX_BYTES or session.offset == session.total_size:
+            raise UploadError("No se encontró la línea de encabezado del CSV", abort=True)
+        return
+
+    try:
+        text = line.decode('utf-8')
+    except UnicodeDecodeError:
+        text = line.decode('latin-1')
+    try:
+        validate_header_line(text.rstrip('\r'))
+    except ValueError as e:
+        raise UploadError(str(e), abort=True)
+    session.header_validated = True
+
+def _delete_parts(session, names):
+    for name in names:
+        default_storage.delete(name)
+    # Quita el directorio vacío que queda en el disco local (en S3 no existe y no hace nada)
+    default_storage.delete(_parts_dir(session))
+
+def complete_upload(session, expected_digest=None):
+    """
+    Convierte una sesión terminada en un CSVFile listo para procesar
+
+    El SHA-256 del archivo se calcula mientras se copian las partes y se
+    guarda en el CSVFile; si el cliente envía el del archivo completo
+    (`expected_digest`) y no coincide, la subida se descarta. La sesión debe
+    estar reservada (`claim_session`) para que dos peticiones no la completen
+    a la vez; solo la creación del CSVFile y el borrado de la sesión van en
+    una transacción.
+    """
+    if session.offset != session.total_size:
+        raise UploadError(
+            f"La subida está incompleta: {session.offset} de {session.total_size} bytes", status_code=409
+        )
+    if not session.header_validated:
+        _validate_header(session)
+
+    # Las partes se copian en orden sobre el archivo vacío reservado al crear la sesión
+    parts = _part_names(session)
+    hasher = hashlib.sha256()
+    default_storage.delete(session.file_name)
+    reader = ConcatenatedReader(default_storage, parts, hasher=hasher)
+    with io.BufferedReader(reader, buffer_size=READ_BLOCK_SIZE) as stream:
+        file_name = default_storage.save(session.file_name, File(stream, name=session.file_name))
+    if expected_digest is not None and hasher.digest() != expected_digest:
+        default_storage.delete(file_name)
+        raise UploadError("El checksum del archivo no coincide", status_code=460, abort=True)
+    _delete_parts(session, parts)
+
+    with transaction.atomic():
+        csv_file = CSVFile.objects.create(
+            user=session.user,
+            file=file_name,
+            original_name=session.original_name,
+            checksum=hasher.hexdigest(),
+        )
+        session.delete()
+    return csv_file
+
+def abort_upload(session):
+    """
+    Cancela una sesión y elimina sus partes y el archivo reservado
+    """
+    _delete_parts(session, _part_names(session))
+    default_storage.delete(session.file_name)
+    session.delete()
+
+def expired_sessions():
+    """Sesiones sin actividad durante más de CHUNKED_UPLOAD_EXPIRATION"""
+    return UploadSession.objects.filter(
+        updated_at__lt=timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_EXPIRATION)
+    )
@@ -1,24 +1,63 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Con ASYNC_VIEWS los endpoints de lectura usan vistas async nativas (ASGI)
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    user_csv_files_view = async_views.user_csv_files_view
+    user_reports_view = async_views.user_reports_view
+    report_detail_view = async_views.report_detail_view
+    dashboard_summary_view = async_views.dashboard_summary_view
+    csv_file_progress_view = async_views.csv_file_progress_view
+else:
+    user_csv_files_view = views.UserCSVFilesView.as_view()
+    user_reports_view = views.UserReportsView.as_view()
+    report_detail_view = views.ReportDetailView.as_view()
+    dashboard_summary_view = views.dashboard_summary_view
+    csv_file_progress_view = views.CSVFileProgressView.as_view()
+
 urlpatterns = [
     # Upload de archivos CSV
     path('upload/', views.CSVFileUploadView.as_view(), name='csv-upload'),
     
+    # Subidas reanudables por partes
+    path('uploads/', views.chunked_upload_create_view, name='chunked-upload-create'),
+    path('uploads/<uuid:upload_id>/', views.UploadSessionView.as_view(), name='chunked-upload'),
+    path('uploads/<uuid:upload_id>/complete/', views.chunked_upload_complete_view, name='chunked-upload-complete'),
+    
     # Gestión de archivos CSV
-    path('csv-files/', views.UserCSVFilesView.as_view(), name='user-csv-files'),
+    path('csv-files/', user_csv_files_view, name='user-csv-files'),
     path('csv-files/<int:csv_file_id>/reprocess/', views.reprocess_csv_view, name='reprocess-csv'),
     path('csv-files/<int:csv_file_id>/delete/', views.delete_csv_file_view, name='delete-csv'),
+    path('csv-files/<int:csv_file_id>/progress/', csv_file_progress_view, name='csv-progress'),
     
     # Informes
-    path('reports/', views.UserReportsView.as_view(), name='user-reports'),
-    path('reports/<int:pk>/', views.ReportDetailView.as_view(), name='report-detail'),
+    path('reports/', user_reports_view, name='user-reports'),
+    path('reports/compare/', views.report_compare_view, name='report-compare'),
+    path('reports/top-products/', views.report_top_products_view, name='report-top-products'),
+    path('reports/<int:pk>/', report_detail_view, name='report-detail'),
     
     # PDF
     path('reports/<int:report_id>/generate-pdf/', views.generate_pdf_view, name='generate-pdf'),
     path('reports/<int:report_id>/regenerate-pdf/', views.regenerate_pdf_view, name='regenerate-pdf'),
     path('reports/<int:report_id>/download-pdf/', views.download_pdf_view, name='download-pdf'),
     
+    # Exportación de datos
+    path('reports/<int:report_id>/export/', views.ReportExportView.as_view(), name='report-export'),
+    
+    # Anomalías de ventas
+    path('reports/<int:report_id>/anomalies/', views.ReportAnomaliesView.as_view(), name='report-anomalies'),
+    
+    # Clientes (RFM y cohortes) y vendedores
+    path('reports/<int:report_id>/customers/', views.report_customers_view, name='report-customers'),
+    
+    # Series temporales
+    path('reports/<int:report_id>/timeseries/', views.report_timeseries_view, name='report-timeseries'),
+    
     # Dashboard
-    path('dashboard/', views.dashboard_summary_view, name='dashboard-summary'),
+    path('dashboard/', dashboard_summary_view, name='dashboard-summary'),
+    
+    # Totales combinados de todos los informes del usuario
+    path('analytics/', views.user_analytics_view, name='user-analytics'),
 ] 
\ No newline at end of file
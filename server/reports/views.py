@@ -3,16 +3,78 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import HttpResponse, Http404
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.views import APIView
+from rest_framework.exceptions import Throttled, ValidationError
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.db.models import Count, Prefetch, Q, Sum
+from django.db.models.functions import Abs
 from django.shortcuts import get_object_or_404
-from .models import CSVFile, Report, SalesData
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from authentication.authentication import QueryParamJWTAuthentication
+from main.admission import admission_control, admit, admit_stream, detach_admission
+from .models import CSVFile, CohortRetention, CustomerMetrics, Report, SalesAnomaly, SalesData, SellerPerformance, UploadSession
 from .serializers import (
-    CSVFileSerializer, CSVFileUploadSerializer, 
-    ReportSerializer, ReportSummarySerializer
+    CSVFileSerializer, CSVFileUploadSerializer, CustomerMetricsSerializer,
+    ReportSerializer, ReportSummarySerializer, SalesAnomalySerializer, SellerPerformanceSerializer, SAMPLE_RELATED
 )
-from .services import DataAnalysisService
-from .pdf_service import PDFReportService
-import os
+from .exports import EXPORT_FORMATS, ReportDataExporter
+from .background import submit_analysis, wants_async
+from .progress import progress_events
+from .storage import delete_file, download_response, file_exists
+from .uploads import (
+    UploadError, abort_upload, append_chunk, claim_session, complete_upload,
+    create_upload_session, parse_checksum_header
+)
+
+# DataAnalysisService (pandas/NumPy) y PDFReportService (matplotlib/ReportLab)
+# se importan dentro de las vistas que los usan para que el arranque del proceso
+# y los endpoints livianos no paguen el costo de esas librerías.
+# Ver reports.warmup para precargarlas en los workers de análisis.
+
+def _wants_appendix(request):
+    """Indica si la petición solicita el anexo con todas las transacciones"""
+    return str(request.data.get('include_appendix', '')).lower() in ('1', 'true', 'yes')
+
+def _process_uploaded_file(request, csv_file):
+    """
+    Analiza un CSV recién subido y arma la respuesta de la subida
+
+    Con `Prefer: respond-async` (o `?async=true`) responde 202 con el id del
+    archivo y lo analiza en segundo plano, para seguirlo con el stream SSE.
+    """
+    if wants_async(request):
+        # El análisis pendiente conserva los cupos de admisión de la subida
+        submit_analysis(csv_file, detach_admission(request))
+        return Response({
+            'message': 'Archivo subido; el procesamiento continúa en segundo plano',
+            'csv_file': CSVFileSerializer(csv_file).data,
+            'progress_url': request.build_absolute_uri(
+                reverse('csv-progress', kwargs={'csv_file_id': csv_file.id})
+            ),
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    try:
+        from .services import DataAnalysisService
+        analysis_service = DataAnalysisService(csv_file)
+        report = analysis_service.process_csv()
+        
+        return Response({
+            'message': 'Archivo subido y procesado exitosamente',
+            'csv_file': CSVFileSerializer(csv_file).data,
+            'report_id': report.id
+        }, status=status.HTTP_201_CREATED)
+        
+    except Exception as e:
+        csv_file.status = 'error'
+        csv_file.save()
+        return Response({
+            'error': f'Error procesando el archivo: {str(e)}',
+            'csv_file': CSVFileSerializer(csv_file).data
+        }, status=status.HTTP_400_BAD_REQUEST)
 
 class CSVFileUploadView(generics.CreateAPIView):
     """
@@ -22,29 +84,14 @@ class CSVFileUploadView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
     
+    @method_decorator(admission_control('upload'))
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             csv_file = serializer.save()
             
             # Procesar el archivo automáticamente
-            try:
-                analysis_service = DataAnalysisService(csv_file)
-                report = analysis_service.process_csv()
-                
-                return Response({
-                    'message': 'Archivo subido y procesado exitosamente',
-                    'csv_file': CSVFileSerializer(csv_file).data,
-                    'report_id': report.id
-                }, status=status.HTTP_201_CREATED)
-                
-            except Exception as e:
-                csv_file.status = 'error'
-                csv_file.save()
-                return Response({
-                    'error': f'Error procesando el archivo: {str(e)}',
-                    'csv_file': CSVFileSerializer(csv_file).data
-                }, status=status.HTTP_400_BAD_REQUEST)
+            return _process_uploaded_file(request, csv_file)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -68,7 +115,45 @@ class UserReportsView(generics.ListAPIView):
     def get_queryset(self):
         return Report.objects.filter(
             csv_file__user=self.request.user
-        ).order_by('-created_at')
+        ).select_related('csv_file').defer('sketches', 'forecast').order_by('-created_at')
+
+class ReportAnomaliesView(generics.ListAPIView):
+    """
+    Anomalías de ventas de un informe, de la más a la menos marcada
+
+    Filtros opcionales: `product`, `region`, `direction` (spike/drop),
+    `date_from` y `date_to` (AAAA-MM-DD).
+    """
+    serializer_class = SalesAnomalySerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        report = get_object_or_404(Report.objects.only('id'), id=self.kwargs['report_id'], csv_file__user=self.request.user)
+        queryset = SalesAnomaly.objects.filter(report=report)
+        
+        params = self.request.query_params
+        filters = {
+            'product': 'product',
+            'region': 'region',
+            'direction': 'direction',
+            'date_from': 'date__gte',
+            'date_to': 'date__lte',
+        }
+        for param, lookup in filters.items():
+            value = params.get(param)
+            if not value:
+                continue
+            if param.startswith('date_'):
+                # parse_date devuelve None si el formato no coincide y lanza
+                # ValueError si la fecha no existe (2024-02-30)
+                try:
+                    value = parse_date(value)
+                except ValueError:
+                    value = None
+                if value is None:
+                    raise ValidationError({'error': f'El parámetro {param} debe ser una fecha válida con formato AAAA-MM-DD'})
+            queryset = queryset.filter(**{lookup: value})
+        return queryset.order_by(Abs('score').desc(), 'date')
 
 class ReportDetailView(generics.RetrieveAPIView):
     """
@@ -78,10 +163,19 @@ class ReportDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Report.objects.filter(csv_file__user=self.request.user)
+        return Report.objects.filter(
+            csv_file__user=self.request.user
+        ).select_related('csv_file').defer('sketches').prefetch_related(
+            Prefetch(
+                'sales_data',
+                queryset=SalesData.objects.select_related(*SAMPLE_RELATED).order_by('id')[:ReportSerializer.SAMPLE_SIZE],
+                to_attr='sales_data_sample_rows'
+            )
+        )
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@admission_control('reprocess')
 def reprocess_csv_view(request, csv_file_id):
     """
     Reprocesar un archivo CSV específico
@@ -90,12 +184,13 @@ def reprocess_csv_view(request, csv_file_id):
         csv_file = get_object_or_404(CSVFile, id=csv_file_id, user=request.user)
         
         # Verificar que el archivo existe
-        if not csv_file.file or not os.path.exists(csv_file.file.path):
+        if not file_exists(csv_file.file):
             return Response({
                 'error': 'El archivo no existe en el servidor'
             }, status=status.HTTP_404_NOT_FOUND)
         
         # Procesar el archivo
+        from .services import DataAnalysisService
         analysis_service = DataAnalysisService(csv_file)
         report = analysis_service.process_csv()
         
@@ -111,6 +206,7 @@ def reprocess_csv_view(request, csv_file_id):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@admission_control('pdf')
 def generate_pdf_view(request, report_id):
     """
     Generar PDF para un informe específico
@@ -119,7 +215,8 @@ def generate_pdf_view(request, report_id):
         report = get_object_or_404(Report, id=report_id, csv_file__user=request.user)
         
         # Generar el PDF
-        pdf_service = PDFReportService(report)
+        from .pdf_service import PDFReportService
+        pdf_service = PDFReportService(report, include_appendix=_wants_appendix(request))
         pdf_file = pdf_service.generate_pdf()
         
         return Response({
@@ -134,23 +231,17 @@ def generate_pdf_view(request, report_id):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@admission_control('pdf')
 def regenerate_pdf_view(request, report_id):
     """
-    Forzar regeneración de PDF eliminando el existente
+    Forzar regeneración de PDF reemplazando el existente
     """
     try:
         report = get_object_or_404(Report, id=report_id, csv_file__user=request.user)
         
-        # Eliminar PDF existente si existe
-        if report.pdf_file:
-            if os.path.exists(report.pdf_file.path):
-                os.remove(report.pdf_file.path)
-            report.pdf_file.delete(save=False)
-            report.pdf_file = None
-            report.save()
-        
-        # Generar nuevo PDF
-        pdf_service = PDFReportService(report)
+        # Generar nuevo PDF (reemplaza el existente sin dejar de servirlo)
+        from .pdf_service import PDFReportService
+        pdf_service = PDFReportService(report, include_appendix=_wants_appendix(request))
         pdf_file = pdf_service.generate_pdf()
         
         return Response({
@@ -174,23 +265,385 @@ def download_pdf_view(request, report_id):
         
         if not report.pdf_file:
             # Si no existe, generarlo automáticamente
-            pdf_service = PDFReportService(report)
-            pdf_file = pdf_service.generate_pdf()
+            from .pdf_service import PDFReportService
+            with admit(request, 'pdf'):
+                pdf_service = PDFReportService(report)
+                pdf_file = pdf_service.generate_pdf()
         
-        # Servir el archivo
-        if report.pdf_file and os.path.exists(report.pdf_file.path):
-            with open(report.pdf_file.path, 'rb') as pdf:
-                response = HttpResponse(pdf.read(), content_type='application/pdf')
-                response['Content-Disposition'] = f'attachment; filename="{report.pdf_file.name}"'
-                return response
+        # Servir el archivo (URL firmada en S3, stream desde el storage en disco local)
+        if file_exists(report.pdf_file):
+            return download_response(report.pdf_file, 'application/pdf')
         else:
             raise Http404("Archivo PDF no encontrado")
             
+    except Throttled:
+        raise
     except Exception as e:
         return Response({
             'error': f'Error descargando PDF: {str(e)}'
         }, status=status.HTTP_400_BAD_REQUEST)
 
+def _upload_session_data(session):
+    """Estado de una subida por partes"""
+    return {
+        'id': str(session.id),
+        'original_name': session.original_name,
+        'offset': session.offset,
+        'total_size': session.total_size,
+        'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+    }
+
+def _upload_session_response(session, status_code=status.HTTP_200_OK):
+    response = Response(_upload_session_data(session), status=status_code)
+    response['Upload-Offset'] = str(session.offset)
+    response['Upload-Length'] = str(session.total_size)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def chunked_upload_create_view(request):
+    """
+    Crear una subida reanudable por partes
+    """
+    try:
+        total_size = int(request.data.get('size', 0))
+    except (TypeError, ValueError):
+        return Response({
+            'error': 'El tamaño del archivo debe ser un número entero'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        session = create_upload_session(request.user, str(request.data.get('filename', '')), total_size)
+    except UploadError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    
+    return _upload_session_response(session, status.HTTP_201_CREATED)
+
+class UploadSessionView(APIView):
+    """
+    Consultar (GET/HEAD), enviar partes (PATCH) o cancelar (DELETE) una subida
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, upload_id):
+        session = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+        return _upload_session_response(session)
+    
+    def patch(self, request, upload_id):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response({
+                'error': 'Se requieren los encabezados Upload-Offset y Content-Length'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            expected_digest = parse_checksum_header(request.headers.get('Upload-Checksum'))
+            # El cuerpo se lee en bloques directo del stream (nunca se usa
+            # request.data) y sin transacción abierta mientras llega
+            with claim_session(upload_id, request.user, 'writing', offset) as session:
+                try:
+                    append_chunk(session, request, offset, length, expected_digest)
+                except UploadError as e:
+                    if e.abort:
+                        abort_upload(session)
+                    raise
+        except UploadError as e:
+            if e.session is not None:
+                # Offset incorrecto u otra petición usando la subida: se informa el offset actual
+                response = _upload_session_response(e.session, e.status_code)
+                response.data['error'] = str(e)
+                return response
+            return Response({'error': str(e)}, status=e.status_code)
+        
+        return _upload_session_response(session)
+    
+    def delete(self, request, upload_id):
+        try:
+            with claim_session(upload_id, request.user, 'aborting') as session:
+                abort_upload(session)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@admission_control('upload')
+def chunked_upload_complete_view(request, upload_id):
+    """
+    Finalizar una subida por partes y procesar el archivo
+    """
+    # La reserva evita que dos peticiones unan las partes y creen dos archivos:
+    # la segunda recibe 409 mientras la primera copia las partes
+    try:
+        expected_digest = parse_checksum_header(request.headers.get('Upload-Checksum'))
+        with claim_session(upload_id, request.user, 'completing') as session:
+            try:
+                csv_file = complete_upload(session, expected_digest)
+            except UploadError as e:
+                if e.abort:
+                    abort_upload(session)
+                raise
+    except UploadError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    
+    return _process_uploaded_file(request, csv_file)
+
+class IgnoreFormatContentNegotiation(DefaultContentNegotiation):
+    """
+    Negociación que ignora el parámetro `format` de la URL
+
+    La exportación usa `?format=` para elegir el tipo de archivo, que DRF
+    interpretaría como el nombre de un renderer. También la usa el stream SSE,
+    cuyo `Accept: text/event-stream` no corresponde a ningún renderer.
+    """
+    
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+class CSVFileProgressView(APIView):
+    """
+    Stream SSE (text/event-stream) con el avance del procesamiento de un archivo
+
+    Acepta el token en `?token=` porque EventSource no envía encabezados.
+    """
+    authentication_classes = [QueryParamJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = IgnoreFormatContentNegotiation
+    
+    def get(self, request, csv_file_id):
+        csv_file = get_object_or_404(CSVFile, id=csv_file_id, user=request.user)
+        
+        # Cada stream síncrono ocupa un hilo del worker: se limitan con su propio cupo
+        events = admit_stream(progress_events(csv_file), 'progress', settings.PROGRESS_MAX_STREAMS)
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Evita que nginx acumule los eventos
+        return response
+
+class ReportExportView(APIView):
+    """
+    Vista para exportar los datos procesados de un informe (CSV, XLSX o Parquet)
+    """
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = IgnoreFormatContentNegotiation
+    
+    def get(self, request, report_id):
+        report = get_object_or_404(
+            Report.objects.select_related('csv_file'), id=report_id, csv_file__user=request.user
+        )
+        
+        export_format = request.query_params.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                'error': f"Formato no soportado. Usa uno de: {', '.join(EXPORT_FORMATS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if export_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                return Response({
+                    'error': 'La exportación a Parquet requiere pyarrow instalado en el servidor'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+        exporter = ReportDataExporter(report, export_format, compress=compress)
+        
+        response = StreamingHttpResponse(exporter.stream(), content_type=exporter.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{exporter.filename}"'
+        return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_timeseries_view(request, report_id):
+    """
+    Serie de ventas diaria o semanal de un informe, reducida con LTTB
+    """
+    from .timeseries import RESOLUTIONS, get_cached_timeseries
+    
+    report = get_object_or_404(Report, id=report_id, csv_file__user=request.user)
+    
+    resolution = request.query_params.get('resolution', 'day').lower()
+    if resolution not in RESOLUTIONS:
+        # SalesData guarda solo la fecha: no hay datos por hora
+        return Response({
+            'error': f"Resolución no soportada. Usa una de: {', '.join(RESOLUTIONS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        points = int(request.query_params.get('points', settings.TIMESERIES_DEFAULT_POINTS))
+    except ValueError:
+        return Response({
+            'error': 'El parámetro points debe ser un número entero'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not 3 <= points <= settings.TIMESERIES_MAX_POINTS:
+        return Response({
+            'error': f'El parámetro points debe estar entre 3 y {settings.TIMESERIES_MAX_POINTS}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(get_cached_timeseries(report, resolution, points))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_customers_view(request, report_id):
+    """
+    Segmentos RFM, clientes con más compras, retención por cohorte y
+    desempeño de los vendedores de un informe
+
+    `?segment=` filtra los clientes listados y `?limit=` los limita (50 por
+    defecto). Todo se lee de las tablas guardadas al procesar el informe.
+    """
+    report = get_object_or_404(Report.objects.only('id'), id=report_id, csv_file__user=request.user)
+    try:
+        limit = int(request.query_params.get('limit', 50))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= settings.CUSTOMERS_MAX_RESULTS:
+        return Response({
+            'error': f'El parámetro limit debe estar entre 1 y {settings.CUSTOMERS_MAX_RESULTS}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    segment = request.query_params.get('segment')
+    segment_labels = dict(CustomerMetrics.SEGMENT_CHOICES)
+    if segment and segment not in segment_labels:
+        return Response({
+            'error': f"Segmento desconocido; usa uno de: {', '.join(segment_labels)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    customers = CustomerMetrics.objects.filter(report=report)
+    segments = {
+        row['segment']: row
+        for row in customers.values('segment').annotate(customers=Count('id'), total_sales=Sum('total_sales'))
+    }
+    listed = customers.filter(segment=segment) if segment else customers
+    
+    cohorts = list(CohortRetention.objects.filter(report=report).order_by('cohort', 'period').values_list(
+        'cohort', 'period', 'customers', 'retention'
+    ))
+    labels = sorted({cohort for cohort, _, _, _ in cohorts})
+    periods = max((period for _, period, _, _ in cohorts), default=-1) + 1
+    retention = {cohort: [None] * periods for cohort in labels}
+    sizes = {}
+    for cohort, period, count, rate in cohorts:
+        retention[cohort][period] = rate
+        if period == 0:
+            sizes[cohort] = count
+    
+    return Response({
+        'customers_count': sum(row['customers'] for row in segments.values()),
+        'segments': [
+            {
+                'segment': key,
+                'label': label,
+                'customers': segments[key]['customers'],
+                'total_sales': round(float(segments[key]['total_sales'] or 0), 2),
+            }
+            for key, label in CustomerMetrics.SEGMENT_CHOICES if key in segments
+        ],
+        'customers': CustomerMetricsSerializer(listed.order_by('-total_sales', 'customer')[:limit], many=True).data,
+        'cohorts': {
+            'labels': [f"{cohort:%Y-%m}" for cohort in labels],
+            'sizes': [sizes.get(cohort, 0) for cohort in labels],
+            'retention': [retention[cohort] for cohort in labels],
+        },
+        'sellers': SellerPerformanceSerializer(
+            SellerPerformance.objects.filter(report=report).order_by('-total_sales', 'seller'), many=True
+        ).data,
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_top_products_view(request):
+    """
+    Top de productos y conteos distintos combinando los sketches de varios informes
+
+    `?ids=1,2,3` elige los informes (por defecto todos los del usuario). Los
+    valores son aproximados e incluyen su cota de error. Los informes sin
+    sketches guardados se resumen a partir de sus agregados.
+    """
+    from .sketches import merge_report_sketches
+    
+    reports = Report.objects.filter(csv_file__user=request.user).only('id', 'sketches')
+    try:
+        ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        n = int(request.query_params.get('n', 10))
+    except ValueError:
+        return Response({
+            'error': 'Los parámetros ids y n deben ser números enteros'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= n <= settings.ANALYSIS_SKETCH_CAPACITY:
+        return Response({
+            'error': f'El parámetro n debe estar entre 1 y {settings.ANALYSIS_SKETCH_CAPACITY}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if ids:
+        reports = reports.filter(id__in=ids)
+    
+    reports = list(reports)
+    merged = merge_report_sketches(reports, settings.ANALYSIS_SKETCH_CAPACITY, settings.ANALYSIS_HLL_PRECISION)
+    if merged is None:
+        return Response({
+            'error': 'No se encontraron informes'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response({
+        'reports': [report.id for report in reports],
+        **merged.summary(n),
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_compare_view(request):
+    """
+    Compara dos informes (`?base=<id>&target=<id>`) por producto, región y mes
+    """
+    from .comparison import get_cached_comparison
+    
+    try:
+        base_id = int(request.query_params['base'])
+        target_id = int(request.query_params['target'])
+    except (KeyError, ValueError):
+        return Response({
+            'error': 'Los parámetros base y target son obligatorios y deben ser ids de informes'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    reports = Report.objects.filter(csv_file__user=request.user).select_related('csv_file').defer('sketches', 'forecast')
+    base = get_object_or_404(reports, id=base_id)
+    target = get_object_or_404(reports, id=target_id)
+    
+    return Response(get_cached_comparison(base, target))
+
+# Estadísticas del dashboard (compartidas con reports.async_views)
+DASHBOARD_FILE_STATS = {
+    'total_files': Count('id'),
+    'completed_files': Count('id', filter=Q(status='completed')),
+    'processing_files': Count('id', filter=Q(status='processing')),
+    'error_files': Count('id', filter=Q(status='error')),
+}
+DASHBOARD_REPORT_STATS = {
+    'total_reports': Count('id'),
+    'total_sales': Sum('total_sales'),
+    'total_records': Sum('total_records'),
+}
+
+def build_dashboard_summary(file_stats, report_stats, recent_reports):
+    """
+    Arma la respuesta del dashboard a partir de las estadísticas agregadas
+    """
+    return {
+        'statistics': {
+            'total_files': file_stats['total_files'],
+            'total_reports': report_stats['total_reports'],
+            'completed_files': file_stats['completed_files'],
+            'processing_files': file_stats['processing_files'],
+            'error_files': file_stats['error_files'],
+            'total_sales': float(report_stats['total_sales'] or 0),
+            'total_records': report_stats['total_records'] or 0
+        },
+        'recent_reports': ReportSummarySerializer(recent_reports, many=True).data
+    }
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_summary_view(request):
@@ -200,32 +653,37 @@ def dashboard_summary_view(request):
     user_csv_files = CSVFile.objects.filter(user=request.user)
     user_reports = Report.objects.filter(csv_file__user=request.user)
     
-    # Estadísticas generales
-    total_files = user_csv_files.count()
-    total_reports = user_reports.count()
-    completed_files = user_csv_files.filter(status='completed').count()
-    processing_files = user_csv_files.filter(status='processing').count()
-    error_files = user_csv_files.filter(status='error').count()
+    # Estadísticas generales (una consulta por tabla)
+    file_stats = user_csv_files.aggregate(**DASHBOARD_FILE_STATS)
+    report_stats = user_reports.aggregate(**DASHBOARD_REPORT_STATS)
     
     # Últimos informes
-    recent_reports = user_reports.order_by('-created_at')[:5]
+    recent_reports = user_reports.select_related('csv_file').defer('sketches', 'forecast').order_by('-created_at')[:5]
+    
+    return Response(build_dashboard_summary(file_stats, report_stats, recent_reports))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def user_analytics_view(request):
+    """
+    Serie mensual, top de productos y ventas por región combinando todos los
+    informes completados del usuario
+
+    Se lee de los agregados mantenidos al completar o eliminar cada informe.
+    `?n=` limita el top de productos (10 por defecto).
+    """
+    from .analytics import get_user_analytics
     
-    # Calcular totales
-    total_sales = sum(report.total_sales or 0 for report in user_reports)
-    total_records = sum(report.total_records or 0 for report in user_reports)
+    try:
+        n = int(request.query_params.get('n', 10))
+    except ValueError:
+        n = 0
+    if not 1 <= n <= settings.ANALYTICS_MAX_PRODUCTS:
+        return Response({
+            'error': f'El parámetro n debe estar entre 1 y {settings.ANALYTICS_MAX_PRODUCTS}'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response({
-        'statistics': {
-            'total_files': total_files,
-            'total_reports': total_reports,
-            'completed_files': completed_files,
-            'processing_files': processing_files,
-            'error_files': error_files,
-            'total_sales': float(total_sales),
-            'total_records': total_records
-        },
-        'recent_reports': ReportSummarySerializer(recent_reports, many=True).data
-    })
+    return Response(get_user_analytics(request.user, top_n=n))
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
@@ -236,15 +694,12 @@ def delete_csv_file_view(request, csv_file_id):
     try:
         csv_file = get_object_or_404(CSVFile, id=csv_file_id, user=request.user)
         
-        # Eliminar archivos físicos
-        if csv_file.file and os.path.exists(csv_file.file.path):
-            os.remove(csv_file.file.path)
+        # Eliminar archivos del storage
+        delete_file(csv_file.file)
         
         # Si tiene informe con PDF, eliminarlo también
         try:
-            report = csv_file.report
-            if report.pdf_file and os.path.exists(report.pdf_file.path):
-                os.remove(report.pdf_file.path)
+            delete_file(csv_file.report.pdf_file)
         except Report.DoesNotExist:
             pass
         
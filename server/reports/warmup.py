@@ -0,0 +1,19 @@
+"""
+Precarga de las librerías pesadas de análisis y generación de PDF
+
+Las vistas importan `services` (pandas/NumPy) y `pdf_service`
+(matplotlib/ReportLab) solo cuando las necesitan. Los procesos dedicados a
+procesar archivos o generar PDFs pueden llamar a `warm_up()` al iniciar (o
+definir REPORTS_PRELOAD_HEAVY=True) para no pagar ese costo en la primera tarea.
+"""
+
+import time
+
+# Módulos que no deben cargarse al arrancar un proceso web
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'reportlab', 'pyarrow', 'openpyxl']
+
+def warm_up():
+    """Importa los servicios pesados y devuelve los segundos que tomó"""
+    started = time.perf_counter()
+    from . import pdf_service, services  # noqa: F401
+    return time.perf_counter() - started